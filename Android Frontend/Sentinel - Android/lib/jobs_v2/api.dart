@@ -305,18 +305,22 @@ class JobsApi {
   }
 
   /// Search listings (Lazy Load)
-  Future<ApiResponse<List<dynamic>>> searchListings({
+  Future<ApiResponse<Map<String, dynamic>>> searchListings({
     String? category,
+    String? payType,
     double? lat,
     double? lon,
     int radiusKm = 50,
+    String? cursor,
   }) async {
     try {
       final params = <String, String>{};
       if (category != null) params['category'] = category;
+      if (payType != null) params['pay_type'] = payType;
       if (lat != null) params['lat'] = lat.toString();
       if (lon != null) params['lon'] = lon.toString();
       params['radius_km'] = radiusKm.toString();
+      if (cursor != null) params['cursor'] = cursor;
 
       final uri = Uri.parse('$baseUrl/api/jobs_v2/listings/search')
           .replace(queryParameters: params.isNotEmpty ? params : null);
@@ -324,9 +328,10 @@ class JobsApi {
       final resp = await http.get(uri, headers: _headers);
       final data = json.decode(resp.body);
 
+      // data: {listings, next_cursor} - pass next_cursor back for the next page
       return ApiResponse(
         success: resp.statusCode == 200,
-        data: data['listings'],
+        data: resp.statusCode == 200 ? Map<String, dynamic>.from(data) : null,
         error: data['error'],
         statusCode: resp.statusCode,
       );
@@ -521,13 +526,21 @@ class JobsApi {
     }
   }
 
-  /// Get messages for application
-  Future<ApiResponse<List<dynamic>>> getMessages(String appId) async {
+  /// Get messages for application.
+  /// Latest page by default; `before` (a message id) pages back;
+  /// `since` (the previous `sync_token`) returns only new/read/deleted
+  /// messages. Data is the payload: messages, has_more, sync_token.
+  Future<ApiResponse<Map<String, dynamic>>> getMessages(String appId,
+      {String? since, String? before}) async {
     try {
-      final resp = await http.get(
-        Uri.parse('$baseUrl/api/jobs_v2/applications/$appId/messages'),
-        headers: _headers,
-      );
+      final params = <String, String>{};
+      if (since != null) params['since'] = since;
+      if (before != null) params['before'] = before;
+
+      final uri = Uri.parse('$baseUrl/api/jobs_v2/applications/$appId/messages')
+          .replace(queryParameters: params.isNotEmpty ? params : null);
+
+      final resp = await http.get(uri, headers: _headers);
 
       if (resp.statusCode != 200) {
         return ApiResponse(
@@ -539,7 +552,7 @@ class JobsApi {
       final data = json.decode(resp.body);
       return ApiResponse(
         success: resp.statusCode == 200,
-        data: data['messages'],
+        data: data,
         error: data['error'],
         statusCode: resp.statusCode,
       );
@@ -549,6 +562,57 @@ class JobsApi {
     }
   }
 
+  /// Chat push channel (Server-Sent Events). Yields {type: open} once
+  /// connected, then {id, type: message|read|delete|resync, application_id, message_id}
+  /// until the server closes the stream (about every 5 min); callers
+  /// reconnect with the last event id to replay what they missed.
+  Stream<Map<String, dynamic>> chatEvents({String? lastEventId}) async* {
+    final client = http.Client();
+    try {
+      final req = http.Request('GET', Uri.parse('$baseUrl/api/jobs_v2/events'));
+      req.headers.addAll(_headers);
+      req.headers['Accept'] = 'text/event-stream';
+      if (lastEventId != null) req.headers['Last-Event-ID'] = lastEventId;
+
+      final resp = await client.send(req);
+      if (resp.statusCode != 200) {
+        throw Exception('Event stream error (${resp.statusCode})');
+      }
+      yield {'type': 'open'};
+
+      String? id;
+      String? type;
+      final data = StringBuffer();
+      await for (final line in resp.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())) {
+        if (line.isEmpty) {
+          // Blank line ends an event
+          if (type != null) {
+            final payload = data.isEmpty
+                ? <String, dynamic>{}
+                : Map<String, dynamic>.from(json.decode(data.toString()));
+            payload['type'] = type;
+            if (id != null) payload['id'] = id;
+            yield payload;
+          }
+          id = null;
+          type = null;
+          data.clear();
+        } else if (line.startsWith('id: ')) {
+          id = line.substring(4);
+        } else if (line.startsWith('event: ')) {
+          type = line.substring(7);
+        } else if (line.startsWith('data: ')) {
+          data.write(line.substring(6));
+        }
+        // ':' heartbeats and 'retry:' are ignored
+      }
+    } finally {
+      client.close();
+    }
+  }
+
   /// Mark messages as read
   Future<ApiResponse<void>> markMessagesRead(String appId) async {
     try {
@@ -31,25 +31,65 @@ class _JobApplicationDetailScreenState
   bool _loading = true;
   Map<String, dynamic>? _application;
   List<dynamic> _messages = [];
+  String? _syncToken; // From the last messages response; polls fetch changes only
+  bool _hasOlder = false;
+  bool _loadingOlder = false;
   final TextEditingController _msgCtrl = TextEditingController();
   final ScrollController _scrollCtrl = ScrollController();
   Timer? _pollTimer;
+  StreamSubscription<Map<String, dynamic>>? _eventsSub;
+  String? _lastEventId;
+  int _eventRetry = 0;
+  bool _eventsConnected = false;
 
   @override
   void initState() {
     super.initState();
     _loadData();
-    // Poll for messages every 5s if messaging allowed
+    // Pushed events drive updates; the poll only runs while the stream is down
+    _listenForEvents();
     _pollTimer = Timer.periodic(const Duration(seconds: 5), (_) {
-      if (_application?['allow_messaging'] == true) {
+      if (!_eventsConnected && _application?['allow_messaging'] == true) {
         _loadMessages(silent: true);
       }
     });
   }
 
+  void _listenForEvents() {
+    _eventsSub = widget.api.chatEvents(lastEventId: _lastEventId).listen(
+      (event) {
+        if (event['type'] == 'open') {
+          _eventsConnected = true;
+          return;
+        }
+        if (event['id'] != null) _lastEventId = event['id'];
+        final forThisChat = event['application_id'] == widget.applicationId;
+        if ((forThisChat || event['type'] == 'resync') &&
+            _application?['allow_messaging'] == true) {
+          _loadMessages(silent: true);
+        }
+      },
+      onError: (_) => _reconnectEvents(failed: true),
+      onDone: _reconnectEvents,
+      cancelOnError: true,
+    );
+  }
+
+  void _reconnectEvents({bool failed = false}) {
+    _eventsConnected = false;
+    if (!mounted) return;
+    // 1s after a normal close; backs off (2..32s) while the server is unreachable
+    _eventRetry = failed ? _eventRetry + 1 : 0;
+    final delay = failed ? Duration(seconds: 1 << _eventRetry.clamp(1, 5)) : const Duration(seconds: 1);
+    Timer(delay, () {
+      if (mounted) _listenForEvents();
+    });
+  }
+
   @override
   void dispose() {
     _pollTimer?.cancel();
+    _eventsSub?.cancel();
     _msgCtrl.dispose();
     super.dispose();
   }
@@ -80,15 +120,33 @@ class _JobApplicationDetailScreenState
 
   Future<void> _loadMessages({bool silent = false}) async {
     if (!silent) setState(() => _loading = true);
-    final msgResp = await widget.api.getMessages(widget.applicationId);
-    if (msgResp.success) {
+    // First load takes the latest page; later polls only fetch changes
+    final initial = _syncToken == null;
+    final msgResp =
+        await widget.api.getMessages(widget.applicationId, since: _syncToken);
+    if (msgResp.success && msgResp.data != null) {
       if (mounted) {
+        final payload = msgResp.data!;
+        final incoming = (payload['messages'] as List?) ?? [];
         setState(() {
-          _messages = msgResp.data ?? [];
+          if (initial) {
+            _messages = List<dynamic>.from(incoming);
+            _hasOlder = payload['has_more'] == true;
+          } else {
+            _mergeChanges(incoming);
+          }
+          _syncToken = payload['sync_token'];
           _loading = false;
         });
+        // Truncated sync: fetch the rest
+        if (!initial && payload['has_more'] == true) {
+          await _loadMessages(silent: true);
+          return;
+        }
         // Mark messages as read
-        widget.api.markMessagesRead(widget.applicationId);
+        if (initial || incoming.isNotEmpty) {
+          widget.api.markMessagesRead(widget.applicationId);
+        }
         // Scroll to bottom
         if (_messages.isNotEmpty && !silent) {
           WidgetsBinding.instance
@@ -96,10 +154,51 @@ class _JobApplicationDetailScreenState
         }
       }
     } else {
+      // Rejected token: start over from the latest page
+      if (msgResp.statusCode == 400) _syncToken = null;
       if (mounted && !silent) setState(() => _loading = false);
     }
   }
 
+  /// Applies ?since= changes: new messages, read receipts, deletions.
+  void _mergeChanges(List<dynamic> changes) {
+    // Optimistic copies are replaced by the server's once delivered
+    _messages.removeWhere((m) => m['status'] == 'sent');
+    for (final change in changes) {
+      final idx = _messages
+          .indexWhere((m) => m['message_id'] == change['message_id']);
+      if (change['deleted'] == true) {
+        if (idx >= 0) _messages.removeAt(idx);
+      } else if (idx >= 0) {
+        _messages[idx] = change;
+      } else {
+        // Keep unsent (sending / failed) bubbles last
+        final firstPending = _messages.indexWhere((m) => m['status'] != null);
+        _messages.insert(
+            firstPending >= 0 ? firstPending : _messages.length, change);
+      }
+    }
+  }
+
+  Future<void> _loadOlder() async {
+    final oldest = _messages.firstWhere(
+        (m) => m['status'] == null,
+        orElse: () => null);
+    if (oldest == null || _loadingOlder) return;
+    setState(() => _loadingOlder = true);
+    final resp = await widget.api
+        .getMessages(widget.applicationId, before: oldest['message_id']);
+    if (mounted) {
+      setState(() {
+        if (resp.success && resp.data != null) {
+          _messages.insertAll(0, (resp.data!['messages'] as List?) ?? []);
+          _hasOlder = resp.data!['has_more'] == true;
+        }
+        _loadingOlder = false;
+      });
+    }
+  }
+
   void _scrollToBottom() {
     if (_scrollCtrl.hasClients) {
       _scrollCtrl.animateTo(
@@ -507,6 +606,16 @@ class _JobApplicationDetailScreenState
     List<Widget> items = [];
     String? lastDateLabel;
 
+    if (_hasOlder) {
+      items.add(Center(
+        child: TextButton(
+          onPressed: _loadingOlder ? null : _loadOlder,
+          child: Text(_loadingOlder ? 'Loading...' : 'Load earlier messages',
+              style: SentinelJobsTheme.mutedStyle),
+        ),
+      ));
+    }
+
     for (int i = 0; i < _messages.length; i++) {
       final msg = _messages[i];
       final dateLabel = _getDateLabel(msg['created_at']);
@@ -19,6 +19,8 @@ class ListingsTab extends StatefulWidget {
 class _ListingsTabState extends State<ListingsTab> {
   List<dynamic> _listings = [];
   bool _loading = true;
+  String? _nextCursor; // null = no more pages
+  bool _loadingMore = false;
   String? _error;
   String? _filterCategory;
 
@@ -49,7 +51,8 @@ class _ListingsTabState extends State<ListingsTab> {
       if (mounted) {
         if (resp.success && resp.data != null) {
           setState(() {
-            _listings = resp.data!;
+            _listings = List<dynamic>.from(resp.data!['listings'] ?? []);
+            _nextCursor = resp.data!['next_cursor'];
             _loading = false;
           });
         } else {
@@ -69,6 +72,24 @@ class _ListingsTabState extends State<ListingsTab> {
     }
   }
 
+  /// Next page (nearest-first keyset) when the list scrolls near its end
+  Future<void> _loadMore() async {
+    if (_loadingMore || _nextCursor == null) return;
+    _loadingMore = true;
+    final resp = await widget.api.searchListings(
+        category: _filterCategory,
+        lat: _lat,
+        lon: _lon,
+        radiusKm: 50,
+        cursor: _nextCursor);
+    _loadingMore = false;
+    if (!mounted || !resp.success || resp.data == null) return;
+    setState(() {
+      _listings.addAll(resp.data!['listings'] ?? []);
+      _nextCursor = resp.data!['next_cursor'];
+    });
+  }
+
   Future<void> _applyToJob(String jobId) async {
     final resp = await widget.api.applyToJob(jobId);
 
@@ -208,7 +229,10 @@ class _ListingsTabState extends State<ListingsTab> {
       child: ListView.builder(
         padding: const EdgeInsets.all(16),
         itemCount: _listings.length,
-        itemBuilder: (ctx, i) => _buildListingCard(_listings[i]),
+        itemBuilder: (ctx, i) {
+          if (i >= _listings.length - 5) _loadMore();
+          return _buildListingCard(_listings[i]);
+        },
       ),
     );
   }
@@ -344,6 +368,11 @@ class _ListingsTabState extends State<ListingsTab> {
                         ),
                       ),
                     ),
+                    if (listing['distance_km'] != null) ...[
+                      const SizedBox(width: 8),
+                      Text('${listing['distance_km']} KM',
+                          style: SentinelJobsTheme.mutedStyle),
+                    ],
                     const Spacer(),
                     if (widget.role == 'worker')
                       SizedBox(
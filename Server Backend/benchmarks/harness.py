@@ -0,0 +1,168 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: benchmarks/harness.py
+# ROLE:   BENCHMARK BOOTSTRAP, TIMING AND JSON REPORTS
+# ==============================================================================
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Offline by default: fake model backend + synthetic OSINT feed (core/llm_fake.py).
+# The limiter is opened up so it only shapes results when asked to.
+BENCH_ENV_DEFAULTS = {
+    'DJANGO_SETTINGS_MODULE': 'core.settings',
+    'LLM_BACKEND': 'fake',
+    'ATLAS_OFFLINE_FEED': '1',
+    'LLM_FAKE_LATENCY': 'lognormal:400:0.35,analyst=lognormal:3000:0.3,translator=lognormal:1500:0.3',
+    'LLM_RATE_PER_MINUTE': '100000',
+    'LLM_BURST': '1000',
+}
+
+
+def bootstrap(use_mongomock):
+    """
+    Prepares the process and runs django.setup(). With `use_mongomock`, every
+    pymongo.MongoClient(...) in the app (db_utils, JobsDB) returns one shared
+    in-memory client, so it must run before any app module is imported.
+    """
+    for key, value in BENCH_ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+
+    if use_mongomock:
+        import mongomock
+        import pymongo
+
+        shared = mongomock.MongoClient()
+        pymongo.MongoClient = lambda *args, **kwargs: shared
+
+    import django
+    django.setup()
+
+    # What core/wsgi.py does at server start
+    from core.startup import ensure_core_storage_at_startup
+    ensure_core_storage_at_startup()
+
+
+# --- TIMING ---
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies_ms, errors, wall_seconds):
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "mean_ms": round(sum(values) / count, 2) if count else 0.0,
+        "max_ms": round(values[-1], 2) if values else 0.0,
+        "throughput_rps": round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+
+def run_scenario(make_worker, requests, concurrency):
+    """
+    Issues `requests` calls spread over `concurrency` threads.
+    `make_worker()` is called once per thread (Django test Clients are not
+    thread-safe) and returns call(i) -> bool (True = success).
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def loop():
+        call = make_worker()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                ok = call(i)
+            except Exception:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(loop)
+    return summarize(latencies, errors[0], time.perf_counter() - wall_start)
+
+
+# --- REPORTS ---
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=SERVER_DIR, capture_output=True, text=True, timeout=10,
+        )
+        return out.stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def build_meta(args):
+    mongo = os.environ.get('MONGO_HOST', 'localhost')
+    if getattr(args, 'mongomock', False):
+        mongo = "mongomock"
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mongo": mongo,
+        "llm_backend": os.environ.get('LLM_BACKEND'),
+        "llm_fake_latency": os.environ.get('LLM_FAKE_LATENCY'),
+        "args": vars(args),
+    }
+
+
+def write_report(report, out_path=None, prefix=''):
+    if not out_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        out_path = os.path.join(RESULTS_DIR, f"{prefix}{stamp}-{report['meta']['commit']}.json")
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return out_path
+
+
+def print_table(report, baseline=None):
+    base = (baseline or {}).get("scenarios", {})
+    print(f"\n{'SCENARIO':<22}{'N':>6}{'ERR':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'RPS':>10}")
+    for name, s in report["scenarios"].items():
+        line = (f"{name:<22}{s['count']:>6}{s['errors']:>5}"
+                f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['throughput_rps']:>10.1f}")
+        if name in base and base[name].get("p95_ms"):
+            delta = (s['p95_ms'] - base[name]['p95_ms']) / base[name]['p95_ms'] * 100
+            line += f"   p95 {delta:+.1f}% vs {baseline['meta']['commit']}"
+        print(line)
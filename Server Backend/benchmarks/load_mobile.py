@@ -0,0 +1,262 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: benchmarks/load_mobile.py
+# ROLE:   STEP-UP LOAD GENERATOR REPLAYING ANDROID CLIENT TRAFFIC
+# ==============================================================================
+#
+# Each virtual device behaves like the Android app (lib/main.dart):
+#   - keeps one zip (popularity weighted by proximity to HOTZONES_DATA) and one
+#     language (th / km / en mix),
+#   - GET /intel; while "calculating" re-requests every 3s and polls
+#     /intel/status every 2s (client timeouts 15s / 3s),
+#   - after intel arrives, sometimes searches the jobs board nearby,
+#   - then idles for the refresh interval and starts over.
+#
+# Devices are added in stages (--stages 10,25,50,...). Per stage the report has
+# p50/p95/p99, throughput and error rate per endpoint, plus time-to-intel, and
+# names the first stage that breaches the SLO or stops scaling.
+#
+# Run the server offline first, e.g.:
+#   LLM_BACKEND=fake ATLAS_OFFLINE_FEED=1 gunicorn core.wsgi -w 4 --threads 8 -b :8000
+#   python benchmarks/load_mobile.py --base-url http://localhost:8000
+
+import argparse
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+if harness.SERVER_DIR not in sys.path:
+    sys.path.insert(0, harness.SERVER_DIR)
+
+from core.geo_utils import get_nearest_hotzone  # noqa: E402
+from seed import JOB_CATEGORIES, load_zips  # noqa: E402
+
+INTEL_RETRY_SECONDS = 3
+STATUS_POLL_SECONDS = 2
+INTEL_TIMEOUT = 15
+STATUS_TIMEOUT = 3
+MAX_CALCULATING_SECONDS = 300
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Android traffic load generator")
+    p.add_argument('--base-url', default='http://localhost:8000')
+    p.add_argument('--stages', default='10,25,50,100,200', help="Concurrent devices per stage")
+    p.add_argument('--stage-seconds', type=float, default=60)
+    p.add_argument('--zips', type=int, default=400, help="Distinct zips in the popularity pool")
+    p.add_argument('--proximity-scale-km', type=float, default=150,
+                   help="Zip weight = exp(-distance_to_hotzone / scale)")
+    p.add_argument('--lang-mix', default='th:0.6,km:0.15,en:0.25')
+    p.add_argument('--refresh-seconds', type=float, default=60, help="Mean idle time between refreshes")
+    p.add_argument('--jobs-ratio', type=float, default=0.2, help="Share of refreshes that also search jobs")
+    p.add_argument('--jobs-token', default=None, help="Bearer token for jobs search (default: register one)")
+    p.add_argument('--slo-p95-ms', type=float, default=1000)
+    p.add_argument('--max-error-rate', type=float, default=0.01)
+    p.add_argument('--out', default=None)
+    p.add_argument('--seed', type=int, default=42)
+    return p.parse_args(argv)
+
+
+# --- TRAFFIC MODEL ---
+
+def weighted_zips(limit, scale_km, seed):
+    zips = load_zips(limit, seed=seed)
+    weights = [math.exp(-get_nearest_hotzone(z['lat'], z['lon'])[0] / scale_km) for z in zips]
+    return zips, weights
+
+
+def parse_mix(spec):
+    langs, weights = [], []
+    for part in spec.split(','):
+        lang, weight = part.split(':')
+        langs.append(lang.strip())
+        weights.append(float(weight))
+    return langs, weights
+
+
+def register_jobs_worker(base_url):
+    tag = uuid.uuid4().hex[:8]
+    resp = requests.post(f"{base_url}/api/jobs_v2/auth/register", json={
+        "email": f"load-{tag}@example.invalid",
+        "password": uuid.uuid4().hex,
+        "phone": f"+669{int(tag, 16) % 10 ** 8:08d}",
+        "real_name_first": "Load",
+        "real_name_last": "Test",
+        "role": "worker",
+    }, timeout=INTEL_TIMEOUT)
+    return resp.json().get("token")
+
+
+class Recorder:
+    """Thread-safe sample sink, bucketed by the stage that was active."""
+
+    def __init__(self):
+        self.stage = 0
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, ms, ok):
+        with self._lock:
+            self.samples.append((self.stage, endpoint, ms, ok))
+
+    def take(self, stage):
+        with self._lock:
+            return [s for s in self.samples if s[0] == stage]
+
+
+class Device(threading.Thread):
+
+    def __init__(self, args, zips, weights, langs, lang_weights, token, recorder, stop, rng):
+        super().__init__(daemon=True)
+        self.args = args
+        self.zip = rng.choices(zips, weights)[0]
+        self.lang = rng.choices(langs, lang_weights)[0]
+        self.device_id = f"load_{uuid.uuid4().hex[:10]}"
+        self.token = token
+        self.recorder = recorder
+        self.stop = stop
+        self.rng = rng
+        self.session = requests.Session()
+
+    def _get(self, endpoint, path, timeout, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(f"{self.args.base_url}{path}", timeout=timeout, **kwargs)
+            ok = resp.status_code == 200
+        except requests.RequestException:
+            resp, ok = None, False
+        self.recorder.add(endpoint, (time.perf_counter() - start) * 1000, ok)
+        return resp
+
+    def _fetch_intel(self):
+        params = {'zip': self.zip['zip'], 'country': 'TH', 'lang': self.lang, 'device_id': self.device_id}
+        started = time.perf_counter()
+        next_intel = next_status = started
+        while not self.stop.is_set() and time.perf_counter() - started < MAX_CALCULATING_SECONDS:
+            now = time.perf_counter()
+            if now >= next_intel:
+                resp = self._get('intel', '/intel', INTEL_TIMEOUT, params=params)
+                status = None
+                if resp is not None and resp.status_code == 200:
+                    status = resp.json().get('status')
+                if status != 'calculating':
+                    if status == 'success':
+                        self.recorder.add('time_to_intel', (time.perf_counter() - started) * 1000, True)
+                    return
+                next_intel = time.perf_counter() + INTEL_RETRY_SECONDS
+            if now >= next_status:
+                self._get('intel_status', '/intel/status', STATUS_TIMEOUT)
+                next_status = time.perf_counter() + STATUS_POLL_SECONDS
+            self.stop.wait(max(0.0, min(next_intel, next_status) - time.perf_counter()))
+
+    def _search_jobs(self):
+        params = {'lat': self.zip['lat'], 'lon': self.zip['lon'], 'radius_km': 50}
+        if self.rng.random() < 0.5:
+            params['category'] = self.rng.choice(JOB_CATEGORIES)
+        self._get('jobs_search', '/api/jobs_v2/listings/search', INTEL_TIMEOUT, params=params,
+                  headers={'Authorization': f"Bearer {self.token}"})
+
+    def run(self):
+        # Stagger start so a new stage does not arrive as one synchronized burst
+        self.stop.wait(self.rng.uniform(0, STATUS_POLL_SECONDS))
+        while not self.stop.is_set():
+            self._fetch_intel()
+            if self.token and self.rng.random() < self.args.jobs_ratio:
+                self._search_jobs()
+            self.stop.wait(self.rng.uniform(0.5, 1.5) * self.args.refresh_seconds)
+
+
+# --- STAGES ---
+
+def summarize_stage(samples, seconds):
+    by_endpoint = {}
+    for _, endpoint, ms, ok in samples:
+        entry = by_endpoint.setdefault(endpoint, ([], [0]))
+        entry[0].append(ms)
+        if not ok:
+            entry[1][0] += 1
+    return {name: harness.summarize(ms, errs[0], seconds) for name, (ms, errs) in by_endpoint.items()}
+
+
+def saturation_reason(stage, previous, args):
+    requests_total = sum(s['count'] for n, s in stage['endpoints'].items() if n != 'time_to_intel')
+    errors = sum(s['errors'] for n, s in stage['endpoints'].items() if n != 'time_to_intel')
+    if requests_total and errors / requests_total > args.max_error_rate:
+        return f"error rate {errors / requests_total:.1%} > {args.max_error_rate:.1%}"
+    for name in ('intel', 'intel_status', 'jobs_search'):
+        s = stage['endpoints'].get(name)
+        if s and s['p95_ms'] > args.slo_p95_ms:
+            return f"{name} p95 {s['p95_ms']:.0f}ms > {args.slo_p95_ms:.0f}ms"
+    if previous and stage['devices'] >= previous['devices'] * 1.5:
+        if stage['throughput_rps'] < previous['throughput_rps'] * 1.1:
+            return (f"throughput flat ({previous['throughput_rps']:.1f} -> {stage['throughput_rps']:.1f} rps) "
+                    f"while devices grew {previous['devices']} -> {stage['devices']}")
+    return None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    zips, weights = weighted_zips(args.zips, args.proximity_scale_km, args.seed)
+    langs, lang_weights = parse_mix(args.lang_mix)
+    stages = [int(s) for s in args.stages.split(',') if s.strip()]
+
+    token = args.jobs_token
+    if not token and args.jobs_ratio > 0:
+        try:
+            token = register_jobs_worker(args.base_url)
+        except Exception as e:
+            print(f"[!] Jobs worker registration failed ({e}); skipping jobs searches")
+
+    recorder = Recorder()
+    stop = threading.Event()
+    devices = []
+    report = {"meta": harness.build_meta(args), "stages": [], "saturation": None}
+
+    try:
+        for index, target in enumerate(stages):
+            recorder.stage = index
+            while len(devices) < target:
+                d = Device(args, zips, weights, langs, lang_weights, token, recorder, stop,
+                           random.Random(rng.random()))
+                d.start()
+                devices.append(d)
+            print(f">> [LOAD] Stage {index + 1}/{len(stages)}: {target} devices for {args.stage_seconds:.0f}s")
+            time.sleep(args.stage_seconds)
+
+            endpoints = summarize_stage(recorder.take(index), args.stage_seconds)
+            stage = {
+                "devices": target,
+                "throughput_rps": round(sum(
+                    s['throughput_rps'] for n, s in endpoints.items() if n != 'time_to_intel'), 2),
+                "endpoints": endpoints,
+            }
+            report["stages"].append(stage)
+            previous = report["stages"][-2] if len(report["stages"]) > 1 else None
+            reason = saturation_reason(stage, previous, args)
+            for name, s in sorted(endpoints.items()):
+                print(f"   {name:<14} n={s['count']:<6} err={s['errors']:<4} "
+                      f"p50={s['p50_ms']:.0f} p95={s['p95_ms']:.0f} p99={s['p99_ms']:.0f}ms")
+            if reason and not report["saturation"]:
+                report["saturation"] = {"devices": target, "reason": reason}
+                print(f"[!] Saturated at {target} devices: {reason}")
+    finally:
+        stop.set()
+
+    if not report["saturation"]:
+        print(">> [LOAD] No saturation within the configured stages")
+    print(f"\n>> [LOAD] Report: {harness.write_report(report, args.out, prefix='load-')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: benchmarks/run_benchmarks.py
+# ROLE:   END-TO-END BENCHMARKS FOR THE INTEL REQUEST PATH (STANDALONE RUNNER)
+# ==============================================================================
+#
+# Usage (from "Server Backend"):
+#   python benchmarks/run_benchmarks.py --mongomock
+#   python benchmarks/run_benchmarks.py --requests 500 --concurrency 16 --compare benchmarks/results/<old>.json
+#
+# Drives the real URLconf through Django's test Client (middleware included)
+# with the fake model backend, and writes p50/p95/p99 + throughput per scenario
+# to benchmarks/results/<timestamp>-<commit>.json.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Sentinel intel path benchmarks")
+    p.add_argument('--mongomock', action='store_true', help="In-memory Mongo (no server needed; no geo or text queries)")
+    p.add_argument('--requests', type=int, default=200, help="Requests per scenario")
+    p.add_argument('--concurrency', type=int, default=8, help="Client threads per scenario")
+    p.add_argument('--zips', type=int, default=50, help="Zips per intel bucket (fresh / stale / miss)")
+    p.add_argument('--news', type=int, default=2000, help="news_index documents to seed")
+    p.add_argument('--employers', type=int, default=200)
+    p.add_argument('--posts', type=int, default=3000, help="jobs_posts documents to seed")
+    p.add_argument('--missions', type=int, default=3, help="Cold /intel requests polled to completion (0 = skip)")
+    p.add_argument('--mission-timeout', type=float, default=120.0)
+    p.add_argument('--only', default='', help="Comma-separated scenario names")
+    p.add_argument('--out', default=None, help="Report path (default: benchmarks/results/)")
+    p.add_argument('--compare', default=None, help="Previous report to diff p95 against")
+    p.add_argument('--keep-data', action='store_true', help="Do not purge seeded documents afterwards")
+    p.add_argument('--verbose', action='store_true', help="Show server-side prints")
+    p.add_argument('--seed', type=int, default=42)
+    return p.parse_args(argv)
+
+
+def quiet(verbose):
+    # The views print per request; keep the benchmark output readable
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+# --- SCENARIOS ---
+
+def json_status(response, expected):
+    return response.status_code == 200 and json.loads(response.content).get('status') == expected
+
+
+def get_scenario(path, params_for, expected='success'):
+    from django.test import Client
+
+    def make_worker():
+        client = Client()
+
+        def call(i):
+            return json_status(client.get(path, params_for(i)), expected)
+        return call
+    return make_worker
+
+
+def threat_map_scenario():
+    # @login_required view: call it directly with an authenticated (unsaved)
+    # staff user instead of going through the 2FA login flow.
+    from django.contrib.auth.models import User
+    from django.test import RequestFactory
+    import portal_views
+
+    user = User(username='bench', is_staff=True, is_superuser=True)
+
+    def make_worker():
+        factory = RequestFactory()
+
+        def call(i):
+            request = factory.get('/api/admin/threats')
+            request.user = user
+            return portal_views.api_get_threats(request).status_code == 200
+        return call
+    return make_worker
+
+
+def jobs_search_scenario(zips, rng_seed, geo):
+    from django.test import Client
+    from jobs_v2.views.auth import generate_token
+    from seed import BENCH_WORKER_ID, JOB_CATEGORIES
+
+    token = generate_token(BENCH_WORKER_ID)
+
+    def make_worker():
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        rng = random.Random(rng_seed)
+
+        def call(i):
+            z = zips[i % len(zips)]
+            # mongomock has no $geoNear, so in-memory runs search by category only
+            params = {'lat': z['lat'], 'lon': z['lon'], 'radius_km': 50} if geo else {}
+            if i % 2 or not geo:
+                params['category'] = rng.choice(JOB_CATEGORIES)
+            r = client.get('/api/jobs_v2/listings/search', params)
+            return r.status_code == 200
+        return call
+    return make_worker
+
+
+def jobs_login_scenario():
+    # Every call verifies the bench worker's password at the configured cost,
+    # through the hashing pool (core/passwords.py); a saturated pool answers 503
+    from django.test import Client
+    from seed import BENCH_PASSWORD, BENCH_WORKER_EMAIL
+
+    body = json.dumps({'email': BENCH_WORKER_EMAIL, 'password': BENCH_PASSWORD})
+
+    def make_worker():
+        client = Client()
+
+        def call(i):
+            r = client.post('/api/jobs_v2/auth/login', body, content_type='application/json')
+            return r.status_code == 200
+        return call
+    return make_worker
+
+
+def build_scenarios(fresh, stale, miss, args):
+    topics = ["Military Update", "Political Update", "border shelling", "drone sighting", "evacuation order"]
+    if args.mongomock:
+        # mongomock has no $text, so in-memory runs take the latest-news path
+        topics = [""]
+    return {
+        "intel_hit_en": get_scenario('/intel', lambda i: {'zip': fresh[i % len(fresh)]['zip'], 'lang': 'en'}),
+        "intel_hit_th": get_scenario('/intel', lambda i: {'zip': fresh[i % len(fresh)]['zip'], 'lang': 'th'}),
+        "intel_stale": get_scenario('/intel', lambda i: {'zip': stale[i % len(stale)]['zip']}, 'calculating'),
+        "intel_miss": get_scenario('/intel', lambda i: {'zip': miss[i % len(miss)]['zip']}, 'calculating'),
+        "intel_status": get_scenario('/intel/status', lambda i: {}),
+        "intel_citations": get_scenario('/intel/citations', lambda i: {'topic': topics[i % len(topics)]}),
+        "portal_threat_map": threat_map_scenario(),
+        "jobs_search": jobs_search_scenario(fresh, args.seed, geo=not args.mongomock),
+        "jobs_login": jobs_login_scenario(),
+    }
+
+
+def run_missions(zips, timeout):
+    """Cold /intel request polled until the mission (fake LLM) lands in intel_history."""
+    from django.test import Client
+
+    def one(z):
+        client = Client()
+        start = time.perf_counter()
+        client.get('/intel', {'zip': z['zip']})
+        while time.perf_counter() - start < timeout:
+            if json_status(client.get('/intel', {'zip': z['zip']}), 'success'):
+                return (time.perf_counter() - start) * 1000, True
+            time.sleep(0.25)
+        return (time.perf_counter() - start) * 1000, False
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(len(zips), 1)) as pool:
+        results = list(pool.map(one, zips))
+    return harness.summarize(
+        [ms for ms, _ in results],
+        sum(1 for _, ok in results if not ok),
+        time.perf_counter() - wall_start,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    harness.bootstrap(args.mongomock)
+
+    import seed as benchmarks_seed
+    from core import views
+    from core.db_utils import get_db_handle
+    from core.llm_client import get_llm_metrics
+    from jobs_v2.models import JobsDB
+
+    rng = random.Random(args.seed)
+    zips = benchmarks_seed.load_zips(args.zips * 3 + args.missions, seed=args.seed)
+    fresh = zips[:args.zips]
+    stale = zips[args.zips:args.zips * 2]
+    miss = zips[args.zips * 2:args.zips * 3]
+    mission_zips = zips[args.zips * 3:]
+
+    db = get_db_handle()
+    jobs_db = JobsDB._db()
+    print(f">> [BENCH] Seeding {len(fresh)} fresh / {len(stale)} stale intel docs, "
+          f"{args.news} news, {args.posts} job posts...")
+    benchmarks_seed.seed_intel(db, fresh, stale, rng)
+    benchmarks_seed.seed_news(db, args.news, rng)
+    benchmarks_seed.seed_jobs(jobs_db, fresh, args.employers, args.posts, rng)
+
+    # Stale / miss scenarios time the request path only: claim their zips so
+    # no background missions start (those are measured separately below).
+    for z in stale + miss:
+        views.MISSION_QUEUE[z['zip']] = time.time()
+
+    scenarios = build_scenarios(fresh, stale, miss, args)
+    only = {s.strip() for s in args.only.split(',') if s.strip()}
+    report = {"meta": harness.build_meta(args), "scenarios": {}}
+
+    try:
+        for name, make_worker in scenarios.items():
+            if only and name not in only:
+                continue
+            print(f">> [BENCH] {name} ({args.requests} req x {args.concurrency} threads)")
+            with quiet(args.verbose):
+                report["scenarios"][name] = harness.run_scenario(make_worker, args.requests, args.concurrency)
+
+        if args.missions and (not only or 'mission_e2e' in only):
+            print(f">> [BENCH] mission_e2e ({len(mission_zips)} concurrent cold requests)")
+            with quiet(args.verbose):
+                report["scenarios"]["mission_e2e"] = run_missions(mission_zips, args.mission_timeout)
+    finally:
+        for z in stale + miss:
+            views.MISSION_QUEUE.pop(z['zip'], None)
+        if not args.keep_data:
+            benchmarks_seed.purge(db, jobs_db)
+            for z in mission_zips:
+                db.intel_history.delete_one({'zip_code': z['zip']})
+
+    report["llm"] = get_llm_metrics()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    harness.print_table(report, baseline)
+    print(f"\n>> [BENCH] Report: {harness.write_report(report, args.out)}")
+
+
+if __name__ == '__main__':
+    main()
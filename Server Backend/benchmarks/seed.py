@@ -0,0 +1,201 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: benchmarks/seed.py
+# ROLE:   REALISTIC FIXTURES FOR intel_history, news_index AND JOBS v2
+# ==============================================================================
+#
+# Every seeded document carries "bench": True so purge() can remove it again.
+# Against a real Mongo this still overwrites intel_history for the seeded zips:
+# point MONGO_HOST / MONGO_URI at a disposable instance.
+
+import csv
+import datetime
+import hashlib
+import json
+import os
+import random
+import time
+
+from harness import SERVER_DIR
+
+CSV_FILE_PATH = os.path.join(SERVER_DIR, 'Developer Inputs', 'thailand_postal_codes_complete.csv')
+NEWS_TOPICS = ["border shelling", "troop movement", "drone sighting", "ceasefire talks",
+               "evacuation order", "market closure", "checkpoint reinforcement"]
+JOB_CATEGORIES = ["labor", "medical", "logistics", "security", "cleanup", "cooking"]
+
+
+def load_zips(limit, seed=7):
+    """Distinct (zip, province, district, lat, lon) rows from the postal CSV."""
+    rows = {}
+    with open(CSV_FILE_PATH, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            code = row.get('POSTAL_CODE')
+            if code and code not in rows:
+                rows[code] = {
+                    "zip": code,
+                    "province": row.get('PROVINCE_ENGLISH', ''),
+                    "district": row.get('DISTRICT_ENGLISH', ''),
+                    "lat": float(row.get('LATITUDE') or 0),
+                    "lon": float(row.get('LONGITUDE') or 0),
+                }
+    zips = sorted(rows.values(), key=lambda r: r["zip"])
+    random.Random(seed).shuffle(zips)
+    return zips[:limit]
+
+
+def _intel_doc(z, age_hours, langs, rng):
+    from core.llm_fake import build_response
+
+    prompt = (f"SENTINEL-01 TARGET_LOCATION: {z['province']}, {z['district']} "
+              f"(Lat: {z['lat']}, Lon: {z['lon']}) CURRENT_DATE: {datetime.date.today()}")
+    intel = json.loads(build_response("analyst", prompt, rng))
+
+    # Same post-processing shape run_mission_logic stores
+    intel['summary'] = [f"**{e['topic']}**: {e['summary']}" for e in intel['sitrep_entries']]
+    tm = intel.pop('tactical_map')
+    intel['roads_to_avoid'] = tm['roads_to_avoid']
+    intel['emergency_avoid_locations'] = tm['danger_zones']
+    intel['summary'].insert(0, f"ASSESSMENT: {intel.pop('defcon_justification')}")
+    intel['is_certified'] = True
+    intel['user_location'] = {'lat': z['lat'], 'lon': z['lon']}
+    intel['zip_code'] = z['zip']
+    intel['location_name'] = f"{z['province']}, {z['district']}"
+    intel['location_geo'] = {"type": "Point", "coordinates": [z['lon'], z['lat']]}
+    intel['last_updated'] = datetime.datetime.utcnow().isoformat()
+
+    languages = {'en': intel}
+    for lang in langs:
+        languages[lang] = intel
+    return {
+        'zip_code': z['zip'],
+        'country': 'TH',
+        'timestamp': (datetime.datetime.now() - datetime.timedelta(hours=age_hours)).isoformat(),
+        'location_geo': intel['location_geo'],
+        'languages': languages,
+        'bench': True,
+    }
+
+
+def seed_intel(db, fresh_zips, stale_zips, rng):
+    from core.intel_summary import sync_read_models
+
+    col = db.intel_history
+    for zips, age_hours, langs in ((fresh_zips, 1, ['th']), (stale_zips, 48, [])):
+        for z in zips:
+            doc = _intel_doc(z, age_hours, langs, rng)
+            col.replace_one({'zip_code': z['zip']}, doc, upsert=True)
+            sync_read_models(db, doc)
+    db.system_status.replace_one(
+        {"_id": "global_status"},
+        {"current_stage": "Done", "progress_percent": 100, "last_updated": time.time()},
+        upsert=True,
+    )
+
+
+def seed_news(db, count, rng):
+    now = datetime.datetime.utcnow()
+    docs = []
+    for n in range(count):
+        topic = rng.choice(NEWS_TOPICS)
+        url = f"http://localhost/bench/news/{n}"
+        title = f"{topic.title()} reported near {rng.choice(['Aranyaprathet', 'Surin', 'Sisaket', 'Trat'])} #{n}"
+        published = now - datetime.timedelta(minutes=rng.randint(0, 96 * 60))
+        docs.append({
+            "content_hash": hashlib.sha256(f"{title.lower()}|{url}".encode()).hexdigest(),
+            "link_hash": hashlib.md5(url.encode()).hexdigest(),
+            "url": url,
+            "title": title,
+            "summary": f"Synthetic article on {topic} for benchmarking.",
+            "source": rng.choice(["Reuters", "Bangkok Post", "Khmer Times", "AP"]),
+            "published_parsed": published,
+            "published_day": published.strftime('%Y-%m-%d'),
+            "ingested_at": now.timestamp(),
+            "created_at": now,
+            "bench": True,
+        })
+    if docs:
+        db.news_index.insert_many(docs)
+
+
+BENCH_WORKER_ID = "usr_bench_worker"
+BENCH_WORKER_EMAIL = "bench-worker@example.invalid"
+BENCH_PASSWORD = "bench-password"
+
+
+def seed_jobs(jobs_db, zips, employers, posts, rng):
+    """Employers + listings around the seeded zips, plus BENCH_WORKER_ID to search / log in as."""
+    from core.geo_cells import geohash
+    from core.passwords import hash_password
+    from jobs_v2.models import SEARCH_CELL_PRECISION
+
+    now = datetime.datetime.utcnow()
+    employer_ids = []
+    users = [{
+        "account_id": BENCH_WORKER_ID,
+        "role": "worker",
+        "status": "active",
+        "email": BENCH_WORKER_EMAIL,
+        "phone_e164": "+66900009999",
+        "password_hash": hash_password(BENCH_PASSWORD),  # At the configured cost
+        "real_name_first": "Bench",
+        "real_name_last": "Worker",
+        "trust_score": 50,
+        "bench": True,
+    }]
+    for n in range(employers):
+        account_id = f"usr_bench{n:05d}"
+        employer_ids.append(account_id)
+        users.append({
+            "account_id": account_id,
+            "role": "employer",
+            "status": "active",
+            "email": f"bench{n}@example.invalid",
+            "phone_e164": f"+6690000{n:04d}",
+            "real_name_first": "Bench",
+            "real_name_last": f"Employer{n}",
+            "organization": {"name": f"Bench Org {n}"} if n % 2 else {},
+            "rating_score": round(rng.uniform(3, 5), 1),
+            "review_count": rng.randint(0, 200),
+            "trust_score": 50,
+            "bench": True,
+        })
+    if users:
+        jobs_db.jobs_users.insert_many(users)
+
+    docs = []
+    for n in range(posts):
+        z = rng.choice(zips)
+        lat = z['lat'] + rng.uniform(-0.2, 0.2)
+        lon = z['lon'] + rng.uniform(-0.2, 0.2)
+        docs.append({
+            "job_id": f"job_bench{n:06d}",
+            "employer_id": rng.choice(employer_ids),
+            "status": "active",
+            "category": rng.choice(JOB_CATEGORIES),
+            "pay_type": "daily",
+            "pay_range": {"min": 300, "max": 600, "currency": "THB"},
+            "start_time": now.isoformat(),
+            "duration": "1 day",
+            "description": "Synthetic listing for benchmarking.",
+            "location": {"type": "Point", "coordinates": [lon, lat]},
+            "geo_cell": geohash(lat, lon, SEARCH_CELL_PRECISION),
+            "display_location": {"lat": round(lat, 2), "lon": round(lon, 2)},
+            "moderation_state": "clean",
+            "report_count": 0,
+            "created_at": now - datetime.timedelta(minutes=n),
+            "bench": True,
+        })
+    if docs:
+        jobs_db.jobs_posts.insert_many(docs)
+
+
+def purge(db, jobs_db):
+    from core.intel_summary import refresh_read_models
+
+    zips = [doc['zip_code'] for doc in db.intel_history.find({"bench": True}, {"zip_code": 1})]
+    for col in (db.intel_history, db.news_index):
+        col.delete_many({"bench": True})
+    for zip_code in zips:
+        refresh_read_models(db, zip_code)
+    for col in (jobs_db.jobs_users, jobs_db.jobs_posts):
+        col.delete_many({"bench": True})
@@ -0,0 +1,158 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: approvals.py
+# ROLE:   DEFCON 1 REVIEW QUEUE (review_state + CLAIM/LEASE FOR REVIEWERS)
+# ==============================================================================
+#
+# A mission that downgrades DEFCON 1 to 2 writes `review_state: "pending"` on
+# its intel_history doc. sync_approval() (called from
+# intel_summary.sync_read_models) mirrors pending reports into
+# `approval_queue`. Reviewers claim an entry for APPROVAL_LEASE_SECONDS, and
+# an expired claim is free again. decide() updates the report with targeted
+# $set/$pull/$push writes and removes the queue entry.
+
+import datetime
+
+from pymongo import ASCENDING, ReturnDocument
+
+QUEUE_COLLECTION = "approval_queue"
+APPROVAL_LEASE_SECONDS = 300
+
+PENDING = "pending"
+APPROVED = "approved"
+REJECTED = "rejected"
+
+PENDING_MARKER = "PENDING HUMAN VERIFICATION"
+
+# action -> (review_state, defcon_status, summary banner)
+DECISIONS = {
+    "APPROVE": (APPROVED, 1, "** COMMAND VERIFIED: WAR IMMINENT **"),
+    "REJECT": (REJECTED, 3, "** ALERT DISMISSED BY COMMAND **"),
+}
+
+
+class ClaimConflict(Exception):
+    """The entry is leased to another reviewer."""
+
+
+def ensure_approval_indexes(db):
+    db.intel_history.create_index(
+        [("review_state", ASCENDING)], name="review_state",
+        partialFilterExpression={"review_state": {"$exists": True}},
+    )
+    db[QUEUE_COLLECTION].create_index([("lease_expires_at", ASCENDING), ("enqueued_at", ASCENDING)],
+                                      name="lease_enqueued")
+
+
+def is_pending(doc):
+    """review_state, or the legacy summary banner for reports written before it existed."""
+    state = doc.get('review_state')
+    if state is not None:
+        return state == PENDING
+    summary = doc.get('languages', {}).get('en', {}).get('summary', []) or []
+    return any(PENDING_MARKER in s for s in summary if isinstance(s, str))
+
+
+def sync_approval(db, doc):
+    """Adds a pending report to the queue (keeping any live claim) or drops a resolved one."""
+    col = db[QUEUE_COLLECTION]
+    zip_code = doc['zip_code']
+    if not is_pending(doc):
+        col.delete_one({"_id": zip_code})
+        return
+    en = doc.get('languages', {}).get('en', {})
+    summary = en.get('summary', []) or []
+    col.update_one({"_id": zip_code}, {
+        "$set": {
+            "location_name": en.get('location_name', 'Unknown'),
+            "headline": summary[0] if summary else "",
+            "timestamp": doc.get('timestamp'),
+        },
+        "$setOnInsert": {
+            "zip_code": zip_code,
+            "enqueued_at": datetime.datetime.utcnow(),
+            "claimed_by": None,
+            "lease_expires_at": datetime.datetime.min,
+        },
+    }, upsert=True)
+
+
+def list_queue(db):
+    entries = list(db[QUEUE_COLLECTION].find({}, {"_id": 0}).sort("enqueued_at", ASCENDING))
+    now = datetime.datetime.utcnow()
+    for e in entries:
+        if e.get('lease_expires_at') and e['lease_expires_at'] <= now:
+            e['claimed_by'] = None  # lease lapsed
+        e.pop('lease_expires_at', None)
+    return entries
+
+
+def claim(db, reviewer, zip_code=None):
+    """
+    Leases `zip_code` (or the oldest free entry) to `reviewer`; a reviewer may
+    renew their own claim. Returns the entry, or None if nothing is free.
+    """
+    now = datetime.datetime.utcnow()
+    query = {"$or": [{"lease_expires_at": {"$lte": now}}, {"claimed_by": reviewer}]}
+    if zip_code:
+        query["_id"] = zip_code
+    return db[QUEUE_COLLECTION].find_one_and_update(
+        query,
+        {"$set": {"claimed_by": reviewer,
+                  "lease_expires_at": now + datetime.timedelta(seconds=APPROVAL_LEASE_SECONDS)}},
+        sort=[("enqueued_at", ASCENDING)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def release(db, reviewer, zip_code):
+    return db[QUEUE_COLLECTION].update_one(
+        {"_id": zip_code, "claimed_by": reviewer},
+        {"$set": {"claimed_by": None, "lease_expires_at": datetime.datetime.min}},
+    ).modified_count == 1
+
+
+def decide(db, reviewer, zip_code, action):
+    """
+    Applies APPROVE / REJECT to a pending report. Claims the entry first, so a
+    decision on an item leased to someone else raises ClaimConflict.
+    Returns False if the report is not pending.
+    """
+    review_state, defcon, banner = DECISIONS[action]
+    if db[QUEUE_COLLECTION].count_documents({"_id": zip_code}) and not claim(db, reviewer, zip_code):
+        raise ClaimConflict(zip_code)
+
+    # Legacy reports carry only the banner, so match on either
+    pending = {"zip_code": zip_code, "$or": [
+        {"review_state": PENDING},
+        {"review_state": {"$exists": False}, "languages.en.summary": {"$regex": PENDING_MARKER}},
+    ]}
+    result = db.intel_history.update_one(pending, {
+        "$set": {
+            "review_state": review_state,
+            "reviewed_by": reviewer,
+            "reviewed_at": datetime.datetime.utcnow(),
+            "languages.en.defcon_status": defcon,
+        },
+        "$pull": {"languages.en.summary": {"$regex": "PENDING"}},
+    })
+    if not result.matched_count:
+        db[QUEUE_COLLECTION].delete_one({"_id": zip_code})
+        return False
+    # $push cannot share an update with the $pull on the same array
+    db.intel_history.update_one(
+        {"zip_code": zip_code},
+        {"$push": {"languages.en.summary": {"$each": [banner], "$position": 0}}},
+    )
+    db[QUEUE_COLLECTION].delete_one({"_id": zip_code})
+    return True
+
+
+def backfill_review_state(db):
+    """One-off: tags legacy banner-only pending reports and queues every pending report."""
+    legacy = {"review_state": {"$exists": False}, "languages.en.summary": {"$regex": PENDING_MARKER}}
+    tagged = db.intel_history.update_many(legacy, {"$set": {"review_state": PENDING}}).modified_count
+    for doc in db.intel_history.find({"review_state": PENDING}, {"zip_code": 1, "timestamp": 1, "languages.en": 1}):
+        sync_approval(db, doc)
+    return tagged
@@ -0,0 +1,65 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: card_cache.py
+# ROLE:   BATCHED, SHORT-TTL LOOKUP OF SMALL PER-ACCOUNT "CARDS"
+# ==============================================================================
+#
+# List endpoints decorate each row with a few fields of another document (the
+# employer's name and rating on a job listing). CardCache collects the ids of a
+# page, serves what it holds from memory, and loads the rest with one batched
+# call, so the cost of a page no longer grows with one lookup per row.
+# Per-process; entries go stale for at most `ttl_seconds` (0 disables caching,
+# the batched load still applies).
+
+import threading
+import time
+
+
+class CardCache:
+
+    def __init__(self, load_many, ttl_seconds=30, max_entries=5000):
+        """`load_many(ids)` -> {id: card} for the ids it found."""
+        self.load_many = load_many
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}  # id -> (expires_at, card or None)
+        self._lock = threading.Lock()
+
+    def get_many(self, ids):
+        """{id: card} for the distinct, non-empty ids; ids with no document are omitted."""
+        wanted = [i for i in dict.fromkeys(ids) if i]
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for i in wanted:
+                entry = self._entries.get(i)
+                if entry and entry[0] > now:
+                    if entry[1] is not None:
+                        found[i] = entry[1]
+                else:
+                    missing.append(i)
+
+        if missing:
+            loaded = self.load_many(missing)
+            found.update(loaded)
+            if self.ttl_seconds > 0:
+                expires = now + self.ttl_seconds
+                with self._lock:
+                    if len(self._entries) + len(missing) > self.max_entries:
+                        self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                        if len(self._entries) + len(missing) > self.max_entries:
+                            self._entries.clear()
+                    for i in missing:
+                        # Unknown ids are cached too, so deleted accounts don't re-query every page
+                        self._entries[i] = (expires, loaded.get(i))
+        return found
+
+    def get(self, card_id):
+        return self.get_many([card_id]).get(card_id)
+
+    def invalidate(self, card_id=None):
+        with self._lock:
+            if card_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(card_id, None)
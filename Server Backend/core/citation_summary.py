@@ -0,0 +1,146 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: citation_summary.py
+# ROLE:   CACHED SITREP DETAIL SUMMARIES FOR /intel/citations
+# ==============================================================================
+#
+# Key = normalized topic + hash of the cited source URLs, so new news yields a
+# new key by itself. Entries live in `citation_summaries` until the earlier of
+# CITATION_SUMMARY_TTL_SECONDS or the oldest cited article leaving the
+# citation window (TTL index on `expires_at`). Concurrent misses for one key
+# share a single model call, across workers too (core/singleflight.py);
+# missions precompute their sitrep topics on a small background pool.
+
+import datetime
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .llm_client import get_client
+from .news_store import CITATION_WINDOW_HOURS, find_citations
+from .retention import utc_now
+from .singleflight import SingleFlightPending, coalesce
+from .tracing import span
+
+SUMMARY_COLLECTION = "citation_summaries"
+SUMMARY_LEASE_SECONDS = 120
+SUMMARY_WAIT_SECONDS = 10  # Followers give up before the app's 15s request timeout
+PRECOMPUTE_WORKERS = 2
+
+# Background precompute, so missions don't wait on up to one model call per topic
+_PRECOMPUTE_POOL = ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="citation-precompute")
+
+# Faster model for detail summaries
+CITATION_MODEL = get_client("gemini-1.5-flash-8b")
+
+
+def normalize_topic(topic):
+    return " ".join((topic or "").lower().split())
+
+
+def summary_key(topic, docs):
+    urls = sorted(d.get('url', '') for d in docs)
+    digest = hashlib.sha1("\n".join(urls).encode('utf-8')).hexdigest()[:16]
+    return f"{normalize_topic(topic)}|{digest}"
+
+
+def ensure_summary_indexes(db):
+    db[SUMMARY_COLLECTION].create_index("expires_at", expireAfterSeconds=0, name="ttl_expires_at")
+
+
+def _expires_at(docs, now):
+    expires = now + datetime.timedelta(seconds=settings.CITATION_SUMMARY_TTL_SECONDS)
+    published = [d['published_parsed'] for d in docs if d.get('published_parsed')]
+    if published:
+        expires = min(expires, min(published) + datetime.timedelta(hours=CITATION_WINDOW_HOURS))
+    return expires
+
+
+def synthesize(topic, docs):
+    """One model call; returns the report body (without TYPE/DATE header) or None."""
+    news_context = "\n".join(
+        f"- {d.get('title', 'Unknown Title')} ({d.get('source', 'Unknown')}): {d.get('summary', '')}" for d in docs
+    )
+    prompt = f"""
+    Topic: {topic}
+    News Context:
+    {news_context}
+    Task: Synthesize a DETAILED Military Intelligence SITREP.
+
+    STRICT FORMATTING RULES:
+    You must output the report EXACTLY in this format:
+
+    **SUMMARY:**
+    [Your detailed summary here. EVERY sentence or claim MUST be followed by the source in brackets, e.g., (Source: Reuters)].
+
+    REQUIREMENTS:
+    - Do NOT include Type or Date headers. I will add them.
+    - Ensure citation links match the provided news context.
+    - Keep it under 200 words.
+    """
+    with span("citations.synthesize"):
+        response = CITATION_MODEL.generate(prompt)
+    if response.text:
+        return response.text.replace('```', '').strip()
+    return None
+
+
+def get_summary(db, topic, docs):
+    """
+    Cached report body for (topic, docs); computes it on a miss. None when
+    there is nothing to cite. Raises SingleFlightPending while another caller
+    is still computing it.
+    """
+    if not docs:
+        return None
+    key = summary_key(topic, docs)
+    col = db[SUMMARY_COLLECTION]
+    now = utc_now()
+
+    cached = col.find_one({"_id": key, "expires_at": {"$gt": now}}, {"text": 1})
+    if cached:
+        return cached["text"]
+
+    def compute():
+        text = synthesize(normalize_topic(topic), docs)
+        if text:
+            col.replace_one({"_id": key}, {
+                "text": text,
+                "topic": normalize_topic(topic),
+                "created_at": now,
+                "expires_at": _expires_at(docs, now),
+            }, upsert=True)
+        return text
+
+    return coalesce(f"citations:{key}", compute, lease_seconds=SUMMARY_LEASE_SECONDS, db=db,
+                    wait_seconds=SUMMARY_WAIT_SECONDS)
+
+
+def precompute(db, topics):
+    """Warms the cache for each topic's current citation set (called when a mission completes)."""
+    warmed = 0
+    for topic in dict.fromkeys(normalize_topic(t) for t in topics):
+        try:
+            if get_summary(db, topic, find_citations(db, topic, limit=10)):
+                warmed += 1
+        except SingleFlightPending:
+            pass  # Someone else is already warming it
+        except Exception as e:
+            print(f"[!] Citation Precompute Error ({topic}): {e}")
+    return warmed
+
+
+def precompute_async(db, topics):
+    """Queues precompute() on the background pool; returns immediately."""
+    topics = [t for t in topics if t]
+    if topics:
+        _PRECOMPUTE_POOL.submit(_precompute_task, db, topics)
+
+
+def _precompute_task(db, topics):
+    try:
+        with span("citations.precompute"):
+            precompute(db, topics)
+    except Exception as e:
+        print(f"[!] Citation Precompute Error: {e}")
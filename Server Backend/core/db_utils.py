@@ -6,23 +6,35 @@
 
 from pymongo import MongoClient
 import sys
+import threading
+
+# One pooled client per process; MongoClient is thread-safe
+_client = None
+_client_lock = threading.Lock()
 
 def get_db_handle():
     """
     Establishes a connection to the local MongoDB instance.
+    The client is created (and pinged) on first use, then reused.
     """
+    global _client
+    if _client is not None:
+        return _client['sentinel_intel']
     try:
-        # FIX: Support Docker hostname via env var, default to localhost
-        import os
-        host = os.getenv('MONGO_HOST', 'localhost')
-        client = MongoClient(
-            host=host, 
-            port=27017, 
-            serverSelectionTimeoutMS=5000
-        )
-        # Test connection immediately
-        client.admin.command('ping')
-        return client['sentinel_intel']
+        with _client_lock:
+            if _client is None:
+                # FIX: Support Docker hostname via env var, default to localhost
+                import os
+                host = os.getenv('MONGO_HOST', 'localhost')
+                client = MongoClient(
+                    host=host,
+                    port=27017,
+                    serverSelectionTimeoutMS=5000
+                )
+                # Test connection immediately
+                client.admin.command('ping')
+                _client = client
+        return _client['sentinel_intel']
 
     except Exception as e:
         print("\n[!] CRITICAL DATABASE ERROR")
@@ -1,9 +1,10 @@
+import datetime
 import time
 import uuid
-import hashlib
 import json
 import os
 import google.generativeai as genai
+from dateutil import parser as date_parser
 from typing import List, Optional, Any
 from ..atlas_schema import (
     AtlasPacket, IdentityParameters, SourceContext, 
@@ -11,6 +12,9 @@ from ..atlas_schema import (
     IngestMethod, ProcessingStatus
 )
 from ..db_utils import get_db_handle
+from ..llm_client import get_client
+from ..news_store import build_index_doc
+from ..retention import utc_now
 
 # --- LOAD API KEY ---
 try:
@@ -39,10 +43,7 @@ class Gate1Ingest:
     
     def __init__(self, mode="LIVE"):
         self.mode = mode
-        try:
-            self.model = genai.GenerativeModel("models/gemini-2.5-flash-lite")
-        except:
-            self.model = genai.GenerativeModel("gemini-1.5-flash-8b")  # Fallback
+        self.model = get_client("models/gemini-2.5-flash-lite", fallback_model="gemini-1.5-flash-8b")
 
     def process_packet(
         self, 
@@ -70,6 +71,15 @@ class Gate1Ingest:
                 published_at = time.mktime(published_at)
             except:
                 published_at = time.time()
+        elif raw_input.get("published"):
+            # RSS / GDELT feeds only carry the date string
+            try:
+                parsed = date_parser.parse(raw_input["published"])
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+                published_at = parsed.timestamp()
+            except (ValueError, OverflowError):
+                published_at = None
         
         # 2. Generate Content Hash (Title + URL) for Dedup
         normalized_str = f"{title.strip().lower()}|{url.strip()}"
@@ -160,9 +170,7 @@ class Gate1Ingest:
         """
         
         try:
-            resp = self.model.generate_content(prompt)
-            data = json.loads(resp.text.replace('```json', '').replace('```', '').strip())
-            return data
+            return self.model.generate_json(prompt)
         except Exception as e:
             print(f"[GATE 1] AI Filter Error: {e}")
             # Fail-open for Tier 1 sources, fail-closed for others
@@ -173,13 +181,8 @@ class Gate1Ingest:
         
     def _persist_to_raw(self, packet: AtlasPacket):
         """Saves the full packet to the Raw News DB."""
-        raw_db.insert_one(packet.dict())
+        raw_db.insert_one({**packet.dict(), "created_at": utc_now()})  # TTL anchor
         
     def _update_index(self, packet: AtlasPacket):
-        """Updates the simplified index for fast dedup lookups."""
-        news_index.insert_one({
-            "content_hash": packet.identity.content_hash,
-            "link_hash": hashlib.md5(packet.identity.canonical_url.encode('utf-8')).hexdigest(),
-            "url": packet.identity.canonical_url,
-            "ingested_at": packet.identity.ingest_timestamp
-        })
+        """Updates the index used for dedup lookups and citations (core/news_store.py)."""
+        news_index.insert_one(build_index_doc(packet))
@@ -6,6 +6,7 @@ from ..atlas_schema import (
     AtlasPacket, ProcessingStatus, RiskDomain
 )
 from ..db_utils import get_db_handle
+from ..llm_client import get_client
 
 # --- LOAD API KEY (Replicating views.py logic) ---
 try:
@@ -28,10 +29,7 @@ class Gate2Base:
     """
 
     def __init__(self):
-        try:
-             self.model = genai.GenerativeModel("models/gemini-2.5-flash")
-        except:
-             self.model = genai.GenerativeModel("gemini-1.5-flash-8b") # Fallback
+        self.model = get_client("models/gemini-2.5-flash", fallback_model="gemini-1.5-flash-8b")
 
     def process_packet(self, packet: AtlasPacket) -> AtlasPacket:
         """
@@ -65,8 +63,7 @@ class Gate2Base:
         """
         
         try:
-            resp = self.model.generate_content(prompt)
-            data = json.loads(resp.text.replace('```json', '').replace('```', '').strip())
+            data = self.model.generate_json(prompt)
             
             # --- UPDATE PACKET ---
             packet.triage.validity_score = data.get('validity_score', 0)
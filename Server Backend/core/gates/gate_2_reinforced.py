@@ -5,6 +5,7 @@ from ..atlas_schema import (
     AtlasPacket, ProcessingStatus
 )
 from ..db_utils import get_db_handle
+from ..llm_client import get_client
 
 # --- API KEY ---
 try:
@@ -28,10 +29,7 @@ class Gate2Reinforced:
 
     def __init__(self):
         # Using a stronger model for disambiguation
-        try:
-             self.model = genai.GenerativeModel("models/gemini-3-flash-preview")
-        except:
-             self.model = genai.GenerativeModel("models/gemini-2.5-pro")
+        self.model = get_client("models/gemini-3-flash-preview", fallback_model="models/gemini-2.5-pro")
 
     def process_packet(self, packet: AtlasPacket) -> AtlasPacket:
         """
@@ -67,8 +65,7 @@ class Gate2Reinforced:
         """
         
         try:
-            resp = self.model.generate_content(prompt)
-            data = json.loads(resp.text.replace('```json', '').replace('```', '').strip())
+            data = self.model.generate_json(prompt)
             
             new_score = data.get('validity_score', 0)
             decision = data.get('final_decision', 'DROP')
@@ -0,0 +1,146 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: geo_cells.py
+# ROLE:   GEOHASH CELLS + PER-CELL CACHE OF SEARCHABLE LISTINGS
+# ==============================================================================
+#
+# Worker searches cluster around a few towns with the same radius. Listings
+# are bucketed by area cell (a geohash for jobs_v2 posts, the zip code for v1
+# listings). CellCache keeps each (cell, variant) bucket in memory, where the
+# variant is the category filter. A search gathers the cells covering its area
+# and filters and ranks them in memory. Only cells it doesn't already hold
+# are loaded, in one batched call. Writers invalidate the cell of the listing
+# they change. Per-process; other workers see a change within `ttl_seconds`
+# (0 disables caching).
+
+import math
+import threading
+import time
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_M = 6378100  # Same sphere as MongoDB's spherical $geoNear
+KM_PER_DEGREE = 111.2
+
+
+# --- GEOHASH ---
+
+def geohash(lat, lon, precision):
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = (ch << 1) | 1, mid
+            else:
+                ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = (ch << 1) | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(height, width) of a geohash cell in degrees."""
+    n = 5 * precision
+    return 180.0 / (1 << (n // 2)), 360.0 / (1 << ((n + 1) // 2))
+
+
+def covering_cells(lat, lon, radius_km, precision, max_cells=64):
+    """
+    Geohashes of every cell touching the bounding box of the circle, or None
+    when that takes more than `max_cells` (large radius, near the poles).
+    """
+    height, width = cell_size(precision)
+    dlat = radius_km / KM_PER_DEGREE
+    lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    widest = max(abs(lat_lo), abs(lat_hi))
+    if widest >= 89.0:
+        return None
+    dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+
+    rows = range(math.floor((lat_lo + 90) / height), math.floor((lat_hi + 90) / height) + 1)
+    cols = range(math.floor((lon - dlon + 180) / width), math.floor((lon + dlon + 180) / width) + 1)
+    if len(rows) * len(cols) > max_cells:
+        return None
+    n_cols = round(360 / width)
+    cells = []
+    for r in rows:
+        for c in cols:
+            # Encode each cell's centre; columns wrap at the antimeridian
+            cells.append(geohash(min(-90 + (r + 0.5) * height, 90.0),
+                                 -180 + ((c % n_cols) + 0.5) * width, precision))
+    return list(dict.fromkeys(cells))
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (haversine)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, h)))
+
+
+# --- CACHE ---
+
+class CellCache:
+
+    def __init__(self, load_cells, ttl_seconds=30, max_entries=2000):
+        """`load_cells(cells, variant)` -> {cell: [docs]}; empty cells may be omitted."""
+        self.load_cells = load_cells
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}  # (cell, variant) -> (expires_at, docs)
+        self._generation = 0  # Bumped by invalidate(), so in-flight loads don't store stale buckets
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    def get_many(self, cells, variant=None):
+        """{cell: [docs]} for every requested cell. Docs are shared: copy before mutating."""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            generation = self._generation
+            for cell in dict.fromkeys(cells):
+                entry = self._entries.get((cell, variant))
+                if entry and entry[0] > now:
+                    found[cell] = entry[1]
+                else:
+                    missing.append(cell)
+
+        if missing:
+            loaded = self.load_cells(missing, variant)
+            for cell in missing:
+                found[cell] = loaded.get(cell, [])
+            if self.enabled:
+                expires = now + self.ttl_seconds
+                with self._lock:
+                    if generation == self._generation:
+                        if len(self._entries) + len(missing) > self.max_entries:
+                            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                            if len(self._entries) + len(missing) > self.max_entries:
+                                self._entries.clear()
+                        for cell in missing:
+                            self._entries[(cell, variant)] = (expires, found[cell])
+        return found
+
+    def invalidate(self, cell=None):
+        """Drops every variant of `cell` (all cells when None)."""
+        with self._lock:
+            self._generation += 1
+            if cell is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == cell]:
+                    del self._entries[key]
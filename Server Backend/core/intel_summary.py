@@ -0,0 +1,114 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: intel_summary.py
+# ROLE:   SLIM PER-ZIP READ MODEL OF intel_history FOR LIST VIEWS
+# ==============================================================================
+#
+# intel_history keeps the heavy payload (every language, sitrep entries with
+# citations, overlays). `intel_summary` keeps one small doc per zip with what
+# list views filter and display. Every intel_history writer calls
+# sync_read_models() (or refresh_read_models() after partial updates), which
+# also keeps threat_overlays (core/threat_overlays.py) and the approval queue
+# (core/approvals.py) in step and invalidates the portal DEFCON grid
+# (core/zip_grid.py).
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE
+
+from .approvals import QUEUE_COLLECTION, backfill_review_state, ensure_approval_indexes, is_pending, sync_approval
+from .threat_overlays import OVERLAY_COLLECTION, ensure_overlay_indexes, sync_zip
+from .zip_grid import invalidate_all as invalidate_zip_grid
+
+SUMMARY_COLLECTION = "intel_summary"
+
+
+def ensure_intel_summary_indexes(db):
+    # Every intel_history reader and writer keys on zip_code
+    db.intel_history.create_index([("zip_code", ASCENDING)], name="zip_code")
+    col = db[SUMMARY_COLLECTION]
+    col.create_index([("defcon", ASCENDING)], name="defcon")
+    col.create_index([("pending_review", ASCENDING)], name="pending_review")
+    col.create_index([("timestamp", DESCENDING)], name="timestamp_desc")
+    col.create_index([("location_geo", GEOSPHERE)], name="location_2dsphere")
+
+
+def build_summary(doc):
+    en = doc.get('languages', {}).get('en', {})
+    summary = en.get('summary', []) or []
+    slim = {
+        "zip_code": doc['zip_code'],
+        "country": doc.get('country'),
+        "timestamp": doc.get('timestamp'),
+        "last_updated": en.get('last_updated'),
+        "defcon": en.get('defcon_status', 5),
+        "is_certified": en.get('is_certified', True),
+        "pending_review": is_pending(doc),
+        "location_name": en.get('location_name', 'Unknown'),
+        "headline": summary[0] if summary else "",
+        "overlay_ids": [ov.get('name', 'Unknown') for ov in en.get('tactical_overlays', []) or []],
+        "languages": sorted(doc.get('languages', {}).keys()),
+    }
+    if doc.get('location_geo'):
+        slim["location_geo"] = doc['location_geo']
+    return slim
+
+
+def sync_read_models(db, doc):
+    """Call after writing a full intel_history doc."""
+    zip_code = doc['zip_code']
+    db[SUMMARY_COLLECTION].replace_one({"_id": zip_code}, build_summary(doc), upsert=True)
+    sync_zip(db, zip_code, doc.get('languages', {}).get('en', {}))
+    sync_approval(db, doc)
+    invalidate_zip_grid()
+
+
+def refresh_read_models(db, zip_code):
+    """Re-syncs a zip from intel_history (after partial updates or deletes)."""
+    doc = db.intel_history.find_one({'zip_code': zip_code})
+    if doc:
+        sync_read_models(db, doc)
+    else:
+        db[SUMMARY_COLLECTION].delete_one({"_id": zip_code})
+        sync_zip(db, zip_code, {})
+        sync_approval(db, {"zip_code": zip_code})
+        invalidate_zip_grid()
+
+
+def add_language(db, zip_code, lang):
+    db[SUMMARY_COLLECTION].update_one({"_id": zip_code}, {"$addToSet": {"languages": lang}})
+
+
+def find_summaries(db, query, limit=0):
+    return list(db[SUMMARY_COLLECTION].find(query, {"_id": 0}).sort("timestamp", DESCENDING).limit(limit))
+
+
+def drop_read_models(db):
+    """For database resets: drops every read model derived from intel_history and recreates its indexes."""
+    for name in (SUMMARY_COLLECTION, OVERLAY_COLLECTION, QUEUE_COLLECTION):
+        db[name].drop()
+    ensure_intel_summary_indexes(db)
+    ensure_overlay_indexes(db)
+    ensure_approval_indexes(db)
+
+
+def rebuild_from_history(db, batch_size=200):
+    """Rebuilds intel_summary (and threat_overlays) from every intel_history doc; returns the count."""
+    n = 0
+    for doc in db.intel_history.find({"zip_code": {"$exists": True}}).batch_size(batch_size):
+        sync_read_models(db, doc)
+        n += 1
+    return n
+
+
+def backfill_read_models(db):
+    """
+    Startup catch-up for reports written before the read models existed:
+    queues pending reviews when approval_queue is empty, and rebuilds
+    intel_summary / threat_overlays when intel_summary holds fewer zips than
+    intel_history. Returns the number of zips rebuilt.
+    """
+    if db[QUEUE_COLLECTION].count_documents({}, limit=1) == 0:
+        backfill_review_state(db)
+    history = db.intel_history.count_documents({"zip_code": {"$exists": True}})
+    if db[SUMMARY_COLLECTION].count_documents({}) < history:
+        return rebuild_from_history(db)
+    return 0
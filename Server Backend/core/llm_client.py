@@ -0,0 +1,398 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: llm_client.py
+# ROLE:   SHARED MODEL CLIENT (RATE LIMIT, RETRIES, CIRCUIT BREAKER, METRICS)
+# ==============================================================================
+#
+# Every Gemini call (Analyst, Translator, Citations, Atlas Gates, Jobs Analyst)
+# goes through an LLMClient so that, under load bursts:
+#   - each model is held to its own token-bucket rate limit,
+#   - a global semaphore caps concurrent in-flight calls across all models,
+#   - 429/5xx/timeouts are retried with jittered exponential backoff,
+#   - a circuit breaker fails fast while the provider is down, and
+#   - latency/token counters are recorded per model.
+#
+# Callers keep their existing fail-closed handling: any failure surfaces as an
+# LLMError subclass, which they already catch as a generic Exception.
+
+import json
+import os
+import random
+import threading
+import time
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    "Timeout", "ReadTimeout", "ConnectTimeout", "ConnectionError",
+    "DeadlineExceeded", "ServiceUnavailable", "ResourceExhausted",
+    "InternalServerError", "TooManyRequests", "TimeoutError",
+}
+
+
+def _setting(name, default):
+    """Django setting if configured, else environment variable, else default."""
+    try:
+        from django.conf import settings
+        if settings.configured or os.environ.get('DJANGO_SETTINGS_MODULE'):
+            value = getattr(settings, name, None)
+            if value is not None:
+                return value
+    except Exception:
+        pass
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return type(default)(raw) if default is not None else raw
+    except (TypeError, ValueError):
+        return default
+
+
+# --- ERRORS ---
+
+class LLMError(Exception):
+    """Base error for model calls."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMUnavailable(LLMError):
+    """Raised without calling the provider (circuit open or limiter timeout)."""
+
+
+class LLMResponse:
+    """Normalized model response."""
+
+    def __init__(self, text, model, prompt_tokens=0, output_tokens=0, latency_ms=0):
+        self.text = text or ""
+        self.model = model
+        self.prompt_tokens = prompt_tokens or 0
+        self.output_tokens = output_tokens or 0
+        self.latency_ms = latency_ms
+
+
+def clean_json_text(text):
+    """Strips markdown fences the models like to wrap JSON in."""
+    return text.replace('```json', '').replace('```', '').strip()
+
+
+# --- RATE LIMITING ---
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst` stored."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(max(burst, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Blocks until a token is available. Returns False if `timeout` elapses first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive provider failures.
+    open -> half_open after `reset_timeout` seconds (one trial call allowed).
+    half_open -> closed on success, back to open on failure.
+    A trial that never reached the provider hands its slot back (release_trial).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """The call allowed by allow() was not made; let the next one try."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+# --- TRANSPORTS ---
+
+class GeminiSDKBackend:
+    """google.generativeai transport (keys configured globally via genai.configure)."""
+
+    name = "sdk"
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model_name):
+        with self._lock:
+            if model_name not in self._models:
+                import google.generativeai as genai
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def generate(self, model_name, prompt, timeout=None, **options):
+        kwargs = {}
+        if timeout:
+            kwargs["request_options"] = {"timeout": timeout}
+        if options.get("response_mime_type"):
+            kwargs["generation_config"] = {"response_mime_type": options["response_mime_type"]}
+        resp = self._model(model_name).generate_content(prompt, **kwargs)
+        usage = getattr(resp, "usage_metadata", None)
+        return LLMResponse(
+            text=resp.text,
+            model=model_name,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) if usage else 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) if usage else 0,
+        )
+
+
+class GeminiRESTBackend:
+    """Direct REST transport (used where the global genai namespace must be avoided)."""
+
+    name = "rest"
+    API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+
+    def generate(self, model_name, prompt, timeout=None, api_key=None, **options):
+        import requests
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if options.get("response_mime_type"):
+            payload["generationConfig"] = {"response_mime_type": options["response_mime_type"]}
+
+        response = requests.post(
+            f"{self.API_URL.format(model=model_name)}?key={api_key}",
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout or 30,
+        )
+        if response.status_code != 200:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}", status_code=response.status_code)
+
+        data = response.json()
+        try:
+            text = data['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError) as e:
+            raise LLMError(f"Malformed response: {e}")
+        usage = data.get("usageMetadata", {})
+        return LLMResponse(
+            text=text,
+            model=model_name,
+            prompt_tokens=usage.get("promptTokenCount", 0),
+            output_tokens=usage.get("candidatesTokenCount", 0),
+        )
+
+
+TRANSPORTS = {
+    "sdk": GeminiSDKBackend(),
+    "rest": GeminiRESTBackend(),
+}
+_TRANSPORTS_LOCK = threading.Lock()
+
+
+def get_transport(name):
+    """Resolves a transport, loading the offline fake (core/llm_fake.py) on first use."""
+    with _TRANSPORTS_LOCK:
+        if name == "fake" and name not in TRANSPORTS:
+            from .llm_fake import FakeLLMBackend
+            TRANSPORTS[name] = FakeLLMBackend()
+        return TRANSPORTS[name]
+
+
+# --- METRICS ---
+
+_METRICS = {}
+_METRICS_LOCK = threading.Lock()
+
+
+def _record(model, **deltas):
+    with _METRICS_LOCK:
+        m = _METRICS.setdefault(model, {
+            "calls": 0, "errors": 0, "retries": 0, "short_circuits": 0, "throttled": 0,
+            "latency_ms_total": 0, "latency_ms_max": 0,
+            "prompt_tokens": 0, "output_tokens": 0,
+        })
+        for key, value in deltas.items():
+            if key == "latency_ms_max":
+                m[key] = max(m[key], value)
+            else:
+                m[key] += value
+
+
+def get_llm_metrics():
+    """Snapshot of per-model counters plus breaker state."""
+    with _METRICS_LOCK:
+        snapshot = {model: dict(m) for model, m in _METRICS.items()}
+    for client in list(_CLIENTS.values()):
+        entry = snapshot.setdefault(client.model, {})
+        entry["breaker_state"] = client.breaker.state
+    return snapshot
+
+
+# --- CLIENT ---
+
+_GLOBAL_SEMAPHORE = threading.BoundedSemaphore(_setting("LLM_MAX_CONCURRENCY", 8))
+
+
+class LLMClient:
+    """Rate-limited, retrying, circuit-broken client for a single model."""
+
+    def __init__(self, model, transport="sdk", fallback_model=None,
+                 rate_per_minute=None, burst=None, max_retries=None, timeout=None):
+        self.model = model
+        # LLM_BACKEND=fake reroutes every client offline (benchmarks, disconnected boxes)
+        self.transport = "fake" if _setting("LLM_BACKEND", "gemini") == "fake" else transport
+        self.fallback_model = fallback_model
+        rpm = rate_per_minute or _setting("LLM_RATE_PER_MINUTE", 60)
+        self.bucket = TokenBucket(rpm / 60.0, burst or _setting("LLM_BURST", 10))
+        self.breaker = CircuitBreaker(
+            _setting("LLM_BREAKER_THRESHOLD", 5),
+            _setting("LLM_BREAKER_RESET_SECONDS", 30),
+        )
+        self.max_retries = _setting("LLM_MAX_RETRIES", 3) if max_retries is None else max_retries
+        self.timeout = timeout or _setting("LLM_TIMEOUT_SECONDS", 60)
+        self.queue_timeout = _setting("LLM_QUEUE_TIMEOUT_SECONDS", 30)
+
+    def _backend(self):
+        return get_transport(self.transport)
+
+    @staticmethod
+    def _is_retryable(exc):
+        status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS:
+            return True
+        return type(exc).__name__ in RETRYABLE_NAMES
+
+    def _call_once(self, prompt, **options):
+        if not self.bucket.acquire(timeout=self.queue_timeout):
+            raise LLMUnavailable(f"{self.model}: rate limiter timeout")
+        if not _GLOBAL_SEMAPHORE.acquire(timeout=self.queue_timeout):
+            raise LLMUnavailable(f"{self.model}: concurrency limit timeout")
+        try:
+            start = time.time()
+            resp = self._backend().generate(self.model, prompt, timeout=self.timeout, **options)
+            resp.latency_ms = int((time.time() - start) * 1000)
+            return resp
+        finally:
+            _GLOBAL_SEMAPHORE.release()
+
+    def _generate_primary(self, prompt, **options):
+        if not self.breaker.allow():
+            _record(self.model, short_circuits=1)
+            raise LLMUnavailable(f"{self.model}: circuit open")
+
+        attempt = 0
+        while True:
+            try:
+                resp = self._call_once(prompt, **options)
+            except LLMUnavailable:
+                # Local limiter timeout: back-pressure, not a provider outage
+                _record(self.model, throttled=1)
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                if retryable and attempt < self.max_retries:
+                    attempt += 1
+                    _record(self.model, retries=1)
+                    # Full jitter: uniform(0, base * 2^attempt), capped
+                    time.sleep(random.uniform(0, min(8.0, 0.5 * (2 ** attempt))))
+                    continue
+                _record(self.model, calls=1, errors=1)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The provider answered; only the request itself was bad
+                    self.breaker.record_success()
+                if isinstance(e, LLMError):
+                    raise
+                raise LLMError(f"{self.model}: {e}", status_code=getattr(e, "code", None)) from e
+
+            self.breaker.record_success()
+            _record(
+                self.model, calls=1,
+                latency_ms_total=resp.latency_ms, latency_ms_max=resp.latency_ms,
+                prompt_tokens=resp.prompt_tokens, output_tokens=resp.output_tokens,
+            )
+            return resp
+
+    def generate(self, prompt, **options):
+        """Returns an LLMResponse. Falls back to `fallback_model` if the primary fails."""
+        try:
+            return self._generate_primary(prompt, **options)
+        except LLMError as e:
+            if not self.fallback_model:
+                raise
+            print(f"[LLM] {self.model} failed ({e}); falling back to {self.fallback_model}")
+            return get_client(self.fallback_model, transport=self.transport).generate(prompt, **options)
+
+    def generate_json(self, prompt, **options):
+        """generate() + fence stripping + json.loads."""
+        resp = self.generate(prompt, **options)
+        return json.loads(clean_json_text(resp.text))
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(model, transport="sdk", **kwargs):
+    """Shared client per (transport, model) so limits and breakers are process-wide."""
+    key = (transport, model)
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = LLMClient(model, transport=transport, **kwargs)
+        return _CLIENTS[key]
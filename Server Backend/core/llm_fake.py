@@ -0,0 +1,351 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: llm_fake.py
+# ROLE:   DETERMINISTIC OFFLINE MODEL BACKEND + OSINT FEED (LOAD TESTING)
+# ==============================================================================
+#
+# Selected with LLM_BACKEND=fake. Every LLMClient then routes through
+# FakeLLMBackend instead of Gemini, keeping the client's rate limiting,
+# retries, breaker and metrics in the path so benchmarks measure them too.
+#
+#   - Output is schema-valid JSON (or SITREP text) for each known prompt kind
+#     and depends only on (LLM_FAKE_SEED, model, prompt): same input, same answer.
+#   - Latency is sampled from LLM_FAKE_LATENCY, e.g.
+#         "lognormal:800:0.4,analyst=lognormal:9000:0.3,translator=uniform:2000:5000"
+#     (first spec without "=" is the default; others override per prompt kind).
+#     Specs: fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA
+#   - LLM_FAKE_FAILURE_RATE raises retryable 503s, LLM_FAKE_MALFORMED_RATE
+#     returns broken JSON. Both are sampled per (prompt, attempt) so a run is
+#     reproducible regardless of thread interleaving.
+#
+# ATLAS_OFFLINE_FEED=1 swaps fetch_from_source() for fake_osint_entries().
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .llm_client import LLMError, LLMResponse, _setting
+
+PROMPT_KINDS = (
+    ("gate1", "OSINT Intake Filter"),
+    ("gate2_reinforced", "Gate 2 Reinforced"),
+    ("gate2_base", "Gate 2 Screener"),
+    ("translator", "TRANSLATE JSON VALUES TO"),
+    ("analyst", "SENTINEL-01"),
+    ("citation", "Military Intelligence SITREP"),
+    ("moderation", "SENTINEL MODERATION ANALYST"),
+)
+
+SENTIMENTS = ["POSITIVE", "NEGATIVE", "NEUTRAL", "ALARMING"]
+RISK_DOMAINS = ["KINETIC", "POLITICAL", "CIVIL_UNREST", "CYBER", "ECONOMIC"]
+SITREP_DOMAINS = ["Political", "Military", "Civilian", "Economic", "Diplomatic"]
+KEYWORDS = ["border", "artillery", "drone", "checkpoint", "evacuation", "troops", "ceasefire", "shelling"]
+ATTEMPT_MEMORY = 10000  # Prompts whose retry count is remembered (LRU)
+FAKE_SOURCES = ["Reuters", "Bangkok Post", "Khmer Times", "AP", "The Nation"]
+
+
+def classify_prompt(prompt):
+    for kind, marker in PROMPT_KINDS:
+        if marker in prompt:
+            return kind
+    return "unknown"
+
+
+def parse_latency_spec(spec):
+    """'lognormal:800:0.4,analyst=fixed:50' -> {'default': (...), 'analyst': (...)}"""
+    table = {"default": ("fixed", 0.0)}
+    for part in str(spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        kind = "default"
+        if "=" in part:
+            kind, part = part.split("=", 1)
+        fields = part.split(":")
+        try:
+            table[kind.strip()] = (fields[0].strip().lower(), *[float(x) for x in fields[1:]])
+        except ValueError:
+            print(f"[!] LLM_FAKE_LATENCY: ignoring bad spec '{part}'")
+    return table
+
+
+def sample_latency_ms(dist, rng):
+    name, *params = dist
+    if name == "uniform":
+        return rng.uniform(params[0], params[1])
+    if name == "normal":
+        return max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal":
+        # Parameterised by median so specs read like observed p50s
+        return rng.lognormvariate(math.log(max(params[0], 1.0)), params[1])
+    return params[0] if params else 0.0
+
+
+class FakeLLMBackend:
+    """Transport with the same generate() contract as the Gemini backends."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.seed = _setting("LLM_FAKE_SEED", 1337)
+        self.latency = parse_latency_spec(_setting("LLM_FAKE_LATENCY", "lognormal:600:0.35"))
+        self.failure_rate = _setting("LLM_FAKE_FAILURE_RATE", 0.0)
+        self.malformed_rate = _setting("LLM_FAKE_MALFORMED_RATE", 0.0)
+        self._attempts = OrderedDict()  # digest -> calls so far, bounded by ATTEMPT_MEMORY
+        self._lock = threading.Lock()
+
+    def _digest(self, model_name, prompt):
+        raw = f"{self.seed}|{model_name}|{prompt}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _attempt_rng(self, digest):
+        # Nth call for the same prompt always draws the same latency/failure.
+        # Retries follow closely, so forgetting the least recent prompts keeps
+        # that while long load runs stay at constant memory.
+        with self._lock:
+            attempt = self._attempts.pop(digest, 0)
+            self._attempts[digest] = attempt + 1
+            if len(self._attempts) > ATTEMPT_MEMORY:
+                self._attempts.popitem(last=False)
+        return random.Random(f"{digest}:{attempt}")
+
+    def generate(self, model_name, prompt, timeout=None, **options):
+        kind = classify_prompt(prompt)
+        digest = self._digest(model_name, prompt)
+        rng = self._attempt_rng(digest)
+
+        latency_ms = sample_latency_ms(self.latency.get(kind, self.latency["default"]), rng)
+        if timeout and latency_ms / 1000.0 > timeout:
+            time.sleep(timeout)
+            raise LLMError(f"fake {model_name}: deadline exceeded after {timeout}s", status_code=504)
+        time.sleep(latency_ms / 1000.0)
+
+        if rng.random() < self.failure_rate:
+            raise LLMError(f"fake {model_name}: injected 503", status_code=503)
+
+        text = build_response(kind, prompt, random.Random(digest))
+        if rng.random() < self.malformed_rate:
+            text = text[: len(text) // 2]
+
+        return LLMResponse(
+            text=text,
+            model=model_name,
+            prompt_tokens=len(prompt) // 4,
+            output_tokens=len(text) // 4,
+        )
+
+
+# --- RESPONSE BUILDERS ---
+
+def _match(pattern, prompt, default=""):
+    m = re.search(pattern, prompt)
+    return m.group(1).strip() if m else default
+
+
+def _gate1(prompt, rng):
+    relevant = rng.random() < 0.85
+    return {
+        "is_relevant": relevant,
+        "reason": "" if relevant else "Not security related (fake backend)",
+        "sentiment": rng.choice(SENTIMENTS),
+        "keywords": rng.sample(KEYWORDS, 3),
+        "language": "en",
+    }
+
+
+def _gate2_base(prompt, rng):
+    return {
+        "risk_domain": rng.choice(RISK_DOMAINS),
+        "target_region": "SE_ASIA",
+        "validity_score": rng.randint(20, 100),
+    }
+
+
+def _gate2_reinforced(prompt, rng):
+    admit = rng.random() < 0.6
+    return {
+        "final_decision": "ADMIT" if admit else "DROP",
+        "reasoning": "Corroborated by regional outlets (fake backend)." if admit else "No corroboration (fake backend).",
+        "validity_score": rng.randint(55, 90) if admit else rng.randint(10, 45),
+    }
+
+
+def _citations(date):
+    return [{"source": "Fake Wire", "date": date, "url": "http://localhost/fake"}]
+
+
+def _analyst(prompt, rng):
+    date = _match(r"CURRENT_DATE:\s*(\d{4}-\d{2}-\d{2})", prompt, time.strftime("%Y-%m-%d"))
+    lat = float(_match(r"Lat:\s*(-?[\d.]+)", prompt, "13.75"))
+    lon = float(_match(r"Lon:\s*(-?[\d.]+)", prompt, "100.50"))
+    defcon = rng.randint(2, 5)
+    return {
+        "defcon_status": defcon,
+        "defcon_justification": f"Synthetic assessment at DEFCON {defcon} (fake backend).",
+        "defcon_inputs": {
+            "weapon_type": rng.choice(["Artillery", "Mortar", "Small Arms", "None"]),
+            "range_km": round(rng.uniform(5, 120), 1),
+            "recency_hours": rng.randint(0, 72),
+            "infra_targeted": rng.random() < 0.2,
+            "trend_24h": rng.choice(["Rising", "Falling", "Stable"]),
+        },
+        "evacuation_point": {
+            "name": "Nakhon Ratchasima",
+            "lat": 14.9799,
+            "lon": 102.0978,
+            "bearing_from_target": "North-West",
+            "reason": "Strategic depth away from conflict.",
+        },
+        "tactical_map": {
+            "roads_to_avoid": ["Route 33", "Route 348"],
+            "danger_zones": ["Border Crossing Point Aranyaprathet"],
+        },
+        "tactical_overlays": [
+            {
+                "name": f"Synthetic Threat {i + 1}",
+                "type": rng.choice(["Artillery", "Drones", "Troops", "Conflict Zone"]),
+                "lat": round(lat + rng.uniform(-0.3, 0.3), 4),
+                "lon": round(lon + rng.uniform(-0.3, 0.3), 4),
+                "radius": rng.randint(1000, 15000),
+                "date": date,
+            }
+            for i in range(rng.randint(0, 3))
+        ],
+        "sitrep_entries": [
+            {
+                "id": f"sitrep_{i + 1}",
+                "date": date,
+                "type": domain,
+                "topic": f"{domain} Update",
+                "summary": f"Synthetic {domain.lower()} situation report for load testing.",
+                "citations": _citations(date),
+                "confidence_score": rng.randint(50, 95),
+            }
+            for i, domain in enumerate(SITREP_DOMAINS)
+        ],
+        "forecast_entries": [
+            {
+                "topic": domain,
+                "prediction": f"{domain} conditions expected to hold steady.",
+                "rationale": "Synthetic rationale (fake backend).",
+                "citations": [],
+                "confidence_score": rng.randint(40, 90),
+            }
+            for domain in SITREP_DOMAINS
+        ],
+        "predictive_analysis": {
+            "forecast_defcon": defcon,
+            "threat_vector": rng.choice(["Approaching", "Receding", "Static"]),
+            "confidence_score": rng.randint(50, 90),
+            "risk_window": "Next 12-24 Hours",
+        },
+    }
+
+
+def _translate_values(node, tag):
+    # Only prose is "translated"; enums, dates, ids and URLs pass through
+    if isinstance(node, dict):
+        return {k: _translate_values(v, tag) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_translate_values(v, tag) for v in node]
+    if isinstance(node, str) and " " in node and not node.startswith("http"):
+        return f"[{tag}] {node}"
+    return node
+
+
+def _translator(prompt, rng):
+    lang = _match(r"TRANSLATE JSON VALUES TO (\w+)", prompt, "XX")
+    try:
+        master = json.loads(prompt.split("INPUT:", 1)[1])
+    except (IndexError, ValueError):
+        master = {}
+    return _translate_values(master, lang[:2])
+
+
+def _moderation(prompt, rng):
+    return {
+        "decision": rng.choice(["reinstate", "extend_suspension", "remove_listing"]),
+        "confidence": round(rng.uniform(0.5, 0.95), 2),
+        "rationale": "Synthetic moderation decision (fake backend).",
+        "key_evidence": [],
+        "risk_assessment": rng.choice(["low", "medium", "high"]),
+        "recommended_duration_hours": 0,
+    }
+
+
+def _citation_sitrep(prompt, rng):
+    topic = _match(r"Topic:\s*(.+)", prompt, "Unknown")
+    source = rng.choice(FAKE_SOURCES)
+    return (
+        "**SUMMARY:**\n"
+        f"Synthetic reporting on {topic} indicates no change in posture (Source: {source}). "
+        f"Local authorities continue routine monitoring (Source: {rng.choice(FAKE_SOURCES)})."
+    )
+
+
+BUILDERS = {
+    "gate1": _gate1,
+    "gate2_base": _gate2_base,
+    "gate2_reinforced": _gate2_reinforced,
+    "analyst": _analyst,
+    "translator": _translator,
+    "moderation": _moderation,
+}
+
+
+def build_response(kind, prompt, rng):
+    if kind == "citation":
+        return _citation_sitrep(prompt, rng)
+    builder = BUILDERS.get(kind)
+    return json.dumps(builder(prompt, rng) if builder else {})
+
+
+# --- OFFLINE OSINT FEED ---
+
+FEED_ITEMS_PER_CYCLE = 10
+FEED_NEW_PER_CYCLE = 3
+_FEED_CYCLES = {}
+_FEED_LOCK = threading.Lock()
+
+HEADLINES = [
+    "Artillery exchange reported near {place}",
+    "Troops reinforce checkpoints outside {place}",
+    "Drone sighted over villages close to {place}",
+    "Officials hold border talks on {place} crossing",
+    "Evacuation centres opened for residents of {place}",
+    "Market trade slows at {place} amid tension",
+]
+PLACES = ["Aranyaprathet", "Chong Chom", "Preah Vihear", "Ban Kruat", "Poipet", "Sisaket"]
+
+
+def fake_osint_entries(source):
+    """
+    Stand-in for fetch_from_source(). Each call slides a window over a
+    deterministic headline stream: FEED_NEW_PER_CYCLE fresh items plus repeats,
+    so Gate 1 dedup sees the same hit ratio a live poll would.
+    """
+    name = source.get('Source', 'Unknown')
+    with _FEED_LOCK:
+        cycle = _FEED_CYCLES.get(name, 0)
+        _FEED_CYCLES[name] = cycle + 1
+
+    seed = _setting("LLM_FAKE_SEED", 1337)
+    entries = []
+    start = cycle * FEED_NEW_PER_CYCLE
+    for n in range(start, start + FEED_ITEMS_PER_CYCLE):
+        rng = random.Random(f"{seed}|{name}|{n}")
+        place = rng.choice(PLACES)
+        entries.append({
+            'title': f"{rng.choice(HEADLINES).format(place=place)} ({name} #{n})",
+            'link': f"http://localhost/fake/{hashlib.md5(f'{name}|{n}'.encode()).hexdigest()}",
+            'summary': f"Synthetic report #{n} from {name} about {place}.",
+            'source': name,
+            'validity_score': source.get('ValidityScore', 75),
+            'published': time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime()),
+        })
+    return entries
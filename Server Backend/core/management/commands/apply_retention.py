@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.db_utils import get_db_handle
+from core.startup import ensure_core_storage
+from core.retention import (
+    CAPPED_COLLECTIONS, TTL_COLLECTIONS, TTL_FIELD,
+    backfill_created_at, ensure_capped, ensure_ttl_index, ttl_seconds,
+)
+
+
+class Command(BaseCommand):
+    help = 'Migrates telemetry to capped collections and applies TTL retention to ingest collections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-backfill', action='store_true',
+                            help=f"Do not set {TTL_FIELD} on legacy documents")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        db = get_db_handle()
+
+        # 1. Telemetry -> capped (converts in place, keeping the newest docs that fit)
+        for name, (size_bytes, max_docs) in CAPPED_COLLECTIONS.items():
+            ensure_capped(db, name, size_bytes, max_docs)
+            capped = db[name].options().get("capped", False) if name in db.list_collection_names() else False
+            self.stdout.write(f"{name}: capped={capped} (size {size_bytes} bytes)")
+
+        # 2. Backfill the TTL anchor before the index exists, so nothing is
+        #    kept forever for lack of a date
+        for collection in TTL_COLLECTIONS:
+            if not options['skip_backfill']:
+                n = backfill_created_at(db, collection, options['batch_size'])
+                self.stdout.write(f"{collection}: backfilled {TTL_FIELD} on {n} documents")
+            seconds = ttl_seconds(collection)
+            ensure_ttl_index(db, collection, seconds)
+            self.stdout.write(f"{collection}: TTL {seconds // 86400} days on {TTL_FIELD}")
+
+        # 3. The other core indexes the server would create at start
+        ensure_core_storage(db)
+        self.stdout.write("core indexes ensured")
+
+        self.stdout.write(self.style.SUCCESS("Retention applied. The TTL monitor purges expired documents within ~60s."))
@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import passwords
+
+
+class Command(BaseCommand):
+    help = 'Measures password hashing cost on this machine and prints PASSWORD_* settings for a target latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=int, default=250,
+                            help="Wanted time for one hash on one core (default 250)")
+        parser.add_argument('--algorithm', choices=[passwords.ARGON2, passwords.PBKDF2],
+                            help="Default: the configured one (argon2 needs argon2-cffi)")
+        parser.add_argument('--memory-kib', type=int, help="argon2 memory cost (default PASSWORD_ARGON2_MEMORY_KIB)")
+        parser.add_argument('--logins', type=int, default=0,
+                            help="Also run N concurrent hashes through the pool at the current settings")
+
+    def handle(self, *args, **options):
+        algorithm = options['algorithm'] or passwords.preferred_algorithm()
+        if algorithm == passwords.ARGON2 and not passwords.argon2_available():
+            self.stdout.write(self.style.WARNING("argon2-cffi is not installed; calibrating pbkdf2_sha256"))
+            algorithm = passwords.PBKDF2
+
+        cost, ms = passwords.calibrate(algorithm, options['target_ms'], options['memory_kib'])
+        workers = settings.PASSWORD_HASH_WORKERS
+        self.stdout.write(f"{algorithm}: {ms} ms per hash; pool of {workers} -> ~{workers * 1000 / ms:.0f} logins/s per process")
+        if algorithm == passwords.ARGON2:
+            memory = options['memory_kib'] or settings.PASSWORD_ARGON2_MEMORY_KIB
+            env = f"PASSWORD_HASHER=argon2 PASSWORD_ARGON2_TIME_COST={cost} PASSWORD_ARGON2_MEMORY_KIB={memory}"
+        else:
+            env = f"PASSWORD_HASHER=pbkdf2_sha256 PASSWORD_PBKDF2_ITERATIONS={cost}"
+
+        if options['logins']:
+            self._storm(options['logins'])
+
+        self.stdout.write(self.style.SUCCESS(f"Recommended: {env}"))
+        self.stdout.write("Existing hashes below the new cost are upgraded on their next successful login.")
+
+    def _storm(self, n):
+        """n concurrent hash_password calls, as a login storm would make them."""
+        def one(_):
+            start = time.perf_counter()
+            try:
+                passwords.hash_password("calibration-password")
+                return (time.perf_counter() - start) * 1000, True
+            except passwords.PasswordServiceBusy:
+                return (time.perf_counter() - start) * 1000, False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            results = list(pool.map(one, range(n)))
+        wall = time.perf_counter() - start
+        done = sorted(ms for ms, ok in results if ok)
+        busy = sum(1 for _, ok in results if not ok)
+        p95 = done[int(len(done) * 0.95) - 1] if done else 0
+        self.stdout.write(f"Pool at current settings: {len(done)} hashes in {wall:.2f}s "
+                          f"({len(done) / wall:.1f}/s), p95 {p95:.0f} ms, {busy} rejected as busy")
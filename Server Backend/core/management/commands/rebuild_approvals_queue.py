@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.approvals import QUEUE_COLLECTION, backfill_review_state, ensure_approval_indexes
+from core.db_utils import get_db_handle
+
+
+class Command(BaseCommand):
+    help = 'Sets review_state on legacy pending reports and rebuilds the approval queue'
+
+    def handle(self, *args, **options):
+        db = get_db_handle()
+        ensure_approval_indexes(db)
+        tagged = backfill_review_state(db)
+        self.stdout.write(f"intel_history: tagged {tagged} legacy pending reports")
+        self.stdout.write(self.style.SUCCESS(
+            f"{QUEUE_COLLECTION}: {db[QUEUE_COLLECTION].count_documents({})} pending reviews"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.db_utils import get_db_handle
+from core.intel_summary import SUMMARY_COLLECTION, ensure_intel_summary_indexes, rebuild_from_history
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the slim intel_summary read model (and threat_overlays) from intel_history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        db = get_db_handle()
+        ensure_intel_summary_indexes(db)
+        n = rebuild_from_history(db, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{SUMMARY_COLLECTION}: {n} zips"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.db_utils import get_db_handle
+from core.news_store import NEWS_COLLECTION, backfill_from_raw, ensure_news_indexes
+
+
+class Command(BaseCommand):
+    help = 'Creates the citation store indexes and fills citation fields on legacy news_index documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-backfill', action='store_true',
+                            help="Only create indexes")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        db = get_db_handle()
+
+        if not options['skip_backfill']:
+            n = backfill_from_raw(db, options['batch_size'])
+            self.stdout.write(f"{NEWS_COLLECTION}: backfilled citation fields on {n} documents")
+
+        ensure_news_indexes(db)
+        for name in db[NEWS_COLLECTION].index_information():
+            self.stdout.write(f"{NEWS_COLLECTION}: index {name}")
+
+        self.stdout.write(self.style.SUCCESS("Citation store ready."))
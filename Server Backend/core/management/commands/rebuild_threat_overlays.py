@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.db_utils import get_db_handle
+from core.threat_overlays import OVERLAY_COLLECTION, ensure_overlay_indexes, rebuild_from_history
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialised threat_overlays collection from intel_history'
+
+    def handle(self, *args, **options):
+        db = get_db_handle()
+        ensure_overlay_indexes(db)
+        n = rebuild_from_history(db)
+        self.stdout.write(self.style.SUCCESS(f"{OVERLAY_COLLECTION}: {n} overlays"))
@@ -0,0 +1,131 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: news_store.py
+# ROLE:   CITATION STORE (news_index): NORMALIZED WRITES + INDEX-BACKED LOOKUPS
+# ==============================================================================
+#
+# Gate 1 writes one news_index doc per admitted packet. Besides the dedup
+# hashes it carries the citation fields (title, summary, source, url,
+# published_parsed) and a UTC `published_day` bucket.
+#
+# Indexes:
+#   content_hash                                  -> Gate 1 dedup probe
+#   published_parsed desc                         -> "latest news" lookups
+#   published_day + text(title, summary)          -> topic lookups
+#
+# The text index is compound with the day bucket, so a topic lookup runs one
+# small equality+text query per day in the window instead of scanning every
+# match in the retention horizon.
+
+import datetime
+import hashlib
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+from .retention import utc_now
+
+NEWS_COLLECTION = "news_index"
+CITATION_WINDOW_HOURS = 72
+IGNORED_TERMS = {'the', 'and', 'for', 'with', 'update', 'report'}
+
+
+def ensure_news_indexes(db):
+    col = db[NEWS_COLLECTION]
+    col.create_index([("content_hash", ASCENDING)], name="content_hash")
+    col.create_index([("published_parsed", DESCENDING)], name="published_desc")
+    col.create_index(
+        [("published_day", ASCENDING), ("title", TEXT), ("summary", TEXT)],
+        weights={"title": 3, "summary": 1},
+        default_language="english",
+        name="citation_text",
+    )
+
+
+def published_datetime(packet):
+    """Source publish time if known, else ingest time (naive UTC)."""
+    ts = packet.identity.source_published_at or packet.identity.ingest_timestamp
+    return datetime.datetime.utcfromtimestamp(ts)
+
+
+def build_index_doc(packet):
+    published = published_datetime(packet)
+    url = packet.identity.canonical_url
+    return {
+        # Dedup
+        "content_hash": packet.identity.content_hash,
+        "link_hash": hashlib.md5(url.encode('utf-8')).hexdigest(),
+        "url": url,
+        "ingested_at": packet.identity.ingest_timestamp,
+        # Citation
+        "title": packet.payload.title.strip(),
+        "summary": (packet.payload.raw_text or "").strip()[:1000],
+        "source": packet.source.source_id,
+        "published_parsed": published,
+        "published_day": published.strftime('%Y-%m-%d'),
+        # TTL anchor (core/retention.py)
+        "created_at": utc_now(),
+    }
+
+
+def topic_terms(topic):
+    return [w for w in topic.lower().split() if len(w) > 3 and w not in IGNORED_TERMS]
+
+
+def _window_days(min_date, now):
+    day = min_date.date()
+    while day <= now.date():
+        yield day.strftime('%Y-%m-%d')
+        day += datetime.timedelta(days=1)
+
+
+def find_citations(db, topic, limit=10, hours=CITATION_WINDOW_HOURS):
+    """Most recent `limit` news docs matching `topic` within the window (all if no usable terms)."""
+    col = db[NEWS_COLLECTION]
+    now = utc_now()
+    min_date = now - datetime.timedelta(hours=hours)
+    projection = {"_id": 0, "title": 1, "summary": 1, "source": 1, "url": 1, "published_parsed": 1}
+
+    terms = topic_terms(topic or "")
+    if not terms:
+        return list(col.find({"published_parsed": {"$gte": min_date}}, projection)
+                    .sort("published_parsed", DESCENDING).limit(limit))
+
+    search = " ".join(terms)
+    docs = []
+    for day in _window_days(min_date, now):
+        docs.extend(col.find(
+            {"published_day": day, "$text": {"$search": search}, "published_parsed": {"$gte": min_date}},
+            projection,
+        ).sort("published_parsed", DESCENDING).limit(limit))
+    docs.sort(key=lambda d: d["published_parsed"], reverse=True)
+    return docs[:limit]
+
+
+def backfill_from_raw(db, batch_size=500):
+    """
+    Copies citation fields onto legacy dedup-only news_index docs from the
+    matching raw_news_db packet (joined on content_hash).
+    """
+    col = db[NEWS_COLLECTION]
+    updated = 0
+    legacy = col.find({"title": {"$exists": False}}, {"content_hash": 1}).batch_size(batch_size)
+    for doc in legacy:
+        raw = db.raw_news_db.find_one(
+            {"identity.content_hash": doc["content_hash"]},
+            {"identity": 1, "payload": 1, "source": 1},
+        )
+        if not raw:
+            continue
+        identity = raw.get("identity", {})
+        payload = raw.get("payload", {})
+        ts = identity.get("source_published_at") or identity.get("ingest_timestamp")
+        published = datetime.datetime.utcfromtimestamp(ts) if ts else utc_now()
+        col.update_one({"_id": doc["_id"]}, {"$set": {
+            "title": (payload.get("title") or "").strip(),
+            "summary": (payload.get("raw_text") or "").strip()[:1000],
+            "source": raw.get("source", {}).get("source_id", "Unknown"),
+            "published_parsed": published,
+            "published_day": published.strftime('%Y-%m-%d'),
+        }})
+        updated += 1
+    return updated
@@ -0,0 +1,240 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: passwords.py
+# ROLE:   PASSWORD HASHING SERVICE (JOBS V1 + V2 ACCOUNTS)
+# ==============================================================================
+#
+# Formats (the algorithm is read from the stored hash, so all of them verify):
+#   $argon2id$v=19$m=..,t=..,p=..$..   preferred when argon2-cffi is installed
+#   pbkdf2_sha256$<iter>$<salt>$<b64>  fallback; same format as Django's hasher,
+#                                      so v1 hashes made by make_password verify
+#   <64 hex chars>                     legacy jobs_v2 unsalted SHA-256
+# check_password() calls `setter(new_hash)` after a successful check of a hash
+# that is legacy or weaker than the current parameters. The next login then
+# finds the upgraded hash.
+#
+# Hashing is CPU-bound. It runs on a small thread pool (PASSWORD_HASH_WORKERS)
+# so a login storm uses at most that many cores and the request threads stay
+# free for other traffic. At most PASSWORD_HASH_QUEUE calls wait for the pool.
+# A call that would exceed that, or waits longer than
+# PASSWORD_HASH_WAIT_SECONDS, raises PasswordServiceBusy (views answer 503
+# through busy_response()).
+#
+# argon2 hashes only verify with argon2-cffi installed. The jobs apps call
+# check_stored_hashes() from ensure_indexes, so a host without it refuses to
+# start rather than rejecting every argon2 account's login.
+#
+# Tune the cost per machine with `manage.py calibrate_password_hashing`.
+
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # Optional: pip install argon2-cffi
+    PasswordHasher = None
+
+ARGON2 = "argon2"
+PBKDF2 = "pbkdf2_sha256"
+ARGON2_PARALLELISM = 1  # Parallelism comes from the pool, one lane per hash
+
+
+class PasswordServiceBusy(Exception):
+    """The hashing pool is saturated; the caller should retry shortly."""
+
+
+def busy_response():
+    """503 for PasswordServiceBusy: the hashing pool is saturated (login storm)."""
+    response = JsonResponse({"error": "Server busy, please retry"}, status=503)
+    response["Retry-After"] = "2"
+    return response
+
+
+# --- ALGORITHMS ---
+
+def argon2_available():
+    return PasswordHasher is not None
+
+
+_fallback_warned = False
+
+
+def preferred_algorithm():
+    global _fallback_warned
+    if settings.PASSWORD_HASHER == ARGON2:
+        if argon2_available():
+            return ARGON2
+        if not _fallback_warned:
+            _fallback_warned = True
+            print("[!] PASSWORD_HASHER=argon2 but argon2-cffi is not installed; hashing with PBKDF2")
+    return PBKDF2
+
+
+def check_stored_hashes(collection, field="password_hash"):
+    """
+    Raises ImproperlyConfigured when `collection` holds argon2 hashes that
+    this host cannot verify (argon2-cffi missing).
+    """
+    if argon2_available():
+        return
+    count = collection.count_documents({field: {"$regex": r"^\$argon2"}})
+    if count:
+        raise ImproperlyConfigured(
+            f"{count} accounts in {collection.name} have argon2 password hashes but argon2-cffi "
+            f"is not installed; they cannot log in. pip install argon2-cffi"
+        )
+
+
+def _argon2_hasher(time_cost=None, memory_kib=None):
+    return PasswordHasher(
+        time_cost=time_cost or settings.PASSWORD_ARGON2_TIME_COST,
+        memory_cost=memory_kib or settings.PASSWORD_ARGON2_MEMORY_KIB,
+        parallelism=ARGON2_PARALLELISM,
+    )
+
+
+def _pbkdf2(password, salt, iterations):
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
+    return base64.b64encode(dk).decode("ascii").strip()
+
+
+def _make(password, algorithm=None, cost=None):
+    """`cost`: PBKDF2 iterations, or (time_cost, memory_kib) for argon2."""
+    algorithm = algorithm or preferred_algorithm()
+    if algorithm == ARGON2:
+        return _argon2_hasher(*(cost or (None, None))).hash(password)
+    iterations = cost or settings.PASSWORD_PBKDF2_ITERATIONS
+    salt = secrets.token_hex(11)
+    return f"{PBKDF2}${iterations}${salt}${_pbkdf2(password, salt, iterations)}"
+
+
+def _verify(password, encoded):
+    """(matches, needs_rehash)."""
+    if not encoded:
+        return False, False
+    current = preferred_algorithm()
+
+    if encoded.startswith("$argon2"):
+        if not argon2_available():
+            return False, False
+        hasher = _argon2_hasher()
+        try:
+            hasher.verify(encoded, password)
+        except (VerificationError, InvalidHashError):
+            return False, False
+        return True, current != ARGON2 or hasher.check_needs_rehash(encoded)
+
+    if encoded.startswith(PBKDF2 + "$"):
+        try:
+            _, iterations, salt, digest = encoded.split("$", 3)
+            iterations = int(iterations)
+        except ValueError:
+            return False, False
+        ok = hmac.compare_digest(_pbkdf2(password, salt, iterations), digest)
+        return ok, ok and (current != PBKDF2 or iterations < settings.PASSWORD_PBKDF2_ITERATIONS)
+
+    if len(encoded) == 64 and all(c in "0123456789abcdef" for c in encoded):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        ok = hmac.compare_digest(legacy, encoded)
+        return ok, ok
+
+    # Any other Django hasher format from older v1 accounts
+    from django.contrib.auth.hashers import check_password as django_check
+    ok = django_check(password, encoded)
+    return ok, ok
+
+
+# --- POOL ---
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _submit(fn, *args):
+    global _pool, _slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = settings.PASSWORD_HASH_WORKERS
+                _slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASH_QUEUE)
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="passwords")
+    if not _slots.acquire(blocking=False):
+        raise PasswordServiceBusy("password hashing queue full")
+    try:
+        future = _pool.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_WAIT_SECONDS)
+    except FutureTimeout:
+        future.cancel()
+        raise PasswordServiceBusy("password hashing timed out in queue")
+
+
+# --- PUBLIC API ---
+
+def hash_password(password):
+    return _submit(_make, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    True if `password` matches `encoded`. On a match that needs upgrading,
+    calls setter(new_hash) with a hash in the current format (Django's
+    check_password contract). The upgrade is skipped when the pool is busy.
+    """
+    ok, needs_rehash = _submit(_verify, password or "", encoded or "")
+    if ok and needs_rehash and setter:
+        try:
+            setter(hash_password(password))
+        except PasswordServiceBusy:
+            pass  # The login stands; the upgrade is retried on the next one
+    return ok
+
+
+# --- CALIBRATION ---
+
+def time_hash(algorithm, cost, rounds=3):
+    """Median seconds for one hash at `cost` on this machine (runs inline, not on the pool)."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _make("calibration-password", algorithm, cost)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2]
+
+
+def calibrate(algorithm, target_ms, memory_kib=None):
+    """
+    Cost whose hash takes about `target_ms` here: PBKDF2 iterations, or the
+    argon2 time_cost at `memory_kib`. Returns (cost, measured_ms).
+    """
+    target = target_ms / 1000.0
+    if algorithm == ARGON2:
+        memory_kib = memory_kib or settings.PASSWORD_ARGON2_MEMORY_KIB
+        time_cost = 1
+        while True:
+            elapsed = time_hash(ARGON2, (time_cost, memory_kib))
+            if elapsed >= target or time_cost >= 20:
+                return time_cost, round(elapsed * 1000, 1)
+            # Cost is linear in time_cost; jump close, then step
+            time_cost = max(time_cost + 1, int(time_cost * target / max(elapsed, 1e-6)))
+
+    probe = 100000
+    elapsed = time_hash(PBKDF2, probe)
+    iterations = max(100000, int(probe * target / max(elapsed, 1e-6)) // 10000 * 10000)
+    return iterations, round(time_hash(PBKDF2, iterations) * 1000, 1)
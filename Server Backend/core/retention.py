@@ -0,0 +1,162 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: retention.py
+# ROLE:   CAPPED TELEMETRY COLLECTIONS + TTL INDEXES FOR INGEST COLLECTIONS
+# ==============================================================================
+#
+# Telemetry (timings, traces) lives in capped collections: MongoDB evicts the
+# oldest documents on insert, so writers never prune.
+# Ingest collections (raw_news_db, news_index, clean_news_db) carry a BSON
+# `created_at` date with a TTL index; the TTL monitor deletes expired docs in
+# the background. Horizons come from settings.RETENTION_*_DAYS.
+#
+# ensure_retention() runs on startup (core/apps.py) and from
+# `python manage.py apply_retention`, which also backfills `created_at` on
+# documents written before this module existed.
+
+import datetime
+import threading
+import time
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import UpdateOne
+
+TTL_FIELD = "created_at"
+
+# name -> (size_bytes, max_docs)
+CAPPED_COLLECTIONS = {
+    "analysis_timing": (64 * 1024, 100),
+    "mission_traces": (16 * 1024 * 1024, 5000),
+}
+
+# name -> (settings key, legacy float timestamp path used for backfill)
+TTL_COLLECTIONS = {
+    "raw_news_db": ("RETENTION_RAW_NEWS_DAYS", "identity.ingest_timestamp"),
+    "news_index": ("RETENTION_NEWS_INDEX_DAYS", "ingested_at"),
+    "clean_news_db": ("RETENTION_CLEAN_NEWS_DAYS", "identity.ingest_timestamp"),
+}
+
+
+def utc_now():
+    """Naive UTC datetime (what pymongo stores and TTL indexes compare against)."""
+    return datetime.datetime.utcnow()
+
+
+# --- CAPPED ---
+
+ENSURE_RETRY_SECONDS = 60  # After a failure, inline callers try again this often
+
+_ENSURED = set()
+_ENSURE_FAILED_AT = {}  # name -> time.monotonic() of the last failed attempt
+_ENSURED_LOCK = threading.Lock()
+
+
+def ensure_capped(db, name, size_bytes=None, max_docs=None):
+    """
+    Creates `name` as a capped collection, converting an existing plain one.
+    Cheap after the first success per process (and between retries after a
+    failure), so writers may call it inline.
+    """
+    if size_bytes is None:
+        size_bytes, max_docs = CAPPED_COLLECTIONS[name]
+    with _ENSURED_LOCK:
+        if name in _ENSURED:
+            return
+        failed_at = _ENSURE_FAILED_AT.get(name)
+        if failed_at is not None and time.monotonic() - failed_at < ENSURE_RETRY_SECONDS:
+            return
+        try:
+            if name in db.list_collection_names():
+                options = db[name].options()
+                if not options.get("capped"):
+                    # convertToCapped only takes a byte size; the doc cap is set below
+                    db.command("convertToCapped", name, size=size_bytes)
+                    print(f">> [RETENTION] Converted {name} to capped ({size_bytes} bytes)")
+                    options = {}
+                if max_docs and options.get("max") != max_docs:
+                    try:
+                        db.command("collMod", name, cappedMax=max_docs)
+                    except Exception as e:
+                        # collMod cappedMax needs MongoDB 6.0+; older servers keep the byte cap only
+                        print(f"[!] {name}: doc cap {max_docs} not applied: {e}")
+            else:
+                options = {"capped": True, "size": size_bytes}
+                if max_docs:
+                    options["max"] = max_docs
+                db.create_collection(name, **options)
+        except Exception as e:
+            # Lost a creation race, Mongo unreachable, or a backend without capped
+            # support (mongomock); retried after ENSURE_RETRY_SECONDS
+            _ENSURE_FAILED_AT[name] = time.monotonic()
+            print(f"[!] Capped collection '{name}' not ensured: {e}")
+            return
+        _ENSURE_FAILED_AT.pop(name, None)
+        _ENSURED.add(name)
+
+
+# --- TTL ---
+
+def ttl_seconds(collection):
+    key, _ = TTL_COLLECTIONS[collection]
+    return int(getattr(settings, key) * 86400)
+
+
+def ensure_ttl_index(db, collection, expire_seconds):
+    """Creates the TTL index, or retunes its horizon in place with collMod."""
+    col = db[collection]
+    for name, info in col.index_information().items():
+        if info.get("key") == [(TTL_FIELD, 1)]:
+            if info.get("expireAfterSeconds") != expire_seconds:
+                db.command("collMod", collection, index={
+                    "keyPattern": {TTL_FIELD: 1},
+                    "expireAfterSeconds": expire_seconds,
+                })
+                print(f">> [RETENTION] {collection}: TTL now {expire_seconds}s")
+            return
+    col.create_index([(TTL_FIELD, 1)], expireAfterSeconds=expire_seconds, name=f"ttl_{TTL_FIELD}")
+
+
+def ensure_retention(db=None):
+    if db is None:
+        from .db_utils import get_db_handle
+        db = get_db_handle()
+    for name in CAPPED_COLLECTIONS:
+        ensure_capped(db, name)
+    for collection in TTL_COLLECTIONS:
+        ensure_ttl_index(db, collection, ttl_seconds(collection))
+
+
+def _get_path(doc, dotted):
+    for part in dotted.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def backfill_created_at(db, collection, batch_size=1000):
+    """
+    Sets `created_at` on legacy docs from their float ingest timestamp
+    (falling back to the ObjectId time) so the TTL index can expire them.
+    """
+    _, legacy_path = TTL_COLLECTIONS[collection]
+    col = db[collection]
+    cursor = col.find({TTL_FIELD: {"$exists": False}}, {legacy_path: 1})
+    updated = 0
+    ops = []
+    for doc in cursor:
+        ts = _get_path(doc, legacy_path)
+        if isinstance(ts, (int, float)):
+            created = datetime.datetime.utcfromtimestamp(ts)
+        elif isinstance(doc["_id"], ObjectId):
+            created = doc["_id"].generation_time.replace(tzinfo=None)
+        else:
+            created = utc_now()
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {TTL_FIELD: created}}))
+        if len(ops) >= batch_size:
+            updated += col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += col.bulk_write(ops, ordered=False).modified_count
+    return updated
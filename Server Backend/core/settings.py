@@ -82,3 +82,65 @@ CSRF_TRUSTED_ORIGINS = ['http://146.190.7.51', 'https://146.190.7.51', 'http://l
 MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017')
 MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'sentinel')
 
+
+# Intel Translation Fan-out
+# Comma-separated language codes translated eagerly right after the English
+# master is written (e.g. "th,km"). Empty = lazy translation on first request.
+INTEL_EAGER_TRANSLATIONS = [
+    lang.strip() for lang in os.environ.get('INTEL_EAGER_TRANSLATIONS', '').split(',')
+    if lang.strip() and lang.strip() != 'en'
+]
+
+# Model Client (core/llm_client.py)
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))   # Global in-flight cap
+LLM_RATE_PER_MINUTE = int(os.environ.get('LLM_RATE_PER_MINUTE', 60))  # Per model
+LLM_BURST = int(os.environ.get('LLM_BURST', 10))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))           # 429/5xx/timeouts only
+LLM_TIMEOUT_SECONDS = int(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+LLM_QUEUE_TIMEOUT_SECONDS = int(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', 30))
+LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', 5))
+LLM_BREAKER_RESET_SECONDS = int(os.environ.get('LLM_BREAKER_RESET_SECONDS', 30))
+
+# Model Backend
+# "gemini" = live provider. "fake" = deterministic offline backend (core/llm_fake.py)
+# for load tests; shaped by LLM_FAKE_LATENCY / LLM_FAKE_FAILURE_RATE /
+# LLM_FAKE_MALFORMED_RATE / LLM_FAKE_SEED (read from the environment).
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+ATLAS_OFFLINE_FEED = os.environ.get('ATLAS_OFFLINE_FEED', '0') == '1'  # Synthetic OSINT feed
+
+# Prometheus /metrics - scrapers from these addresses, or a staff session
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+
+# Retention (core/retention.py) - TTL horizons on ingest collections
+RETENTION_RAW_NEWS_DAYS = int(os.environ.get('RETENTION_RAW_NEWS_DAYS', 7))
+RETENTION_NEWS_INDEX_DAYS = int(os.environ.get('RETENTION_NEWS_INDEX_DAYS', 30))  # Also the dedup horizon
+RETENTION_CLEAN_NEWS_DAYS = int(os.environ.get('RETENTION_CLEAN_NEWS_DAYS', 30))
+
+# Citation detail summaries (core/citation_summary.py) - cached per topic + source set
+CITATION_SUMMARY_TTL_SECONDS = int(os.environ.get('CITATION_SUMMARY_TTL_SECONDS', 1800))
+
+# Employer cards on jobs search results (core/card_cache.py) - per-process, 0 = no caching
+EMPLOYER_CARD_TTL_SECONDS = int(os.environ.get('EMPLOYER_CARD_TTL_SECONDS', 30))
+
+# Jobs search results per area cell (core/geo_cells.py) - per-process, 0 = no caching
+JOBS_SEARCH_CELL_TTL_SECONDS = int(os.environ.get('JOBS_SEARCH_CELL_TTL_SECONDS', 30))
+
+# Jobs auth principals (user/account docs behind the auth decorators) - per-process,
+# keep short: bans on another worker take effect within this window
+JOBS_PRINCIPAL_TTL_SECONDS = int(os.environ.get('JOBS_PRINCIPAL_TTL_SECONDS', 5))
+
+# Jobs account passwords (core/passwords.py) - tune with `manage.py calibrate_password_hashing`
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')  # argon2 (needs argon2-cffi) | pbkdf2_sha256
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 3))
+PASSWORD_ARGON2_MEMORY_KIB = int(os.environ.get('PASSWORD_ARGON2_MEMORY_KIB', 65536))
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 390000))  # Django 4.1 default
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 64))  # Waiting beyond the workers, then 503
+PASSWORD_HASH_WAIT_SECONDS = int(os.environ.get('PASSWORD_HASH_WAIT_SECONDS', 5))
+
+# Jobs chat push channel (jobs_v2/events.py) - each open stream holds a worker thread
+JOBS_EVENT_STREAM_SECONDS = int(os.environ.get('JOBS_EVENT_STREAM_SECONDS', 300))  # Then the client reconnects
+JOBS_EVENT_HEARTBEAT_SECONDS = int(os.environ.get('JOBS_EVENT_HEARTBEAT_SECONDS', 15))
+JOBS_EVENT_MAX_STREAMS = int(os.environ.get('JOBS_EVENT_MAX_STREAMS', 24))  # Per process; keep well under gunicorn --threads
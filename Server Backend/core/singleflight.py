@@ -0,0 +1,203 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: singleflight.py
+# ROLE:   REQUEST COALESCING (ONE IN-FLIGHT COMPUTATION PER KEY)
+# ==============================================================================
+#
+#   value = coalesce("portal:threats", compute)                     # per process
+#   value = coalesce("debug:pipeline", compute, lease_seconds=300)  # all workers
+#
+# The first caller for `key` runs compute(); callers arriving while it runs
+# block and receive the same value (or the same exception). Nothing is kept
+# after the call returns, so caching is the caller's job.
+#
+# With `lease_seconds`, the in-process leader also takes a lease document in
+# `singleflight_leases` so gunicorn workers coalesce too: other processes poll
+# the lease and read the leader's result from it. Results must therefore be
+# BSON-serializable. A finished lease keeps its result for
+# RESULT_GRACE_SECONDS, and callers arriving in that window read it instead of
+# starting a new run. A lease whose holder died is taken over after
+# `lease_seconds`; if Mongo is unreachable the work simply runs locally.
+#
+# With `wait_seconds`, a caller that is not the leader gives up after that
+# long with SingleFlightPending (views answer "calculating" and the client asks
+# again) instead of holding a request thread for the whole computation.
+
+import datetime
+import threading
+import time
+import uuid
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+LEASE_COLLECTION = "singleflight_leases"
+RESULT_GRACE_SECONDS = 30  # finished leases stay readable for late pollers
+POLL_MIN_SECONDS = 0.05
+POLL_MAX_SECONDS = 1.0
+
+
+class SingleFlightError(Exception):
+    """The leader in another process failed; carries its error message."""
+
+
+class SingleFlightPending(Exception):
+    """Another caller is still computing this key; ask again later."""
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, wait_seconds=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            if not call.done.wait(wait_seconds):
+                raise SingleFlightPending(key)
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class MongoLease:
+    """Cross-process single-flight over one lease document per key."""
+
+    def __init__(self, collection, lease_seconds, wait_seconds=None):
+        self.col = collection
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+
+    def _acquire(self, key, token):
+        now = datetime.datetime.utcnow()
+        lease = {
+            "token": token,
+            "state": "running",
+            "expires_at": now + datetime.timedelta(seconds=self.lease_seconds),
+        }
+        try:
+            self.col.insert_one({"_id": key, **lease})
+            return True
+        except DuplicateKeyError:
+            pass
+        # Take over a failed lease, or an expired one (holder died, or a done
+        # result past RESULT_GRACE_SECONDS). A fresh done result is read instead.
+        taken = self.col.find_one_and_update(
+            {"_id": key, "$or": [{"state": "failed"}, {"expires_at": {"$lte": now}}]},
+            {"$set": lease, "$unset": {"result": "", "error": ""}},
+        )
+        return taken is not None
+
+    def _lead(self, key, token, fn):
+        try:
+            value = fn()
+        except Exception as e:
+            self._finish(key, token, {"state": "failed", "error": str(e)})
+            raise
+        self._finish(key, token, {"state": "done", "result": value})
+        return value
+
+    def _finish(self, key, token, fields):
+        fields["expires_at"] = datetime.datetime.utcnow() + datetime.timedelta(seconds=RESULT_GRACE_SECONDS)
+        try:
+            self.col.update_one({"_id": key, "token": token}, {"$set": fields})
+        except PyMongoError as e:
+            print(f"[!] Lease release failed ({key}): {e}")
+
+    def do(self, key, fn):
+        token = uuid.uuid4().hex
+        try:
+            if self._acquire(key, token):
+                return self._lead(key, token, fn)
+            current = self.col.find_one({"_id": key}) or {}
+            if current.get("state") == "done":
+                # Finished within the grace period: e.g. a follower retrying after SingleFlightPending
+                return current.get("result")
+            watched = current.get("token")
+        except PyMongoError as e:
+            print(f"[!] Lease unavailable ({key}), running locally: {e}")
+            return fn()
+
+        deadline = time.monotonic() + self.wait_seconds if self.wait_seconds is not None else None
+        delay = POLL_MIN_SECONDS
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SingleFlightPending(key)
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+            doc = self.col.find_one({"_id": key})
+            now = datetime.datetime.utcnow()
+            if doc and doc["token"] == watched:
+                if doc["state"] == "done":
+                    return doc.get("result")
+                if doc["state"] == "failed":
+                    raise SingleFlightError(doc.get("error", "leader failed"))
+                if doc["expires_at"] > now:
+                    continue
+            elif doc and doc["state"] == "running" and doc["expires_at"] > now:
+                # A newer leader took over; wait for that one instead
+                watched = doc["token"]
+                continue
+            if self._acquire(key, token):
+                return self._lead(key, token, fn)
+            watched = (self.col.find_one({"_id": key}, {"token": 1}) or {}).get("token")
+
+
+def ensure_lease_indexes(db):
+    db[LEASE_COLLECTION].create_index("expires_at", expireAfterSeconds=0, name="ttl_expires_at")
+
+
+_GROUP = SingleFlight()
+
+
+def coalesce(key, fn, lease_seconds=None, db=None, wait_seconds=None):
+    """
+    Runs fn() once per key across concurrent callers in this process and,
+    with `lease_seconds`, across processes sharing the Mongo database.
+    Followers raise SingleFlightPending after `wait_seconds` (None = wait it out).
+    """
+    if not lease_seconds:
+        return _GROUP.do(key, fn, wait_seconds)
+
+    def lead():
+        handle = db
+        if handle is None:
+            from .db_utils import get_db_handle
+            handle = get_db_handle()
+        return MongoLease(handle[LEASE_COLLECTION], lease_seconds, wait_seconds).do(key, fn)
+
+    return _GROUP.do(key, lead, wait_seconds)
@@ -0,0 +1,47 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: startup.py
+# ROLE:   MONGO INDEX / CAPPED COLLECTION SETUP AT SERVER START
+# ==============================================================================
+#
+# Runs from core/wsgi.py (gunicorn and runserver both load it) and from
+# `manage.py apply_retention`, not from AppConfig.ready(), so other
+# management commands and migrations never touch Mongo.
+
+
+def ensure_core_storage(db=None):
+    """
+    Capped telemetry + TTL indexes (core/retention.py)
+    + citation store / summary cache indexes (core/news_store.py, core/citation_summary.py)
+    + single-flight lease expiry (core/singleflight.py), map overlays (core/threat_overlays.py)
+    + slim intel read model (core/intel_summary.py), review queue (core/approvals.py),
+    backfilled from intel_history on the first start after a deploy
+    """
+    from .approvals import ensure_approval_indexes
+    from .citation_summary import ensure_summary_indexes
+    from .db_utils import get_db_handle
+    from .intel_summary import backfill_read_models, ensure_intel_summary_indexes
+    from .news_store import ensure_news_indexes
+    from .retention import ensure_retention
+    from .singleflight import ensure_lease_indexes
+    from .threat_overlays import ensure_overlay_indexes
+
+    db = db if db is not None else get_db_handle()
+    ensure_retention(db)
+    ensure_news_indexes(db)
+    ensure_summary_indexes(db)
+    ensure_lease_indexes(db)
+    ensure_overlay_indexes(db)
+    ensure_intel_summary_indexes(db)
+    ensure_approval_indexes(db)
+    rebuilt = backfill_read_models(db)
+    if rebuilt:
+        print(f"[CORE] Intel read models backfilled for {rebuilt} zips")
+
+
+def ensure_core_storage_at_startup():
+    try:
+        ensure_core_storage()
+    except (Exception, SystemExit) as e:
+        # get_db_handle() exits when Mongo is down; startup must not
+        print(f"[CORE] Retention/index setup deferred: {e}")
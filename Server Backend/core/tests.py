@@ -0,0 +1,213 @@
+import datetime
+import hashlib
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core import passwords
+from core.llm_client import CircuitBreaker, TokenBucket
+from core.singleflight import MongoLease, SingleFlightPending
+
+try:
+    import mongomock
+except ImportError:  # Optional: pip install mongomock (same as benchmarks --mongomock)
+    mongomock = None
+
+
+@override_settings(PASSWORD_HASHER=passwords.PBKDF2, PASSWORD_PBKDF2_ITERATIONS=1000)
+class PasswordTests(SimpleTestCase):
+
+    def test_pbkdf2_round_trip(self):
+        encoded = passwords.hash_password("s3cret")
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+        setter = mock.Mock()
+        self.assertTrue(passwords.check_password("s3cret", encoded, setter))
+        self.assertFalse(passwords.check_password("wrong", encoded, setter))
+        setter.assert_not_called()
+
+    def test_legacy_sha256_is_upgraded(self):
+        legacy = hashlib.sha256(b"s3cret").hexdigest()
+        setter = mock.Mock()
+        self.assertTrue(passwords.check_password("s3cret", legacy, setter))
+        upgraded = setter.call_args[0][0]
+        self.assertTrue(upgraded.startswith("pbkdf2_sha256$"))
+        self.assertTrue(passwords.check_password("s3cret", upgraded))
+
+    def test_legacy_sha256_wrong_password(self):
+        setter = mock.Mock()
+        self.assertFalse(passwords.check_password("wrong", hashlib.sha256(b"s3cret").hexdigest(), setter))
+        setter.assert_not_called()
+
+    def test_django_pbkdf2_hash_verifies(self):
+        # v1 accounts were hashed with make_password
+        encoded = make_password("s3cret", hasher="pbkdf2_sha256")
+        setter = mock.Mock()
+        self.assertTrue(passwords.check_password("s3cret", encoded, setter))
+        setter.assert_not_called()  # Django's iteration count is above ours
+
+    def test_under_cost_hash_is_rehashed(self):
+        encoded = passwords.hash_password("s3cret")
+        setter = mock.Mock()
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(passwords.check_password("s3cret", encoded, setter))
+        self.assertTrue(setter.call_args[0][0].startswith("pbkdf2_sha256$2000$"))
+
+    def test_argon2_hash_without_backend_fails(self):
+        with mock.patch.object(passwords, "PasswordHasher", None):
+            self.assertFalse(passwords.check_password("s3cret", "$argon2id$v=19$m=65536,t=3,p=1$c2FsdA$aGFzaA"))
+
+    def test_busy_pool_raises(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch.object(passwords, "_pool", ThreadPoolExecutor(max_workers=1)), \
+                mock.patch.object(passwords, "_slots", slots):
+            with self.assertRaises(passwords.PasswordServiceBusy):
+                passwords.hash_password("s3cret")
+
+    def test_busy_rehash_keeps_the_login(self):
+        legacy = hashlib.sha256(b"s3cret").hexdigest()
+        setter = mock.Mock()
+        with mock.patch.object(passwords, "hash_password", side_effect=passwords.PasswordServiceBusy):
+            self.assertTrue(passwords.check_password("s3cret", legacy, setter))
+        setter.assert_not_called()
+
+    def test_busy_response(self):
+        response = passwords.busy_response()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+    @unittest.skipUnless(mongomock, "mongomock not installed")
+    def test_stored_argon2_hashes_need_backend(self):
+        users = mongomock.MongoClient().db.jobs_users
+        users.insert_one({"account_id": "usr_1", "password_hash": "$argon2id$v=19$m=65536,t=3,p=1$c2FsdA$aGFzaA"})
+        with mock.patch.object(passwords, "PasswordHasher", None):
+            with self.assertRaises(ImproperlyConfigured):
+                passwords.check_stored_hashes(users)
+        users.delete_many({})
+        with mock.patch.object(passwords, "PasswordHasher", None):
+            passwords.check_stored_hashes(users)
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_burst_then_limit(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0))
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertTrue(bucket.acquire(timeout=0))
+        bucket._updated -= 0.2  # 200 ms later: two tokens' worth, capped at burst
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0))
+
+    def test_waits_for_a_token(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        bucket.acquire()
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+        for _ in range(3):
+            breaker.record_failure()
+        breaker._opened_at -= 60
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_released_trial_lets_the_next_call_try(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        self.assertTrue(breaker.allow())
+        breaker.release_trial()
+        self.assertTrue(breaker.allow())
+
+
+@unittest.skipUnless(mongomock, "mongomock not installed")
+class MongoLeaseTests(SimpleTestCase):
+
+    def setUp(self):
+        self.col = mongomock.MongoClient().db.singleflight_leases
+
+    def _lease(self, state, expires_in, **fields):
+        self.col.insert_one({
+            "_id": "k", "token": "other", "state": state,
+            "expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in),
+            **fields
+        })
+
+    def test_leader_stores_result(self):
+        self.assertEqual(MongoLease(self.col, 60).do("k", lambda: {"v": 1}), {"v": 1})
+        doc = self.col.find_one({"_id": "k"})
+        self.assertEqual(doc["state"], "done")
+        self.assertEqual(doc["result"], {"v": 1})
+
+    def test_done_lease_is_served_not_rerun(self):
+        self._lease("done", 30, result=7)
+        fn = mock.Mock(return_value=8)
+        self.assertEqual(MongoLease(self.col, 60).do("k", fn), 7)
+        fn.assert_not_called()
+
+    def test_follower_gives_up_after_wait_seconds(self):
+        self._lease("running", 60)
+        fn = mock.Mock()
+        with self.assertRaises(SingleFlightPending):
+            MongoLease(self.col, 60, wait_seconds=0.1).do("k", fn)
+        fn.assert_not_called()
+
+    def test_expired_lease_is_taken_over(self):
+        self._lease("running", -1)
+        self.assertEqual(MongoLease(self.col, 60).do("k", lambda: 3), 3)
+        self.assertNotEqual(self.col.find_one({"_id": "k"})["token"], "other")
+
+    def test_failed_lease_is_retried(self):
+        self._lease("failed", 30, error="boom")
+        self.assertEqual(MongoLease(self.col, 60).do("k", lambda: 4), 4)
+
+    def test_leader_failure_is_recorded(self):
+        def fail():
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            MongoLease(self.col, 60).do("k", fail)
+        doc = self.col.find_one({"_id": "k"})
+        self.assertEqual((doc["state"], doc["error"]), ("failed", "boom"))
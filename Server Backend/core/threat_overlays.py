@@ -0,0 +1,112 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: threat_overlays.py
+# ROLE:   MATERIALISED THREAT OVERLAYS FOR THE PORTAL MAP
+# ==============================================================================
+#
+# One `threat_overlays` doc per overlay name (the map dedupes by name), written
+# whenever an intel_history report is written or edited. `zip_codes` lists the
+# reports currently carrying the overlay; an overlay is deleted once no report
+# does. The map reads it with one (optionally bbox-filtered) indexed query.
+
+import datetime
+
+from pymongo import DESCENDING, GEOSPHERE
+
+OVERLAY_COLLECTION = "threat_overlays"
+
+# Radius (m) by keyword in name/type; first match wins
+RADIUS_RULES = (
+    (("artillery", "mortar"), 20000),
+    (("infantry", "troop"), 5000),
+    (("armor", "tank"), 10000),
+    (("rocket", "missile"), 40000),
+    (("air", "strike"), 50000),
+)
+DEFAULT_RADIUS = 5000
+
+
+def overlay_radius(name, type_str):
+    text = (name + " " + type_str).lower()
+    for keywords, radius in RADIUS_RULES:
+        if any(k in text for k in keywords):
+            return radius
+    return DEFAULT_RADIUS
+
+
+def ensure_overlay_indexes(db):
+    col = db[OVERLAY_COLLECTION]
+    col.create_index([("location", GEOSPHERE)], name="location_2dsphere")
+    col.create_index("zip_codes", name="zip_codes")
+    col.create_index([("last_seen", DESCENDING)], name="last_seen_desc")
+
+
+def _location(ov):
+    try:
+        lat, lon = float(ov.get('lat')), float(ov.get('lon'))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return {"type": "Point", "coordinates": [lon, lat]}
+
+
+def sync_zip(db, zip_code, intel_en):
+    """Upserts the overlays of one zip's English report and detaches the ones it dropped."""
+    col = db[OVERLAY_COLLECTION]
+    now = datetime.datetime.utcnow()
+    defcon = intel_en.get('defcon_status', 'N/A')
+    names = []
+    for ov in intel_en.get('tactical_overlays', []) or []:
+        name = ov.get('name', 'Unknown')
+        if name in names:
+            continue
+        names.append(name)
+        fields = {
+            "name": name,
+            "lat": ov.get('lat'),
+            "lon": ov.get('lon'),
+            "radius": overlay_radius(name, ov.get('type', '')),
+            "type": ov.get('type', 'Conflict Zone'),
+            "defcon": defcon,
+            "last_kinetic": ov.get('date', 'Unknown'),  # DB uses 'date' often
+            "last_seen": now,
+        }
+        update = {"$set": fields, "$addToSet": {"zip_codes": zip_code}}
+        location = _location(ov)
+        if location:
+            fields["location"] = location
+        else:
+            update["$unset"] = {"location": ""}
+        col.update_one({"_id": name}, update, upsert=True)
+
+    col.update_many({"zip_codes": zip_code, "_id": {"$nin": names}}, {"$pull": {"zip_codes": zip_code}})
+    col.delete_many({"zip_codes": {"$size": 0}})
+
+
+def refresh_zip(db, zip_code):
+    """Re-syncs a zip from its stored report (after admin edits)."""
+    doc = db.intel_history.find_one({'zip_code': zip_code}, {"languages.en": 1})
+    sync_zip(db, zip_code, (doc or {}).get('languages', {}).get('en', {}))
+
+
+def find_overlays(db, bbox=None):
+    """Map payload; `bbox` = (min_lon, min_lat, max_lon, max_lat) limits it to the viewport."""
+    query = {}
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        query["location"] = {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [[
+            [min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat], [min_lon, min_lat],
+        ]]}}}
+    projection = {"_id": 0, "name": 1, "lat": 1, "lon": 1, "radius": 1, "type": 1, "defcon": 1, "last_kinetic": 1}
+    return list(db[OVERLAY_COLLECTION].find(query, projection).sort("last_seen", DESCENDING))
+
+
+def rebuild_from_history(db):
+    """Rebuilds the collection from every intel_history report; returns the overlay count."""
+    db[OVERLAY_COLLECTION].delete_many({})
+    for doc in db.intel_history.find({}, {"zip_code": 1, "languages.en.tactical_overlays": 1,
+                                          "languages.en.defcon_status": 1}):
+        if doc.get('zip_code'):
+            sync_zip(db, doc['zip_code'], doc.get('languages', {}).get('en', {}))
+    return db[OVERLAY_COLLECTION].count_documents({})
@@ -0,0 +1,302 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: tracing.py
+# ROLE:   MISSION SPANS, ROLLING LATENCY HISTOGRAMS, PROMETHEUS EXPORT
+# ==============================================================================
+#
+#   trace = start_trace("mission", zip_code=zip_code)
+#   with span("analyst"):
+#       ...
+#   finish_trace(trace)          # -> capped collection `mission_traces`
+#
+# Every span feeds a per-(name, labels) histogram whether or not a trace is
+# active, so request-path spans (e.g. geocode) show up in /metrics too.
+# Worker threads join a mission's trace with `with activate(trace):`.
+
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from .retention import ensure_capped
+
+TRACE_COLLECTION = "mission_traces"  # capped, see retention.CAPPED_COLLECTIONS
+
+# Prometheus `le` boundaries (seconds) for the cumulative bucket export
+PROM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+# --- HISTOGRAMS ---
+
+class LogLinearHistogram:
+    """
+    HDR-style histogram over milliseconds: every power of two is split into
+    SUB_BUCKETS linear buckets, so relative error stays under 1/SUB_BUCKETS
+    from sub-millisecond spans up to multi-minute missions in a few hundred ints.
+    """
+
+    SUB_BUCKETS = 16
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _index(cls, value):
+        if value < 1:
+            return 0
+        exponent = int(math.log2(value))
+        sub = int((value / (2 ** exponent) - 1) * cls.SUB_BUCKETS)
+        return 1 + exponent * cls.SUB_BUCKETS + min(sub, cls.SUB_BUCKETS - 1)
+
+    @classmethod
+    def _upper_bound(cls, index):
+        if index == 0:
+            return 1.0
+        exponent, sub = divmod(index - 1, cls.SUB_BUCKETS)
+        return (2 ** exponent) * (1 + (sub + 1) / cls.SUB_BUCKETS)
+
+    def record(self, value_ms):
+        idx = self._index(value_ms)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def merge(self, other):
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(self._upper_bound(idx), self.max)
+        return self.max
+
+    def count_le(self, bound_ms):
+        return sum(n for idx, n in self.counts.items() if self._upper_bound(idx) <= bound_ms)
+
+
+class RollingHistogram:
+    """Cumulative histogram (for Prometheus buckets) + ring of per-window histograms (for quantiles)."""
+
+    def __init__(self, window_seconds=60, windows=15):
+        self.window_seconds = window_seconds
+        self.cumulative = LogLinearHistogram()
+        self._windows = deque(maxlen=windows)
+        self._lock = threading.Lock()
+
+    def record(self, value_ms):
+        now = time.time()
+        with self._lock:
+            self.cumulative.record(value_ms)
+            if not self._windows or now - self._windows[-1][0] >= self.window_seconds:
+                self._windows.append((now, LogLinearHistogram()))
+            self._windows[-1][1].record(value_ms)
+
+    def recent(self):
+        horizon = time.time() - self.window_seconds * (self._windows.maxlen or 1)
+        merged = LogLinearHistogram()
+        with self._lock:
+            for started, hist in self._windows:
+                if started >= horizon:
+                    merged.merge(hist)
+        return merged
+
+
+_HISTOGRAMS = {}
+_HISTOGRAMS_LOCK = threading.Lock()
+
+
+def observe(name, duration_ms, **labels):
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _HISTOGRAMS_LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = RollingHistogram()
+    hist.record(duration_ms)
+
+
+def get_span_stats():
+    """{'analyst': {'count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}, ...} over the rolling window."""
+    with _HISTOGRAMS_LOCK:
+        items = list(_HISTOGRAMS.items())
+    stats = {}
+    for (name, labels), hist in items:
+        recent = hist.recent()
+        key = name + "".join(f"[{k}={v}]" for k, v in labels)
+        stats[key] = {
+            "count": recent.count,
+            "p50_ms": round(recent.quantile(0.50), 1),
+            "p95_ms": round(recent.quantile(0.95), 1),
+            "p99_ms": round(recent.quantile(0.99), 1),
+            "max_ms": round(recent.max or 0, 1),
+        }
+    return stats
+
+
+# --- TRACES ---
+
+class Trace:
+
+    def __init__(self, name, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = attrs
+        self.started = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, started, duration_ms, labels, error):
+        entry = {
+            "name": name,
+            "offset_ms": round((started - self.started) * 1000, 1),
+            "duration_ms": round(duration_ms, 1),
+        }
+        if labels:
+            entry["labels"] = labels
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.spans.append(entry)
+
+
+_local = threading.local()
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def start_trace(name, **attrs):
+    trace = Trace(name, **attrs)
+    _local.trace = trace
+    return trace
+
+
+@contextmanager
+def activate(trace):
+    """Attach spans recorded on this thread (e.g. a pool worker) to `trace`."""
+    previous = current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+@contextmanager
+def span(name, **labels):
+    started = time.time()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.time() - started) * 1000
+        observe(name, duration_ms, **labels)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span(name, started, duration_ms, labels, error)
+
+
+def finish_trace(trace, db=None, **attrs):
+    """Closes the trace, records its total duration and persists it (best effort)."""
+    duration_ms = (time.time() - trace.started) * 1000
+    observe(trace.name, duration_ms)
+    if current_trace() is trace:
+        _local.trace = None
+    trace.attrs.update(attrs)
+    try:
+        if db is None:
+            from .db_utils import get_db_handle
+            db = get_db_handle()
+        ensure_capped(db, TRACE_COLLECTION)
+        db[TRACE_COLLECTION].insert_one({
+            "trace_id": trace.trace_id,
+            "name": trace.name,
+            "attrs": trace.attrs,
+            "started_at": trace.started,
+            "duration_ms": round(duration_ms, 1),
+            "spans": sorted(trace.spans, key=lambda s: s["offset_ms"]),
+        })
+    except Exception as e:
+        print(f"[!] Trace Persist Error: {e}")
+    return duration_ms
+
+
+# --- PROMETHEUS EXPORT ---
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels)
+    return "{" + body + "}"
+
+
+def render_prometheus(llm_metrics=None):
+    """Text exposition format (0.0.4) for span histograms and model client counters."""
+    lines = [
+        "# HELP sentinel_span_duration_seconds Duration of mission stages and request spans.",
+        "# TYPE sentinel_span_duration_seconds histogram",
+    ]
+    with _HISTOGRAMS_LOCK:
+        items = sorted(_HISTOGRAMS.items())
+
+    for (name, labels), hist in items:
+        base = (("span", name),) + labels
+        with hist._lock:
+            cumulative = LogLinearHistogram()
+            cumulative.merge(hist.cumulative)
+        for le in PROM_BUCKETS:
+            lbl = _label_str(base + (("le", str(le)),))
+            lines.append(f"sentinel_span_duration_seconds_bucket{lbl} {cumulative.count_le(le * 1000)}")
+        lines.append(f"sentinel_span_duration_seconds_bucket{_label_str(base + (('le', '+Inf'),))} {cumulative.count}")
+        lines.append(f"sentinel_span_duration_seconds_sum{_label_str(base)} {cumulative.total / 1000:.6f}")
+        lines.append(f"sentinel_span_duration_seconds_count{_label_str(base)} {cumulative.count}")
+
+    lines.append("# HELP sentinel_span_recent_seconds Rolling-window quantiles (last 15 minutes).")
+    lines.append("# TYPE sentinel_span_recent_seconds gauge")
+    for (name, labels), hist in items:
+        recent = hist.recent()
+        for q in (0.5, 0.95, 0.99):
+            lbl = _label_str((("span", name),) + labels + (("quantile", str(q)),))
+            lines.append(f"sentinel_span_recent_seconds{lbl} {recent.quantile(q) / 1000:.6f}")
+
+    if llm_metrics:
+        counters = (
+            ("calls", "Model calls completed."), ("errors", "Model calls that failed."),
+            ("retries", "Retried model attempts."), ("short_circuits", "Calls rejected by the circuit breaker."),
+            ("throttled", "Calls that timed out in the local rate/concurrency limiter."),
+            ("prompt_tokens", "Prompt tokens sent."), ("output_tokens", "Output tokens received."),
+        )
+        for key, help_text in counters:
+            lines.append(f"# HELP sentinel_llm_{key}_total {help_text}")
+            lines.append(f"# TYPE sentinel_llm_{key}_total counter")
+            for model, m in sorted(llm_metrics.items()):
+                lines.append(f"sentinel_llm_{key}_total{_label_str((('model', model),))} {m.get(key, 0)}")
+        lines.append("# HELP sentinel_llm_breaker_open Circuit breaker state (1 = open or half-open).")
+        lines.append("# TYPE sentinel_llm_breaker_open gauge")
+        for model, m in sorted(llm_metrics.items()):
+            is_open = 0 if m.get("breaker_state", "closed") == "closed" else 1
+            lines.append(f"sentinel_llm_breaker_open{_label_str((('model', model),))} {is_open}")
+
+    return "\n".join(lines) + "\n"
@@ -53,12 +53,15 @@ urlpatterns = [
 
     # --- ADMIN API: OPS ---
     path('admin/ops/logs', views.get_server_logs, name='get_server_logs'),
+    path('metrics', views.metrics, name='metrics'),
     path('api/admin/approvals', admin_views.api_get_approvals, name='api_get_approvals'),
+    path('api/admin/approvals/claim', admin_views.api_claim_approval, name='api_claim_approval'),
     path('api/admin/approvals/decide', admin_views.api_decide_approval, name='api_decide_approval'),
     path('api/admin/alerts', admin_views.api_get_active_alerts, name='api_get_active_alerts'),
     path('api/admin/alerts/save', admin_views.api_save_alert_map, name='api_save_alert_map'),
     path('api/admin/threats', admin_views.api_get_threats, name='api_get_threats'),
     path('api/admin/zip-defcon', admin_views.api_get_zip_defcon, name='api_get_zip_defcon'),
+    path('api/admin/zip-defcon/tiles/<int:z>/<int:x>/<int:y>', admin_views.api_get_zip_defcon_tile, name='api_get_zip_defcon_tile'),
     path('api/admin/sitrep', admin_views.api_get_sitrep, name='api_get_sitrep'),
     path('admin/verify', views.admin_verify_threat, name='admin_verify_threat'), # MANUAL OVERRIDE
 
@@ -5,7 +5,8 @@
 # ==============================================================================
 
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from django.conf import settings
 from .db_utils import get_db_handle
 import google.generativeai as genai
 import feedparser
@@ -21,14 +22,25 @@ import socket
 import traceback
 import hashlib
 import pytz
+from concurrent.futures import ThreadPoolExecutor
 from dateutil import parser as date_parser
 from bson.son import SON 
+from pymongo import ReturnDocument
 from . import geo_utils
 from django.views.decorators.csrf import csrf_exempt
 from .atlas_schema import SourceTier, IngestMethod, ProcessingStatus
 from .gates.gate_1_ingest import Gate1Ingest
 from .gates.gate_2_base import Gate2Base
 from .gates.gate_2_reinforced import Gate2Reinforced
+from .llm_client import get_client, get_llm_metrics
+from .tracing import span, start_trace, finish_trace, activate, current_trace, render_prometheus
+from .retention import ensure_capped, utc_now
+from .news_store import find_citations
+from . import citation_summary
+from .singleflight import SingleFlightPending, coalesce
+from . import approvals
+from .approvals import PENDING as REVIEW_PENDING
+from .intel_summary import add_language, sync_read_models
 
 # --- CONFIGURATION ---
 # Import from the adjacent Developer Inputs folder
@@ -62,6 +74,11 @@ STALE_THRESHOLD_SECONDS = 14400
 
 # --- CONCURRENCY CONTROL ---
 MISSION_QUEUE = {} 
+TRANSLATION_QUEUE = {}  # (zip_code, lang) -> start time
+
+# --- TRANSLATION FAN-OUT ---
+LANGUAGE_NAMES = {"th": "THAI", "km": "KHMER"}
+EAGER_TRANSLATION_LANGS = getattr(settings, 'INTEL_EAGER_TRANSLATIONS', [])
 
 # --- LOADING PROGRESS MAPPING ---
 PROGRESS_MAP = {
@@ -79,17 +96,14 @@ genai.configure(api_key=GEMINI_API_KEY)
 # --- MODEL INITIALIZATION ---
 print(">> [INIT] Loading AI Models...")
 
+# Shared clients (rate limit, retries, circuit breaker) - see core/llm_client.py
 # 1. ANALYST
-try:
-    ANALYST_MODEL = genai.GenerativeModel("gemini-3-pro-preview")
-except:
-    ANALYST_MODEL = genai.GenerativeModel("gemini-2.0-flash")
+ANALYST_MODEL = get_client("gemini-3-pro-preview", fallback_model="gemini-2.0-flash")
 
 # 2. TRANSLATOR
-try:
-    TRANSLATOR_MODEL = genai.GenerativeModel("gemini-2.5-flash-lite")
-except:
-    TRANSLATOR_MODEL = genai.GenerativeModel("gemini-1.5-flash")
+TRANSLATOR_MODEL = get_client("gemini-2.5-flash-lite", fallback_model="gemini-1.5-flash")
+
+# 3. CITATIONS: see core/citation_summary.py
 
 # --- GEOSPATIAL LOOKUP ---
 def get_geo_from_csv(zip_code):
@@ -155,6 +169,10 @@ def load_osint_sources():
 
 def fetch_from_source(source, query):
     """Fetch news from a single OSINT source."""
+    if getattr(settings, 'ATLAS_OFFLINE_FEED', False):
+        from .llm_fake import fake_osint_entries
+        return fake_osint_entries(source)
+
     entries = []
     url = source['URL'].replace('%QUERY%', query.replace(' ', '+'))
     url = url.replace('%DATE%', datetime.datetime.now().strftime('%Y-%m-%d'))
@@ -218,7 +236,8 @@ def run_atlas_pipeline():
         # 2. FETCH FROM ALL ACTIVE SOURCES
         print(f">> [ATLAS] Querying {len(sources)} sources...")
         for source in sources:
-            entries = fetch_from_source(source, query)
+            with span("atlas.fetch", source=source['Source']):
+                entries = fetch_from_source(source, query)
             all_entries.extend(entries)
             if entries:
                 print(f"   + {source['Source']}: {len(entries)} items (score: {source['ValidityScore']})")
@@ -232,24 +251,27 @@ def run_atlas_pipeline():
         for entry in all_entries[:50]:  # Cap at 50 for speed
             
             # GATE 1: INGEST & DEDUP
-            packet = gate1.process_packet(
-                raw_input=entry,
-                source_id=entry.get('source', 'unknown'),
-                source_tier=SourceTier.TRUSTED_MEDIA,
-                ingest_method=IngestMethod.RSS,
-                source_validity=entry.get('validity_score', 75)  # Pass validity from CSV
-            )
+            with span("gate1"):
+                packet = gate1.process_packet(
+                    raw_input=entry,
+                    source_id=entry.get('source', 'unknown'),
+                    source_tier=SourceTier.TRUSTED_MEDIA,
+                    ingest_method=IngestMethod.RSS,
+                    source_validity=entry.get('validity_score', 75)  # Pass validity from CSV
+                )
             
             if not packet:
                 continue  # Dropped by Gate 1 (Duplicate)
                 
             # GATE 2: BASE (CLASSIFY)
-            packet = gate2_base.process_packet(packet)
+            with span("gate2"):
+                packet = gate2_base.process_packet(packet)
             
             # GATE 2: REINFORCED (VERIFY MAYBES)
             if packet.triage.processing_status == ProcessingStatus.PENDING_REINFORCED:
                 update_status("Atlas G3: Verifying")
-                packet = gate2_reinforced.process_packet(packet)
+                with span("gate2r"):
+                    packet = gate2_reinforced.process_packet(packet)
             
             # FINAL COLLECTION
             if packet.triage.processing_status == ProcessingStatus.CLEAN:
@@ -274,13 +296,14 @@ def run_atlas_pipeline():
         db = get_db_handle()
         clean_db = db['clean_news_db']
         
-        for p in clean_packets:
-            # Upsert based on artifact_id to prevent duplicates if re-processed
-            clean_db.replace_one(
-                {"identity.artifact_id": p.identity.artifact_id},
-                p.dict(),
-                upsert=True
-            )
+        with span("db.write", collection="clean_news_db"):
+            for p in clean_packets:
+                # Upsert based on artifact_id to prevent duplicates if re-processed
+                clean_db.replace_one(
+                    {"identity.artifact_id": p.identity.artifact_id},
+                    {**p.dict(), "created_at": utc_now()},  # TTL anchor (core/retention.py)
+                    upsert=True
+                )
         print(f">> [ATLAS] Persisted {len(clean_packets)} Clean Packets to DB.")
         
     except Exception as e:
@@ -308,52 +331,110 @@ def update_status(stage, zip_code=None):
     except Exception as e:
         print(f"[!] Status Update Error: {e}")
 
+TRANSLATION_PROGRESS_SECONDS = 600  # Older per-zip progress is no longer reported
+
+def update_translation_progress(zip_code, lang, state):
+    """
+    Per-language fan-out progress (queued | running | done | failed), in its own
+    per-zip doc so update_status() replacing global_status cannot wipe it.
+    """
+    try:
+        db = get_db_handle()
+        db.system_status.update_one(
+            {"_id": f"translations:{zip_code}"},
+            {"$set": {f"langs.{lang}": state, "zip_code": zip_code, "last_updated": time.time()}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"[!] Translation Progress Error: {e}")
+
+# Rolling window of the last TIMING_WINDOW mission durations, snapshotted to one
+# system_status doc. Status polls read the per-process copy, refreshed from the
+# snapshot at most every TIMING_REFRESH_SECONDS (other workers' missions).
+TIMING_WINDOW = 100
+TIMING_REFRESH_SECONDS = 15
+TIMING_SNAPSHOT_ID = "timing_stats"
+TIMING_CACHE = {"stats": None, "loaded_at": 0.0}
+
+def compute_timing_stats(samples):
+    if not samples:
+        return None
+    return {
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "avg_ms": int(sum(samples) / len(samples)),
+        "sample_count": len(samples)
+    }
+
 def record_analysis_timing(elapsed_ms):
-    """Record analysis timing for statistics (keep last 100)."""
+    """Record analysis timing (capped history) and roll it into the stats snapshot."""
     try:
         db = get_db_handle()
+        ensure_capped(db, "analysis_timing")
         db.analysis_timing.insert_one({
             "elapsed_ms": elapsed_ms,
             "timestamp": time.time()
         })
-        # Prune to last 100
-        count = db.analysis_timing.count_documents({})
-        if count > 100:
-            oldest = db.analysis_timing.find().sort("timestamp", 1).limit(count - 100)
-            db.analysis_timing.delete_many({"_id": {"$in": [d["_id"] for d in oldest]}})
+        
+        # One pipeline update appends + trims the window and recomputes the stats
+        # from that same window, so concurrent missions never store stale stats.
+        # Same numbers as compute_timing_stats().
+        snapshot = db.system_status.find_one_and_update(
+            {"_id": TIMING_SNAPSHOT_ID},
+            [
+                {"$set": {"samples": {"$slice": [
+                    {"$concatArrays": [{"$ifNull": ["$samples", []]}, [elapsed_ms]]}, -TIMING_WINDOW
+                ]}}},
+                {"$set": {"stats": {
+                    "min_ms": {"$min": "$samples"},
+                    "max_ms": {"$max": "$samples"},
+                    "avg_ms": {"$toInt": {"$trunc": {"$avg": "$samples"}}},
+                    "sample_count": {"$size": "$samples"},
+                }}},
+            ],
+            projection={"stats": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        TIMING_CACHE.update(stats=snapshot.get("stats"), loaded_at=time.time())
     except Exception as e:
         print(f"[!] Timing Record Error: {e}")
 
 def get_timing_stats():
-    """Get min/max/avg timing from last 100 requests."""
+    """Min/max/avg over the last 100 missions (cached dict; one snapshot read per refresh)."""
+    if time.time() - TIMING_CACHE["loaded_at"] < TIMING_REFRESH_SECONDS:
+        return TIMING_CACHE["stats"]
     try:
         db = get_db_handle()
-        docs = list(db.analysis_timing.find().sort("timestamp", -1).limit(100))
-        if not docs:
-            return None
-        times = [d["elapsed_ms"] for d in docs]
-        return {
-            "min_ms": min(times),
-            "max_ms": max(times),
-            "avg_ms": int(sum(times) / len(times)),
-            "sample_count": len(times)
-        }
-    except:
-        return None
+        doc = db.system_status.find_one({"_id": TIMING_SNAPSHOT_ID}, {"stats": 1})
+        if doc is None:
+            # First read after upgrade: seed the snapshot from the timing history once
+            history = db.analysis_timing.find({}, {"elapsed_ms": 1}).sort("timestamp", -1).limit(TIMING_WINDOW)
+            samples = [d["elapsed_ms"] for d in history][::-1]
+            doc = {"samples": samples, "stats": compute_timing_stats(samples)}
+            db.system_status.update_one({"_id": TIMING_SNAPSHOT_ID}, {"$setOnInsert": doc}, upsert=True)
+        TIMING_CACHE.update(stats=doc.get("stats"), loaded_at=time.time())
+    except Exception:
+        # Serve the last known stats rather than failing the poll
+        TIMING_CACHE["loaded_at"] = time.time()
+    return TIMING_CACHE["stats"]
 
 def intel_status(request):
-    """Polled by frontend during loading to show progress."""
+    """Polled by frontend during loading to show progress (?zip= for that zip's translations)."""
     try:
         db = get_db_handle()
         status_doc = db.system_status.find_one({"_id": "global_status"})
         
         current_stage = "Idle"
         progress_percent = 0
+        translations = None
+        progress_zip = request.GET.get('zip')
         
         if status_doc:
             if time.time() - status_doc.get("last_updated", 0) < 60:
                 current_stage = status_doc.get("current_stage", "Idle")
                 progress_percent = status_doc.get("progress_percent", 0)
+                progress_zip = progress_zip or status_doc.get("zip_code")
             else:
                  # Auto-reset if stale
                  db.system_status.update_one(
@@ -361,6 +442,11 @@ def intel_status(request):
                      {"$set": {"current_stage": "Idle", "progress_percent": 0}}
                  )
         
+        if progress_zip:
+            progress_doc = db.system_status.find_one({"_id": f"translations:{progress_zip}"})
+            if progress_doc and time.time() - progress_doc.get("last_updated", 0) < TRANSLATION_PROGRESS_SECONDS:
+                translations = progress_doc.get("langs")
+        
         # Get timing stats
         timing_stats = get_timing_stats()
                  
@@ -369,6 +455,8 @@ def intel_status(request):
             'stage': current_stage,
             'progress_percent': progress_percent
         }
+        if translations:
+            response['translations'] = translations
         if timing_stats:
             response['timing_stats'] = timing_stats
             
@@ -379,28 +467,70 @@ def intel_status(request):
 
 # --- WORKER: TRANSLATION ---
 def run_translation_logic(zip_code, target_lang, master_data):
+    """Translate the English master and merge it with a single $set. Returns True on success."""
     try:
+        lang_name = LANGUAGE_NAMES.get(target_lang)
+        if not lang_name:
+            print(f"[WORKER] Translation skipped: unsupported language '{target_lang}'")
+            return False
         db = get_db_handle()
         col = db.intel_history
-        lang_name = "THAI" if target_lang == 'th' else "KHMER"
         prompt = f"TRANSLATE JSON VALUES TO {lang_name}. KEEP KEYS/COORDS IDENTICAL. INPUT: {json.dumps(master_data)}"
         
-        resp = TRANSLATOR_MODEL.generate_content(prompt)
-        cleaned = resp.text.replace('```json', '').replace('```', '').strip()
-        translated_intel = json.loads(cleaned)
+        with span("translator", lang=target_lang):
+            translated_intel = TRANSLATOR_MODEL.generate_json(prompt)
         
         translated_intel['zip_code'] = zip_code
         translated_intel['location_geo'] = master_data.get('location_geo')
         
-        col.update_one({'zip_code': zip_code}, {'$set': {f'languages.{target_lang}': translated_intel}})
+        with span("db.write", collection="intel_history"):
+            col.update_one({'zip_code': zip_code}, {'$set': {f'languages.{target_lang}': translated_intel}})
+            add_language(db, zip_code, target_lang)
+        return True
     except Exception as e:
-        print(f"[WORKER] Translation Error: {e}")
+        print(f"[WORKER] Translation Error ({target_lang}): {e}")
+        return False
+    finally:
+        TRANSLATION_QUEUE.pop((zip_code, target_lang), None)
+
+def run_translation_fanout(zip_code, langs, master_data):
+    """
+    Translates the English master into every language in `langs` concurrently.
+    Each language is merged independently, so one failure never blocks the others.
+    """
+    langs = [l for l in dict.fromkeys(langs) if l and l != 'en']
+    unsupported = [l for l in langs if l not in LANGUAGE_NAMES]
+    if unsupported:
+        print(f"[!] Translation fan-out skipping unsupported languages: {', '.join(unsupported)}")
+        langs = [l for l in langs if l in LANGUAGE_NAMES]
+    if not langs:
+        return {}
+    
+    for lang in langs:
+        TRANSLATION_QUEUE[(zip_code, lang)] = time.time()
+        update_translation_progress(zip_code, lang, "queued")
+    
+    trace = current_trace()
+    
+    def _translate(lang):
+        update_translation_progress(zip_code, lang, "running")
+        with activate(trace):
+            ok = run_translation_logic(zip_code, lang, master_data)
+        update_translation_progress(zip_code, lang, "done" if ok else "failed")
+        return lang, ok
+    
+    print(f">> [TRANSLATOR] Fan-out for {zip_code}: {', '.join(langs)}")
+    with ThreadPoolExecutor(max_workers=len(langs), thread_name_prefix="translator") as pool:
+        results = dict(pool.map(_translate, langs))
+    return results
 
 # --- WORKER: FULL ANALYSIS ---
 def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='unknown'):
     start_time = time.time()
+    trace = start_trace("mission", zip_code=zip_code, lang=target_lang)
+    outcome = "error"
     print(f'>> [ANALYST] Generating VERIFIED THREAT REPORT for {zip_code}...')
-    update_status("Connecting")
+    update_status("Connecting", zip_code)
     
     try:
         db = get_db_handle()
@@ -410,7 +540,8 @@ def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='
         user_lon = geo_data['lon']
 
         # 1. DYNAMIC COMPLIANCE CHECK (Exclusion Zones)
-        is_blocked, zone_info = check_compliance(user_lat, user_lon, country, INPUTS_DIR)
+        with span("compliance"):
+            is_blocked, zone_info = check_compliance(user_lat, user_lon, country, INPUTS_DIR)
         
         if is_blocked:
             print(f">> [LEGAL] Restricted Zone ({zone_info['name']}). Aborting Generation.")
@@ -437,10 +568,15 @@ def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='
                     }
                 } 
             }
-            col.replace_one({'zip_code': zip_code}, doc, upsert=True)
+            with span("db.write", collection="intel_history"):
+                col.replace_one({'zip_code': zip_code}, doc, upsert=True)
+            with span("db.write", collection="read_models"):
+                sync_read_models(db, doc)
+            outcome = "restricted"
             return
 
-        news_text, clean_packets = run_atlas_pipeline()
+        with span("atlas"):
+            news_text, clean_packets = run_atlas_pipeline()
 
         # Load Prompt from Developer Inputs
         prompt_path = os.path.join(INPUTS_DIR, 'analyst_system_prompt.txt')
@@ -460,10 +596,9 @@ def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='
             current_date=datetime.datetime.utcnow().strftime('%Y-%m-%d')
         )
         
-        update_status("Analyst Running")
-        resp = ANALYST_MODEL.generate_content(prompt)
-        cleaned = resp.text.replace('```json', '').replace('```', '').strip()
-        master_intel = json.loads(cleaned)
+        update_status("Analyst Running", zip_code)
+        with span("analyst"):
+            master_intel = ANALYST_MODEL.generate_json(prompt)
 
         # --- SCHEMA NORMALIZATION ---
         
@@ -587,15 +722,26 @@ def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='
             'location_geo': master_intel['location_geo'], 
             'languages': { 'en': master_intel } 
         }
-        col.replace_one({'zip_code': zip_code}, doc, upsert=True)
-        
-        col.replace_one({'zip_code': zip_code}, doc, upsert=True)
+        if not is_certified:
+            doc['review_state'] = REVIEW_PENDING  # -> approval_queue (core/approvals.py)
+        with span("db.write", collection="intel_history"):
+            col.replace_one({'zip_code': zip_code}, doc, upsert=True)
+        with span("db.write", collection="read_models"):
+            sync_read_models(db, doc)
         
-        update_status("Translator Running")
+        update_status("Translator Running", zip_code)
+        fanout_langs = list(EAGER_TRANSLATION_LANGS)
         if target_lang != 'en':
-            run_translation_logic(zip_code, target_lang, master_intel)
+            fanout_langs.append(target_lang)
+        # Warm the detail summaries the sitrep cards will ask for, off the
+        # mission path: the intel is already served from the doc written above
+        citation_summary.precompute_async(db, [e.get('topic', '') for e in master_intel.get('sitrep_entries', [])])
+
+        with span("translator.fanout"):
+            run_translation_fanout(zip_code, fanout_langs, master_intel)
             
-        update_status("Done")
+        update_status("Done", zip_code)
+        outcome = "ok"
             
     except Exception as e:
         print(f'>> [ANALYST] Critical Error: {e}')
@@ -604,6 +750,7 @@ def run_mission_logic(zip_code, country, geo_data, target_lang='en', device_id='
         # Record timing for stats
         elapsed_ms = int((time.time() - start_time) * 1000)
         record_analysis_timing(elapsed_ms)
+        finish_trace(trace, outcome=outcome)
         print(f'>> [TIMING] Analysis completed in {elapsed_ms}ms')
         if zip_code in MISSION_QUEUE:
             del MISSION_QUEUE[zip_code]
@@ -619,8 +766,12 @@ def intel_api(request):
         country = request.GET.get('country', 'TH')
         lang = request.GET.get('lang', 'en')
         device_id = request.GET.get('device_id', 'unknown_agent')
+        if lang != 'en' and lang not in LANGUAGE_NAMES:
+            # Also keeps `lang` safe to use as a field path below
+            return JsonResponse({'status': 'error', 'message': f'Language {lang} Unsupported.'})
         
-        geo_dict = get_geo_from_csv(zip_code)
+        with span("geocode"):
+            geo_dict = get_geo_from_csv(zip_code)
         if not geo_dict:
             return JsonResponse({'status': 'error', 'message': f'Zip {zip_code} Unknown.'})
         
@@ -631,8 +782,9 @@ def intel_api(request):
         user_lon = geo_dict['lon']
         user_lat = geo_dict['lat']
         
-        # Query by exact zip code - each zip gets its own analysis
-        cached_doc = col.find_one({"zip_code": zip_code})
+        # Query by exact zip code - each zip gets its own analysis.
+        # Only the requested language is read; English is fetched separately if a translation is needed.
+        cached_doc = col.find_one({"zip_code": zip_code}, {"_id": 0, "zip_code": 1, "timestamp": 1, f"languages.{lang}": 1})
 
         serve_cached = False
         final_doc = None
@@ -658,10 +810,15 @@ def intel_api(request):
         target_data = final_doc.get('languages', {}).get(lang)
         
         if not target_data:
-            base_data = final_doc.get('languages', {}).get('en')
+            en_doc = col.find_one({"zip_code": zip_code}, {"_id": 0, "languages.en": 1}) or {}
+            base_data = en_doc.get('languages', {}).get('en')
             if base_data:
-                t = threading.Thread(target=run_translation_logic, args=(final_doc['zip_code'], lang, base_data))
-                t.start()
+                # One translation per (zip, lang) in flight; fan-out workers register here too
+                queue_key = (final_doc['zip_code'], lang)
+                if queue_key not in TRANSLATION_QUEUE:
+                    TRANSLATION_QUEUE[queue_key] = time.time()
+                    t = threading.Thread(target=run_translation_logic, args=(final_doc['zip_code'], lang, base_data))
+                    t.start()
                 return JsonResponse({'status': 'calculating', 'message': 'Translating Grid Intel...'})
         
         # STRIP CITATIONS FOR LIGHTWEIGHT PAYLOAD
@@ -702,6 +859,17 @@ def intel_api(request):
 
 # --- SERVER OBSERVABILITY ---
 
+def metrics(request):
+    """Prometheus scrape target: per-stage span histograms + model client counters."""
+    user = getattr(request, 'user', None)
+    is_staff = bool(user and user.is_authenticated and user.is_staff)
+    if not is_staff and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(
+        render_prometheus(get_llm_metrics()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 def get_server_logs(request):
     """Admin-only endpoint to fetch the last N lines of the server log."""
     # AUTH CHECK (Basic Mock - in production use real Auth)
@@ -761,74 +929,32 @@ def intel_citations(request, id=None):
         # Default zip/lang not strictly needed for news search but good for context
         
         db = get_db_handle()
-        news_col = db.news_index
-        
-        # 1. Fetch relevant news (Last 72 hours)
-        now_utc = datetime.datetime.now(pytz.utc)
-        min_date = now_utc - datetime.timedelta(hours=72)
-        
-        query = {"published_parsed": {"$gte": min_date}}
-        
-        # Simple keyword matching if topic provided
-        if topic:
-            # Create a regex from the topic, ignoring common words
-            ignore = {'the', 'and', 'for', 'with', 'update', 'report'}
-            keywords = [w for w in topic.split() if len(w) > 3 and w not in ignore]
-            
-            if keywords:
-                regex_pattern = "|".join([k for k in keywords]) 
-                # e.g "shelling|border"
-                query["$or"] = [
-                    {"title": {"$regex": regex_pattern, "$options": "i"}},
-                    {"summary": {"$regex": regex_pattern, "$options": "i"}}
-                ]
-        
-        # Limit to 10 most recent relevant articles
-        cursor = news_col.find(query).sort("published_parsed", -1).limit(10)
-        
+
+        # 1. Fetch relevant news (Last 72 hours), index-backed (core/news_store.py)
+        docs = find_citations(db, topic, limit=10)
         sources = []
-        for doc in cursor:
+        for doc in docs:
             # Create a clean citation object
             sources.append({
                 "source": doc.get('source', 'Unknown Agency'),
                 "title": doc.get('title', 'Unknown Title'),
-                "url": doc.get('link', '#'),
-                "date": doc.get('published', ''),
+                "url": doc.get('url', '#'),
+                "date": doc['published_parsed'].strftime('%Y-%m-%dT%H:%M:%SZ') if doc.get('published_parsed') else '',
                 "summary": doc.get('summary', '') # Added for Gemini context
             })
 
-        # 2. (NEW) Generate a detailed summary if requested
+        # 2. Detailed summary: cached per topic + source set, one model call per key (core/citation_summary.py)
         detailed_summary = "No detailed intelligence report available for this topic."
-        if sources:
-            try:
-                # Use Gemini to synthesize a longer report from the retrieved news titles/summaries
-                news_context = "\n".join([f"- {s['title']} ({s.get('source', 'Unknown')}): {s.get('summary', '')}" for s in sources])
-                prompt = f"""
-                Topic: {topic}
-                News Context:
-                Task: Synthesize a DETAILED Military Intelligence SITREP.
-                
-                STRICT FORMATTING RULES:
-                You must output the report EXACTLY in this format:
-
-                **SUMMARY:**
-                [Your detailed summary here. EVERY sentence or claim MUST be followed by the source in brackets, e.g., (Source: Reuters)].
-
-                REQUIREMENTS:
-                - Do NOT include Type or Date headers. I will add them.
-                - Ensure citation links match the provided news context.
-                - Keep it under 200 words.
-                """
-                
-                model = genai.GenerativeModel('gemini-1.5-flash-8b') # Use faster model for citations
-                response = model.generate_content(prompt)
-                if response.text:
-                    raw_text = response.text.replace('```', '').strip()
-                    # Hardcoded Header to FORCE compliance
-                    header = f"**TYPE:** {topic.upper()}\n**DATE:** {datetime.datetime.now().strftime('%Y-%m-%d')}\n"
-                    detailed_summary = header + raw_text
-            except Exception as e:
-                print(f"Detailed Summary Error: {e}")
+        try:
+            raw_text = citation_summary.get_summary(db, topic, docs)
+            if raw_text:
+                # Hardcoded Header to FORCE compliance
+                header = f"**TYPE:** {topic.upper()}\n**DATE:** {datetime.datetime.now().strftime('%Y-%m-%d')}\n"
+                detailed_summary = header + raw_text
+        except SingleFlightPending:
+            detailed_summary = "Detailed intelligence report is being prepared. Check back shortly."
+        except Exception as e:
+            print(f"Detailed Summary Error: {e}")
 
         # 3. Align with Frontend SentinelProvider.fetchCitations
         type_key = request.GET.get('type', 'sitrep') # 'sitrep' or 'forecast'
@@ -852,93 +978,106 @@ def intel_citations(request, id=None):
 
 
 # --- DEBUG: ATLAS G3 PIPELINE ---
+DEBUG_PIPELINE_LEASE_SECONDS = 300
+DEBUG_PIPELINE_WAIT_SECONDS = 5  # The dashboard aborts its fetch after 5s
+
+
 def debug_pipeline(request):
     """
     Debug endpoint for Atlas G3 Dashboard.
     Runs the pipeline and returns detailed packet data for visualization.
+    Concurrent dashboard refreshes (from any worker) share one run; they get
+    "calculating" rather than waiting out the whole run.
     """
     try:
-        # Initialize Gates
-        gate1 = Gate1Ingest()
-        gate2_base = Gate2Base()
-        gate2_reinforced = Gate2Reinforced()
-        
-        all_packets = []  # Track ALL packets, not just clean ones
-        
-        if hasattr(ssl, '_create_unverified_context'):
-            ssl._create_default_https_context = ssl._create_unverified_context
-        
-        query = "Thailand Cambodia border shelling OR artillery OR mortar OR drone attack OR firefight OR explosion OR clash"
-        url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-US&gl=US&ceid=US:en"
-        
-        feed = feedparser.parse(url)
+        return JsonResponse(coalesce("debug:pipeline", _run_debug_pipeline,
+                                     lease_seconds=DEBUG_PIPELINE_LEASE_SECONDS,
+                                     wait_seconds=DEBUG_PIPELINE_WAIT_SECONDS))
+    except SingleFlightPending:
+        return JsonResponse({'status': 'calculating', 'message': 'Pipeline run in progress...'})
+    except Exception as e:
+        traceback.print_exc()
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=500)
+
+
+def _run_debug_pipeline():
+    # Initialize Gates
+    gate1 = Gate1Ingest()
+    gate2_base = Gate2Base()
+    gate2_reinforced = Gate2Reinforced()
+    
+    all_packets = []  # Track ALL packets, not just clean ones
+    
+    if hasattr(ssl, '_create_unverified_context'):
+        ssl._create_default_https_context = ssl._create_unverified_context
+    
+    query = "Thailand Cambodia border shelling OR artillery OR mortar OR drone attack OR firefight OR explosion OR clash"
+    url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-US&gl=US&ceid=US:en"
+    
+    feed = feedparser.parse(url)
+    
+    if not feed.entries:
+        return {
+            'status': 'success',
+            'message': 'No items in RSS feed',
+            'total_processed': 0,
+            'total_clean': 0,
+            'packets': []
+        }
+    
+    for entry in feed.entries[:20]:  # Limit for debug
+        packet_data = {
+            'title': entry.title[:100],
+            'content_hash': None,
+            'status': 'RAW',
+            'validity_score': 0,
+            'risk_domain': 'UNCLASSIFIED',
+            'target_region': 'UNKNOWN',
+            'gate_history': []
+        }
         
-        if not feed.entries:
-            return JsonResponse({
-                'status': 'success',
-                'message': 'No items in RSS feed',
-                'total_processed': 0,
-                'total_clean': 0,
-                'packets': []
-            })
+        # GATE 1
+        packet = gate1.process_packet(
+            raw_input=entry,
+            source_id="google_news_rss",
+            source_tier=SourceTier.TRUSTED_MEDIA,
+            ingest_method=IngestMethod.RSS
+        )
         
-        for entry in feed.entries[:20]:  # Limit for debug
-            packet_data = {
-                'title': entry.title[:100],
-                'content_hash': None,
-                'status': 'RAW',
-                'validity_score': 0,
-                'risk_domain': 'UNCLASSIFIED',
-                'target_region': 'UNKNOWN',
-                'gate_history': []
-            }
-            
-            # GATE 1
-            packet = gate1.process_packet(
-                raw_input=entry,
-                source_id="google_news_rss",
-                source_tier=SourceTier.TRUSTED_MEDIA,
-                ingest_method=IngestMethod.RSS
-            )
-            
-            if not packet:
-                packet_data['gate_history'].append('GATE1_DROP_DUPLICATE')
-                packet_data['status'] = 'DROP'
-                all_packets.append(packet_data)
-                continue
-            
-            packet_data['content_hash'] = packet.identity.content_hash
-            packet_data['gate_history'] = list(packet.triage.gate_history)
-            
-            # GATE 2 BASE
-            packet = gate2_base.process_packet(packet)
+        if not packet:
+            packet_data['gate_history'].append('GATE1_DROP_DUPLICATE')
+            packet_data['status'] = 'DROP'
+            all_packets.append(packet_data)
+            continue
+        
+        packet_data['content_hash'] = packet.identity.content_hash
+        packet_data['gate_history'] = list(packet.triage.gate_history)
+        
+        # GATE 2 BASE
+        packet = gate2_base.process_packet(packet)
+        packet_data['validity_score'] = packet.triage.validity_score
+        packet_data['risk_domain'] = packet.triage.risk_domain.value
+        packet_data['target_region'] = packet.triage.target_region
+        packet_data['gate_history'] = list(packet.triage.gate_history)
+        packet_data['status'] = packet.triage.processing_status.value
+        
+        # GATE 2 REINFORCED (if needed)
+        if packet.triage.processing_status == ProcessingStatus.PENDING_REINFORCED:
+            packet = gate2_reinforced.process_packet(packet)
             packet_data['validity_score'] = packet.triage.validity_score
-            packet_data['risk_domain'] = packet.triage.risk_domain.value
-            packet_data['target_region'] = packet.triage.target_region
             packet_data['gate_history'] = list(packet.triage.gate_history)
             packet_data['status'] = packet.triage.processing_status.value
-            
-            # GATE 2 REINFORCED (if needed)
-            if packet.triage.processing_status == ProcessingStatus.PENDING_REINFORCED:
-                packet = gate2_reinforced.process_packet(packet)
-                packet_data['validity_score'] = packet.triage.validity_score
-                packet_data['gate_history'] = list(packet.triage.gate_history)
-                packet_data['status'] = packet.triage.processing_status.value
-            
-            all_packets.append(packet_data)
-        
-        clean_count = sum(1 for p in all_packets if p['status'] == 'CLEAN')
-        
-        return JsonResponse({
-            'status': 'success',
-            'total_processed': len(all_packets),
-            'total_clean': clean_count,
-            'packets': all_packets
-        })
         
-    except Exception as e:
-        traceback.print_exc()
-        return JsonResponse({'status': 'error', 'error': str(e)}, status=500)
+        all_packets.append(packet_data)
+    
+    clean_count = sum(1 for p in all_packets if p['status'] == 'CLEAN')
+    
+    return {
+        'status': 'success',
+        'total_processed': len(all_packets),
+        'total_clean': clean_count,
+        'packets': all_packets
+    }
 
 # --- ADMIN OPS (INJECTED DURING MERGE) ---
 def admin_verify_threat(request):
@@ -961,6 +1100,14 @@ def admin_verify_threat(request):
         col = db.intel_history
         
         doc = col.find_one({'zip_code': zip_code})
+        if doc and approvals.is_pending(doc):
+             # Certifying a pending DEFCON 1 report is an approval: same decision path
+             # as the portal (pending banner removed, DEFCON restored, queue entry dropped)
+             try:
+                 approvals.decide(db, "admin_verify", zip_code, "APPROVE")
+             except approvals.ClaimConflict:
+                 return JsonResponse({'status': 'error', 'message': 'Claimed by a reviewer'})
+             doc = col.find_one({'zip_code': zip_code})
         if doc:
              # FLIP BIT
              doc['languages']['en']['is_certified'] = True
@@ -975,6 +1122,7 @@ def admin_verify_threat(request):
              doc['languages']['en']['summary'] = [x for x in summary_list if "UNCONFIRMED" not in x]
 
              col.replace_one({'zip_code': zip_code}, doc)
+             sync_read_models(db, doc)
              return JsonResponse({'status': 'success', 'message': f'Zip {zip_code} VERIFIED.'})
         
         return JsonResponse({'status': 'error', 'message': 'Not Found'})
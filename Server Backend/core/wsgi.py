@@ -2,3 +2,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 application = get_wsgi_application()
+
+# Server start only (gunicorn, runserver); management commands skip it
+from core.startup import ensure_core_storage_at_startup
+ensure_core_storage_at_startup()
@@ -0,0 +1,172 @@
+# ==============================================================================
+# SYSTEM: SENTINEL SERVER
+# MODULE: zip_grid.py
+# ROLE:   IN-MEMORY GRID INDEX OF ZIP DEFCON MARKERS FOR THE PORTAL MAP
+# ==============================================================================
+#
+# Joins the postal CSV (loaded once) with current DEFCON values from the slim
+# intel_summary read model (re-read every `refresh_seconds`, or on the next
+# request after intel_summary.sync_read_models() calls invalidate_all()) and
+# buckets the markers into CELL_DEGREES cells, so a viewport only touches the
+# cells it covers.
+#
+# Tiles use slippy-map z/x/y. Below CLUSTER_MAX_ZOOM a tile is aggregated into
+# at most CLUSTER_CELLS x CLUSTER_CELLS clusters (worst DEFCON wins); from
+# CLUSTER_MAX_ZOOM on it returns individual markers. Every payload carries an
+# ETag derived from the DEFCON snapshot, so unchanged tiles revalidate as 304.
+
+import csv
+import hashlib
+import math
+import os
+import threading
+import time
+import weakref
+
+CELL_DEGREES = 0.25
+CLUSTER_MAX_ZOOM = 10
+CLUSTER_CELLS = 4
+MAX_TILE_ZOOM = 18
+
+_GRIDS = weakref.WeakSet()  # Every grid in this process, for invalidate_all()
+
+
+def load_postal_index(csv_path):
+    """{zip: {'lat', 'lon', 'district'}} - first row with coordinates per zip."""
+    index = {}
+    if not os.path.exists(csv_path):
+        return index
+    with open(csv_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for row in csv.DictReader(f):
+            zip_code = row.get('POSTAL_CODE', '')
+            if not zip_code or zip_code in index:
+                continue
+            try:
+                lat, lon = float(row.get('LATITUDE')), float(row.get('LONGITUDE'))
+            except (TypeError, ValueError):
+                continue
+            index[zip_code] = {'lat': lat, 'lon': lon, 'district': row.get('DISTRICT_ENGLISH', '')}
+    return index
+
+
+def tile_bbox(z, x, y):
+    """(min_lon, min_lat, max_lon, max_lat) of a slippy-map tile."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y))
+
+
+def _cell(lat, lon):
+    return (int(math.floor(lat / CELL_DEGREES)), int(math.floor(lon / CELL_DEGREES)))
+
+
+class ZipDefconGrid:
+
+    def __init__(self, csv_path, refresh_seconds=30):
+        self.csv_path = csv_path
+        self.refresh_seconds = refresh_seconds
+        self._postal = None
+        self._cells = {}
+        self._markers = []
+        self._version = ""
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        _GRIDS.add(self)
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+
+    def _snapshot(self, db):
+        if time.time() - self._loaded_at < self.refresh_seconds:
+            return self._cells, self._markers, self._version
+        with self._lock:
+            if time.time() - self._loaded_at >= self.refresh_seconds:
+                if self._postal is None:
+                    self._postal = load_postal_index(self.csv_path)
+                markers = []
+                cursor = db.intel_summary.find({}, {"zip_code": 1, "defcon": 1, "_id": 0})
+                for doc in cursor:
+                    zip_code = str(doc.get('zip_code', ''))
+                    postal = self._postal.get(zip_code)
+                    if not postal:
+                        continue
+                    try:
+                        defcon = int(doc.get('defcon', 5))
+                    except (TypeError, ValueError):
+                        defcon = 5
+                    markers.append({'zip_code': zip_code, **postal, 'defcon': defcon})
+                markers.sort(key=lambda m: m['zip_code'])
+
+                cells = {}
+                for m in markers:
+                    cells.setdefault(_cell(m['lat'], m['lon']), []).append(m)
+                digest = hashlib.sha1("|".join(f"{m['zip_code']}:{m['defcon']}" for m in markers).encode())
+                self._cells, self._markers, self._version = cells, markers, digest.hexdigest()[:16]
+                self._loaded_at = time.time()
+        return self._cells, self._markers, self._version
+
+    def all_markers(self, db):
+        return self._snapshot(db)[1]
+
+    def _in_bbox(self, cells, bbox):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        lo, hi = _cell(min_lat, min_lon), _cell(max_lat, max_lon)
+        if (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) > len(cells):
+            # Viewport wider than the populated area: walk the occupied cells instead
+            keys = [k for k in cells if lo[0] <= k[0] <= hi[0] and lo[1] <= k[1] <= hi[1]]
+        else:
+            keys = [(i, j) for i in range(lo[0], hi[0] + 1) for j in range(lo[1], hi[1] + 1)]
+        found = []
+        for key in keys:
+            for m in cells.get(key, ()):
+                if min_lat <= m['lat'] <= max_lat and min_lon <= m['lon'] <= max_lon:
+                    found.append(m)
+        return found
+
+    def query(self, db, bbox, zoom):
+        """{'markers': [...], 'clusters': [...]} for a viewport, plus the snapshot version."""
+        cells, _, version = self._snapshot(db)
+        markers = self._in_bbox(cells, bbox)
+        if zoom >= CLUSTER_MAX_ZOOM:
+            return {'markers': markers, 'clusters': []}, version
+
+        min_lon, min_lat, max_lon, max_lat = bbox
+        step_lat = (max_lat - min_lat) / CLUSTER_CELLS or 1
+        step_lon = (max_lon - min_lon) / CLUSTER_CELLS or 1
+        groups = {}
+        for m in markers:
+            key = (min(int((m['lat'] - min_lat) / step_lat), CLUSTER_CELLS - 1),
+                   min(int((m['lon'] - min_lon) / step_lon), CLUSTER_CELLS - 1))
+            groups.setdefault(key, []).append(m)
+
+        singles, clusters = [], []
+        for members in groups.values():
+            if len(members) == 1:
+                singles.append(members[0])
+                continue
+            counts = {}
+            for m in members:
+                counts[str(m['defcon'])] = counts.get(str(m['defcon']), 0) + 1
+            clusters.append({
+                'lat': round(sum(m['lat'] for m in members) / len(members), 5),
+                'lon': round(sum(m['lon'] for m in members) / len(members), 5),
+                'count': len(members),
+                'defcon': min(m['defcon'] for m in members),
+                'defcon_counts': counts,
+            })
+        return {'markers': singles, 'clusters': clusters}, version
+
+    def tile(self, db, z, x, y):
+        """Tile payload and its ETag."""
+        payload, version = self.query(db, tile_bbox(z, x, y), z)
+        payload.update({'z': z, 'x': x, 'y': y})
+        return payload, f'"{version}-{z}-{x}-{y}"'
+
+
+def invalidate_all():
+    """Called after any intel write, so the next map request sees the new DEFCON."""
+    for grid in list(_GRIDS):
+        grid.invalidate()
@@ -1,8 +1,8 @@
 import os
 import json
 import logging
-import requests
 from django.conf import settings
+from core.llm_client import get_client, clean_json_text
 from .db_models import JobsDAO
 
 logger = logging.getLogger(__name__)
@@ -15,7 +15,6 @@ class GeminiAnalyst:
     """
     
     MODEL_NAME = 'gemini-3-pro-preview'
-    API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent"
     
     @classmethod
     def analyze_case(cls, evidence_packet: dict) -> dict:
@@ -56,36 +55,19 @@ class GeminiAnalyst:
         """
         
         try:
-            # REST API Payload
-            payload = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }],
-                "generationConfig": {
-                    "response_mime_type": "application/json"
-                }
-            }
-            
-            response = requests.post(
-                f"{cls.API_URL}?key={api_key}",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Analyst API Error {response.status_code}: {response.text}")
+            # REST transport via the shared client (rate limit, retries, circuit breaker)
+            client = get_client(cls.MODEL_NAME, transport="rest", timeout=30)
+            try:
+                response = client.generate(prompt, api_key=api_key, response_mime_type="application/json")
+            except Exception as api_err:
+                logger.error(f"Analyst API Error: {api_err}")
                 return None
                 
-            data = response.json()
-            # Extract Text
             try:
-                raw_text = data['candidates'][0]['content']['parts'][0]['text']
                 # Clean fences just in case
-                raw_text = raw_text.replace('```json', '').replace('```', '').strip()
-                result = json.loads(raw_text)
-            except (KeyError, IndexError, json.JSONDecodeError) as parse_err:
-                 logger.error(f"Failed to parse Analyst response: {parse_err} | Raw: {data}")
+                result = json.loads(clean_json_text(response.text))
+            except json.JSONDecodeError as parse_err:
+                 logger.error(f"Failed to parse Analyst response: {parse_err} | Raw: {response.text[:500]}")
                  return None
             
             # Basic Validation
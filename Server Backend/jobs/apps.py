@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -9,5 +10,7 @@ class JobsConfig(AppConfig):
             # Avoid running during migrations or if connection fails
             from .db_models import JobsDAO
             JobsDAO.ensure_indexes()
+        except ImproperlyConfigured:
+            raise  # Stored password hashes this host cannot verify
         except Exception as e:
             print(f"[JOBS] Index creation skipped/failed: {e}")
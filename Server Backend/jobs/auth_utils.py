@@ -1,17 +1,19 @@
 import jwt
 import datetime
 from django.conf import settings
-from django.contrib.auth.hashers import make_password, check_password
 from django.http import JsonResponse
 
+from core import passwords
+
 # Simple Secret for MVP (In prod use settings.SECRET_KEY)
 JWT_SECRET = getattr(settings, 'SECRET_KEY', 'sentinel_jobs_secret_key_mvp')
 
 def hash_password(password: str) -> str:
-    return make_password(password)
+    return passwords.hash_password(password)
 
-def verify_password(password: str, encoded: str) -> bool:
-    return check_password(password, encoded)
+def verify_password(password: str, encoded: str, setter=None) -> bool:
+    """setter(new_hash) is called when a matching hash should be upgraded."""
+    return passwords.check_password(password, encoded, setter)
 
 def generate_token(account_id: str) -> str:
     payload = {
@@ -50,7 +52,7 @@ def employer_required(func):
     """Decorator to enforce Employer role. Must be used AFTER @jobs_auth_required."""
     def wrapper(request, *args, **kwargs):
         from .db_models import JobsDAO
-        account = JobsDAO.get_account(request.jobs_account_id)
+        account = JobsDAO.get_principal(request.jobs_account_id)
         if not account:
             return JsonResponse({"error": "Account not found"}, status=404)
         roles = account.get("roles", {})
@@ -64,7 +66,7 @@ def worker_required(func):
     """Decorator to enforce Worker role. Must be used AFTER @jobs_auth_required."""
     def wrapper(request, *args, **kwargs):
         from .db_models import JobsDAO
-        account = JobsDAO.get_account(request.jobs_account_id)
+        account = JobsDAO.get_principal(request.jobs_account_id)
         if not account:
             return JsonResponse({"error": "Account not found"}, status=404)
         roles = account.get("roles", {})
@@ -2,8 +2,12 @@ import logging
 import datetime
 import uuid
 from typing import Optional, List, Dict
+from django.conf import settings
+from core import passwords
+from core.card_cache import CardCache
 from core.db_utils import get_db_handle
-from pymongo import ASCENDING, DESCENDING, IndexModel
+from core.geo_cells import CellCache
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +99,8 @@ class JobsDAO:
         
         logger.info("[JOBS] Indexes ensured.")
 
+        passwords.check_stored_hashes(db[DB_ACCOUNTS])
+
     # --- ACCOUNTS ---
     @classmethod
     def create_account(cls, data: Dict) -> str:
@@ -150,6 +156,34 @@ class JobsDAO:
     def get_account(cls, account_id: str):
         return cls._get_db()[DB_ACCOUNTS].find_one({"account_id": account_id})
 
+    @classmethod
+    def get_accounts(cls, account_ids: List[str], fields: List[str]) -> Dict[str, Dict]:
+        """Batch lookup: {account_id: doc} with only `fields`, in one $in query."""
+        projection = {f: 1 for f in fields}
+        projection.update({"_id": 0, "account_id": 1})
+        cursor = cls._get_db()[DB_ACCOUNTS].find({"account_id": {"$in": list(account_ids)}}, projection)
+        return {doc["account_id"]: doc for doc in cursor}
+
+    @classmethod
+    def get_principal(cls, account_id: str):
+        """get_account for the role decorators, from ACCOUNT_PRINCIPALS (a copy)."""
+        account = ACCOUNT_PRINCIPALS.get(account_id)
+        return dict(account) if account else None
+
+    @classmethod
+    def _load_principals(cls, account_ids: List[str]) -> Dict[str, Dict]:
+        cursor = cls._get_db()[DB_ACCOUNTS].find({"account_id": {"$in": list(account_ids)}}, {"_id": 0})
+        return {doc["account_id"]: doc for doc in cursor}
+
+    @staticmethod
+    def invalidate_principal(account_id: str):
+        """Call after writing an account's roles / status / verification."""
+        ACCOUNT_PRINCIPALS.invalidate(account_id)
+
+    @classmethod
+    def set_password_hash(cls, account_id: str, password_hash: str):
+        cls._get_db()[DB_ACCOUNTS].update_one({"account_id": account_id}, {"$set": {"password_hash": password_hash}})
+
     @classmethod
     def update_account_login(cls, account_id: str):
          cls._get_db()[DB_ACCOUNTS].update_one(
@@ -173,6 +207,7 @@ class JobsDAO:
                 {"account_id": account_id},
                 {"$set": clean_updates}
             )
+            cls.invalidate_principal(account_id)
 
     # --- LISTINGS ---
     @classmethod
@@ -198,6 +233,7 @@ class JobsDAO:
             **data
         }
         db[DB_LISTINGS].insert_one(doc)
+        cls._invalidate_area(doc)
         return job_id
 
     @classmethod
@@ -207,16 +243,47 @@ class JobsDAO:
         cursor = db[DB_LISTINGS].find(query).sort("created_at", DESCENDING).skip(skip).limit(limit)
         return list(cursor)
 
+    @classmethod
+    def search_area(cls, zip_code: str, category=None, urgency=None, limit=20, skip=0):
+        """search_listings for one zip, served from AREA_LISTINGS (newest first)."""
+        listings = AREA_LISTINGS.get_many([zip_code], category)[zip_code]
+        if urgency:
+            listings = [l for l in listings if l.get("urgency") == urgency]
+        return [dict(l) for l in listings[skip:skip + limit]]
+
+    @classmethod
+    def _load_area_cells(cls, zip_codes: List[str], category=None) -> Dict[str, List[Dict]]:
+        query = {"status": "active", "visible_to_clients": True, "location.zip": {"$in": zip_codes}}
+        if category:
+            query["category"] = category
+        by_zip = {}
+        for listing in cls._get_db()[DB_LISTINGS].find(query).sort("created_at", DESCENDING):
+            by_zip.setdefault(listing["location"]["zip"], []).append(listing)
+        return by_zip
+
+    @staticmethod
+    def _invalidate_area(*listings):
+        for listing in listings:
+            zip_code = ((listing or {}).get("location") or {}).get("zip")
+            if zip_code:
+                AREA_LISTINGS.invalidate(zip_code)
+
+    @classmethod
+    def _set_listing(cls, job_id: str, fields: Dict):
+        """$set on a listing; drops its zip from AREA_LISTINGS."""
+        before = cls._get_db()[DB_LISTINGS].find_one_and_update(
+            {"job_id": job_id}, {"$set": fields},
+            projection={"_id": 0, "location.zip": 1}, return_document=ReturnDocument.BEFORE
+        )
+        cls._invalidate_area(before, fields)
+
     @classmethod
     def get_listing(cls, job_id: str):
         return cls._get_db()[DB_LISTINGS].find_one({"job_id": job_id})
 
     @classmethod
     def update_listing_status(cls, job_id: str, status: str, visible: bool):
-        cls._get_db()[DB_LISTINGS].update_one(
-            {"job_id": job_id},
-            {"$set": {"status": status, "visible_to_clients": visible, "updated_at": datetime.datetime.utcnow().isoformat()}}
-        )
+        cls._set_listing(job_id, {"status": status, "visible_to_clients": visible, "updated_at": datetime.datetime.utcnow().isoformat()})
 
     @classmethod
     def get_listings_by_employer(cls, employer_account_id: str, limit=50):
@@ -231,20 +298,17 @@ class JobsDAO:
         allowed = ["title", "description", "category", "urgency", "risk_level", "location", "pay", "duration", "requirements", "status"]
         clean = {k: v for k, v in updates.items() if k in allowed}
         clean["updated_at"] = datetime.datetime.utcnow().isoformat()
-        cls._get_db()[DB_LISTINGS].update_one({"job_id": job_id}, {"$set": clean})
+        cls._set_listing(job_id, clean)
 
     @classmethod
     def assign_worker(cls, job_id: str, worker_account_id: str):
         """Assign a worker to a job."""
-        cls._get_db()[DB_LISTINGS].update_one(
-            {"job_id": job_id},
-            {"$set": {
-                "accepted_by_account_id": worker_account_id,
-                "accepted_at": datetime.datetime.utcnow().isoformat(),
-                "status": "filled",
-                "visible_to_clients": False
-            }}
-        )
+        cls._set_listing(job_id, {
+            "accepted_by_account_id": worker_account_id,
+            "accepted_at": datetime.datetime.utcnow().isoformat(),
+            "status": "filled",
+            "visible_to_clients": False
+        })
 
     # --- APPLICATIONS ---
     @classmethod
@@ -386,10 +450,12 @@ class JobsDAO:
         db = get_db_handle()
         # 1. Delete Account
         db.jobs_accounts.delete_one({"account_id": account_id})
+        JobsDAO.invalidate_principal(account_id)
         # 2. Anonymize Listings (Optional: or delete them)
         # For Sentinel, we might want to keep the intel but remove the user link, 
         # OR delete them if we want fresh data. Let's delete active listings for safety.
         db.jobs_listings.delete_many({"employer_id": account_id})
+        AREA_LISTINGS.invalidate()
         # 3. Anonymize Reports? Keep them for stats but maybe unlink?
         # db.jobs_reports.update_many({"reporter_id": account_id}, {"$set": {"reporter_id": "deleted"}})
 
@@ -427,6 +493,7 @@ class JobsDAO:
             {"account_id": account_id},
             {"$set": updates}
         )
+        JobsDAO.invalidate_principal(account_id)
 
     @staticmethod
     def admin_apply_action(account_id, action, duration_days=None):
@@ -447,6 +514,7 @@ class JobsDAO:
         
         if updates:
             db.jobs_accounts.update_one({"account_id": account_id}, {"$set": updates})
+            JobsDAO.invalidate_principal(account_id)
 
     @staticmethod
     def admin_get_all_listings(limit=100):
@@ -473,12 +541,12 @@ class JobsDAO:
         """suspend, close, delete listing."""
         db = get_db_handle()
         if action == "SUSPEND":
-            db.jobs_listings.update_one({"job_id": job_id}, {"$set": {"status": "suspended", "visible_to_clients": False}})
+            JobsDAO._set_listing(job_id, {"status": "suspended", "visible_to_clients": False})
         elif action == "CLOSE":
-            db.jobs_listings.update_one({"job_id": job_id}, {"$set": {"status": "cancelled", "visible_to_clients": False}})
+            JobsDAO._set_listing(job_id, {"status": "cancelled", "visible_to_clients": False})
         elif action == "DELETE":
             # Soft delete? Or hard? Let's Hard delete for admin cleanup.
-            db.jobs_listings.delete_one({"job_id": job_id})
+            JobsDAO._invalidate_area(db.jobs_listings.find_one_and_delete({"job_id": job_id}, projection={"location.zip": 1}))
             # Clean up applications
             db.jobs_applications.delete_many({"job_id": job_id})
 
@@ -495,3 +563,17 @@ class JobsDAO:
             "jobs_filled": db.jobs_listings.count_documents({"status": "filled"}),
         }
 
+
+# Accounts as seen by the role decorators (jobs/auth_utils.py); short TTL so
+# role / status changes on other workers apply within seconds
+ACCOUNT_PRINCIPALS = CardCache(
+    lambda account_ids: JobsDAO._load_principals(account_ids),
+    ttl_seconds=settings.JOBS_PRINCIPAL_TTL_SECONDS,
+)
+
+# Active listings per (zip, category) for search_area; v1 listings are found by
+# zip, so the zip is their area cell (core/geo_cells.py)
+AREA_LISTINGS = CellCache(
+    lambda zip_codes, category: JobsDAO._load_area_cells(zip_codes, category),
+    ttl_seconds=settings.JOBS_SEARCH_CELL_TTL_SECONDS,
+)
@@ -1,8 +1,11 @@
 import json
 import datetime
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from .db_models import JobsDAO
+from core.card_cache import CardCache
+from .db_models import AREA_LISTINGS, JobsDAO
+from core.passwords import PasswordServiceBusy, busy_response
 from .auth_utils import hash_password, verify_password, generate_token, jobs_auth_required, employer_required, worker_required
 from .analyst import GeminiAnalyst
 
@@ -10,6 +13,25 @@ from .analyst import GeminiAnalyst
 REPORT_WEIGHT_THRESHOLD_SHADOW = 2.0
 REPORT_WEIGHT_THRESHOLD_SUSPEND = 5.0
 
+
+def _load_employer_cards(account_ids):
+    accounts = JobsDAO.get_accounts(
+        account_ids, ["rating_avg", "rating_count", "profile_pic", "jobs_completed_count"]
+    )
+    return {
+        acc_id: {
+            "employer_rating": emp.get('rating_avg', 0.0),
+            "employer_rating_count": emp.get('rating_count', 0),
+            "employer_pic": emp.get('profile_pic', ""),
+            "employer_jobs_count": emp.get('jobs_completed_count', 0),
+        }
+        for acc_id, emp in accounts.items()
+    }
+
+
+# Employer fields shown on search results, one batched lookup per page
+EMPLOYER_CARDS = CardCache(_load_employer_cards, ttl_seconds=settings.EMPLOYER_CARD_TTL_SECONDS)
+
 # --- AUTH ENDPOINTS ---
 
 @csrf_exempt
@@ -73,6 +95,8 @@ def auth_register(request):
         
         return JsonResponse({"status": "success", "token": token, "account_id": account_id})
         
+    except PasswordServiceBusy:
+        return busy_response()
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -85,7 +109,10 @@ def auth_login(request):
         password = data.get('password')
         
         account = JobsDAO.get_account_by_email(email)
-        if not account or not verify_password(password, account.get('password_hash', '')):
+        if not account:
+            return JsonResponse({"error": "Invalid credentials"}, status=401)
+        rehash = lambda encoded: JobsDAO.set_password_hash(account['account_id'], encoded)
+        if not verify_password(password, account.get('password_hash', ''), setter=rehash):
             return JsonResponse({"error": "Invalid credentials"}, status=401)
             
         token = generate_token(account['account_id'])
@@ -98,6 +125,8 @@ def auth_login(request):
             "display_name": account.get('display_name'),
             "roles": account.get('roles', {})
         })
+    except PasswordServiceBusy:
+        return busy_response()
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -198,20 +227,18 @@ def search_listings(request):
         # Let's stick to created_at DESC for now to avoid index complexity, 
         # unless user asks for "Critical First" view specifically.
         
-        jobs = JobsDAO.search_listings(query, limit, skip)
+        if location_zip and AREA_LISTINGS.enabled:
+            # Hot areas: the zip's listings come from the per-process area cache
+            jobs = JobsDAO.search_area(location_zip, cat, urgency, limit, skip)
+        else:
+            jobs = JobsDAO.search_listings(query, limit, skip)
         
         # Inject Employer Data
+        cards = EMPLOYER_CARDS.get_many(j.get('employer_account_id') for j in jobs)
         clean_jobs = []
         for j in jobs:
             j['_id'] = str(j['_id'])
-            emp_id = j.get('employer_account_id')
-            if emp_id:
-                emp = JobsDAO.get_account(emp_id)
-                if emp:
-                    j['employer_rating'] = emp.get('rating_avg', 0.0)
-                    j['employer_rating_count'] = emp.get('rating_count', 0)
-                    j['employer_pic'] = emp.get('profile_pic', "")
-                    j['employer_jobs_count'] = emp.get('jobs_completed_count', 0)
+            j.update(cards.get(j.get('employer_account_id'), {}))
             clean_jobs.append(j)
             
         return JsonResponse({"status": "success", "data": clean_jobs})
@@ -825,6 +852,7 @@ def admin_verify_employer(request):
                     "employer_verified_at": datetime.datetime.utcnow().isoformat()
                 }}
             )
+            JobsDAO.invalidate_principal(account_id)
             JobsDAO.log_audit("admin", "system", "verify_employer", "account", account_id, {"action": "APPROVE"})
             return JsonResponse({'status': 'approved', 'account_id': account_id})
         
@@ -838,6 +866,7 @@ def admin_verify_employer(request):
                     "notes_admin": f"Employer verification rejected on {datetime.datetime.utcnow().isoformat()}"
                 }}
             )
+            JobsDAO.invalidate_principal(account_id)
             JobsDAO.log_audit("admin", "system", "reject_employer", "account", account_id, {"action": "REJECT"})
             return JsonResponse({'status': 'rejected', 'account_id': account_id})
             
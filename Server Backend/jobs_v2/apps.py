@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
 
 
 class JobsV2Config(AppConfig):
@@ -10,5 +11,7 @@ class JobsV2Config(AppConfig):
         from .models import JobsDB
         try:
             JobsDB.ensure_indexes()
+        except ImproperlyConfigured:
+            raise  # Stored password hashes this host cannot verify
         except Exception as e:
             print(f"[JOBS_V2] Index creation deferred: {e}")
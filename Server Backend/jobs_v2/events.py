@@ -0,0 +1,224 @@
+# Jobs v2 - Chat Event Hub (push channel for /api/jobs_v2/events)
+#
+# Writers (send_message / mark_messages_read / delete_message) publish small
+# events - {type, application_id, message_id} - addressed to the
+# conversation's participants. Clients re-sync the conversation with
+# ?since= (views/applications.get_messages) when one arrives.
+#
+# Fan-out:
+# - Every event is appended to the capped `jobs_events` collection. Each
+#   process that holds open streams runs one thread tailing it, so an event
+#   written by any gunicorn worker reaches subscribers in every worker.
+#   Each event carries `seq`, taken from a counter doc in jobs_counters
+#   before the insert. It is the SSE event id, so a reconnecting client
+#   replays what it missed (Last-Event-ID). The tail and replay resume on
+#   seq, not _id: ObjectIds minted by different workers in the same second
+#   do not sort in insert order.
+# - Without capped collection support (mongomock) events are dispatched
+#   in-process only.
+
+import itertools
+import queue
+import threading
+import time
+
+from bson import ObjectId
+from pymongo import ASCENDING, CursorType, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from core.retention import ensure_capped
+
+EVENTS_COLLECTION = "jobs_events"
+COUNTERS_COLLECTION = "jobs_counters"
+SEQ_COUNTER = "jobs_events"
+EVENTS_CAPPED_BYTES = 16 * 1024 * 1024
+EVENTS_CAPPED_DOCS = 100000
+SUBSCRIBER_QUEUE_SIZE = 100
+REPLAY_LIMIT = 200
+
+# type values
+MESSAGE = "message"
+READ = "read"
+DELETE = "delete"
+
+
+class Subscription:
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Slow reader: it gets a resync hint instead of unbounded memory
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next event, or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+
+    def __init__(self, db_getter):
+        self._db_getter = db_getter
+        self._subscribers = {}  # user_id -> set(Subscription)
+        self._lock = threading.Lock()
+        self._bridged = None  # None = not checked yet
+        self._tail_thread = None
+        self._local_seq = itertools.count(1)  # In-process ids when there is no bridge
+
+    # --- SETUP ---
+
+    def _db(self):
+        return self._db_getter()
+
+    def bridged(self):
+        """True when jobs_events is a capped collection (cross-process fan-out)."""
+        if self._bridged is None:
+            db = self._db()
+            ensure_capped(db, EVENTS_COLLECTION, EVENTS_CAPPED_BYTES, EVENTS_CAPPED_DOCS)
+            try:
+                self._bridged = bool(db[EVENTS_COLLECTION].options().get("capped"))
+                if self._bridged:
+                    db[EVENTS_COLLECTION].create_index(
+                        [("user_ids", ASCENDING), ("seq", ASCENDING)], name="user_seq_replay"
+                    )
+            except Exception as e:
+                # Includes backends without capped support (mongomock)
+                print(f"[!] Jobs event bridge unavailable, in-process only: {e}")
+                self._bridged = False
+        return self._bridged
+
+    def _current_seq(self):
+        counter = self._db()[COUNTERS_COLLECTION].find_one({"_id": SEQ_COUNTER})
+        return counter["seq"] if counter else 0
+
+    def _next_seq(self):
+        counter = self._db()[COUNTERS_COLLECTION].find_one_and_update(
+            {"_id": SEQ_COUNTER}, {"$inc": {"seq": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"]
+
+    # --- PUBLISH ---
+
+    def publish(self, user_ids, event_type, application_id, message_id=None):
+        user_ids = [u for u in dict.fromkeys(user_ids) if u]
+        if not user_ids:
+            return
+        doc = {
+            "_id": ObjectId(),
+            "user_ids": user_ids,
+            "type": event_type,
+            "application_id": application_id,
+            "message_id": message_id,
+        }
+        try:
+            if self.bridged():
+                # Local subscribers are served by the tail thread like everyone else
+                doc["seq"] = self._next_seq()
+                self._db()[EVENTS_COLLECTION].insert_one(doc)
+                return
+        except PyMongoError as e:
+            print(f"[!] Jobs event not persisted ({event_type}): {e}")
+        doc["seq"] = next(self._local_seq)
+        self._dispatch(doc)
+
+    def _dispatch(self, doc):
+        event = {
+            "id": str(doc["seq"]),
+            "type": doc["type"],
+            "application_id": doc["application_id"],
+            "message_id": doc.get("message_id"),
+        }
+        with self._lock:
+            targets = [s for u in doc.get("user_ids", []) for s in self._subscribers.get(u, ())]
+        for sub in targets:
+            sub.put(event)
+
+    # --- SUBSCRIBE ---
+
+    def subscribe(self, user_id):
+        sub = Subscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+        if self.bridged():
+            self._ensure_tail()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def replay(self, user_id, last_event_id):
+        """
+        Events for `user_id` after `last_event_id`, oldest first. Returns None
+        when they cannot be replayed (unknown / evicted id, or no bridge), so
+        the client should resync instead.
+        """
+        if not self.bridged():
+            return None
+        try:
+            after = int(last_event_id)
+        except (ValueError, TypeError):
+            return None  # Includes ObjectId ids from before seq existed
+        col = self._db()[EVENTS_COLLECTION]
+        oldest = col.find_one({}, {"seq": 1}, sort=[("$natural", ASCENDING)])
+        if not oldest or oldest.get("seq", 0) > after:
+            return None
+        docs = list(col.find({"user_ids": user_id, "seq": {"$gt": after}})
+                    .sort("seq", ASCENDING).limit(REPLAY_LIMIT + 1))
+        if len(docs) > REPLAY_LIMIT:
+            return None
+        return [{"id": str(d["seq"]), "type": d["type"], "application_id": d["application_id"],
+                 "message_id": d.get("message_id")} for d in docs]
+
+    # --- TAIL (cross-process bridge) ---
+
+    def _ensure_tail(self):
+        with self._lock:
+            if self._tail_thread and self._tail_thread.is_alive():
+                return
+            self._tail_thread = threading.Thread(target=self._tail, name="jobs-events-tail", daemon=True)
+            self._tail_thread.start()
+
+    def _tail(self):
+        col = self._db()[EVENTS_COLLECTION]
+        last_seq = None
+        while True:
+            try:
+                if last_seq is None:
+                    last_seq = self._current_seq()  # Only events from now on; older ones go through replay()
+                # The open cursor follows insert order; seq only places a re-open
+                cursor = col.find(
+                    {"seq": {"$gt": last_seq}},
+                    cursor_type=CursorType.TAILABLE_AWAIT,
+                ).max_await_time_ms(1000)
+                while cursor.alive:
+                    for doc in cursor:
+                        last_seq = max(last_seq, doc["seq"])
+                        self._dispatch(doc)
+                # Dead cursor (e.g. empty collection): back off and re-open
+                time.sleep(1)
+            except PyMongoError as e:
+                print(f"[!] Jobs event tail error: {e}")
+                time.sleep(2)
+
+
+def _jobs_db():
+    from .models import JobsDB
+    return JobsDB._db()
+
+
+HUB = EventHub(_jobs_db)
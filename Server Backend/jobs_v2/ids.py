@@ -0,0 +1,91 @@
+# Jobs v2 - Public ID Generator
+#
+# `<prefix>_<16 chars>`: 80 bits in Crockford base32, made of
+#   48 bits  unix time in ms
+#   16 bits  worker id (JOBS_WORKER_ID, else random per process)
+#   16 bits  per-process counter, starting each ms at a random value below 2^15
+# Ids from one process are strictly increasing; across processes they sort by
+# millisecond. The fixed width makes string order equal time order, so a
+# message_id / application_id works as a sort key or keyset cursor on its own.
+# Pre-existing ids (`msg_<ms>`) keep their format and stay valid.
+#
+# Uniqueness across processes rests on the worker id. A random one can repeat
+# (two processes share one about once in 65536 pairs); the random counter
+# start then still keeps a clash within one ms to about 1 in 32768. Deploys
+# with more than one writing process (several containers or gunicorn
+# workers) should set JOBS_WORKER_ID to a distinct value per process.
+
+import os
+import secrets
+import threading
+import time
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford: no I, L, O, U
+ID_LENGTH = 16
+WORKER_BITS = 16
+SEQUENCE_BITS = 16
+SEQUENCE_MAX = (1 << SEQUENCE_BITS) - 1
+SEQUENCE_START_SPAN = 1 << (SEQUENCE_BITS - 1)  # Leaves >= 32768 ids per ms
+
+# Governance prefixes
+USER = "usr"
+JOB = "job"
+APPLICATION = "app"
+MESSAGE = "msg"
+REPORT = "rpt"
+MODERATION = "mod"
+
+
+def _worker_id():
+    configured = os.environ.get("JOBS_WORKER_ID")
+    if configured:
+        return int(configured) & ((1 << WORKER_BITS) - 1)
+    return secrets.randbits(WORKER_BITS)
+
+
+def _encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, r = divmod(value, 32)
+        chars.append(ALPHABET[r])
+    return "".join(reversed(chars))
+
+
+class IdGenerator:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.worker = _worker_id()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_value(self):
+        with self._lock:
+            now = int(time.time() * 1000)
+            if now > self._last_ms:
+                self._last_ms, self._sequence = now, secrets.randbelow(SEQUENCE_START_SPAN)
+            elif self._sequence < SEQUENCE_MAX:
+                # Same ms, or the clock stepped back: stay on the last ms
+                self._sequence += 1
+            else:
+                # Counter exhausted: borrow the next ms rather than repeat
+                self._last_ms, self._sequence = self._last_ms + 1, 0
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker << SEQUENCE_BITS) | self._sequence
+
+    def new_id(self, prefix):
+        return f"{prefix}_{_encode(self.next_value())}"
+
+
+_GENERATOR = IdGenerator()
+if hasattr(os, "register_at_fork"):
+    # Forked workers (gunicorn --preload) get their own worker id and counter
+    os.register_at_fork(after_in_child=_GENERATOR._reset)
+
+
+def new_id(prefix):
+    """Sortable, collision-free public id, e.g. new_id(MESSAGE) -> 'msg_01JAB3...'."""
+    return _GENERATOR.new_id(prefix)
+
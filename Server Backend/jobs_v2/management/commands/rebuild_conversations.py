@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from jobs_v2.models import JobsDB
+
+
+class Command(BaseCommand):
+    help = 'Backfills jobs_conversations (inbox summaries) from jobs_applications + jobs_messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Include applications with messaging disabled")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding conversation summaries...")
+        n = JobsDB.rebuild_conversations(only_messaging=not options['all'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {n} conversations."))
@@ -2,11 +2,28 @@
 # Server-Authoritative Logic & Schema
 
 from django.conf import settings
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument
 import datetime
-import time
+import heapq
 from django.db import models
 
+from core import passwords
+from core.card_cache import CardCache
+from core.geo_cells import CellCache, covering_cells, distance_m, geohash
+from . import ids
+from .events import HUB, MESSAGE, READ, DELETE
+from .ids import new_id
+
+# Chat history paging (get_messages / get_message_changes)
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_PAGE_MAX = 200
+SYNC_OVERLAP_SECONDS = 5  # Sync tokens trail "now" so late-committed writes are not skipped
+POST_PAGE_SIZE = 50
+POST_PAGE_MAX = 100
+# Geohash precision of jobs_posts.geo_cell (~39 x 20 km cells). Changing it
+# needs geo_cell recomputed on existing posts.
+SEARCH_CELL_PRECISION = 4
+
 class JobsDashboard(models.Model):
     """
     Proxy model to expose Jobs V2 in Django Admin.
@@ -44,6 +61,7 @@ class JobsDB:
         # 1. jobs_users
         db.jobs_users.create_index([("phone_e164", ASCENDING)], unique=True)
         db.jobs_users.create_index([("email", ASCENDING)], unique=True)
+        db.jobs_users.create_index([("account_id", ASCENDING)])  # get_user / get_users
         db.jobs_users.create_index([
             ("status", ASCENDING),
             ("role", ASCENDING),
@@ -51,12 +69,35 @@ class JobsDB:
         ])
         
         # 2. jobs_posts
-        db.jobs_posts.create_index([("location", "2dsphere")])  # Geo index
+        # Search (search_posts): the always-present equality filters lead, then
+        # the geo key, then the optional category / pay_type filters so the
+        # 2dsphere scan checks them in the index instead of on fetched docs.
+        db.jobs_posts.create_index([
+            ("status", ASCENDING),
+            ("moderation_state", ASCENDING),
+            ("location", "2dsphere"),
+            ("category", ASCENDING),
+            ("pay_type", ASCENDING)
+        ], name="search_geo")
+        # Search cell loads (SEARCH_CELLS)
+        db.jobs_posts.create_index([
+            ("geo_cell", ASCENDING),
+            ("status", ASCENDING),
+            ("moderation_state", ASCENDING)
+        ], name="search_cell")
+        # Search without a location: newest first, keyset on (created_at, job_id)
+        db.jobs_posts.create_index([
+            ("status", ASCENDING),
+            ("moderation_state", ASCENDING),
+            ("created_at", DESCENDING),
+            ("job_id", DESCENDING)
+        ], name="search_recent")
         db.jobs_posts.create_index([
             ("status", ASCENDING),
             ("category", ASCENDING)
         ])
         db.jobs_posts.create_index([("employer_id", ASCENDING)])
+        db.jobs_posts.create_index([("job_id", ASCENDING)])  # get_post / inbox $lookup
         
         # 3. jobs_applications
         db.jobs_applications.create_index([
@@ -66,6 +107,27 @@ class JobsDB:
         db.jobs_applications.create_index([("worker_id", ASCENDING)])
         db.jobs_applications.create_index([("status", ASCENDING)])
 
+        # 3b. jobs_messages (chat history pages + sync + conversation rebuilds)
+        db.jobs_messages.create_index([("application_id", ASCENDING), ("created_at", ASCENDING)])
+        db.jobs_messages.create_index([
+            ("application_id", ASCENDING),
+            ("updated_at", ASCENDING),
+            ("message_id", ASCENDING)
+        ])
+        db.jobs_messages.create_index([("message_id", ASCENDING)])
+        db.jobs_messages.create_index([
+            ("application_id", ASCENDING),
+            ("sender_id", ASCENDING),
+            ("read_at", ASCENDING)
+        ])
+
+        # 3c. jobs_conversations (inbox summary per application)
+        db.jobs_conversations.create_index([
+            ("participants", ASCENDING),
+            ("allow_messaging", ASCENDING),
+            ("last_at", DESCENDING)
+        ])
+
         # 4. jobs_reports
         db.jobs_reports.create_index([("target_id", ASCENDING), ("target_type", ASCENDING)])
 
@@ -74,6 +136,16 @@ class JobsDB:
         
         print(">> [JOBS V2] Strict Indexes Verified")
 
+        passwords.check_stored_hashes(db.jobs_users)
+
+        backfilled = cls.backfill_geo_cells()
+        if backfilled:
+            print(f">> [JOBS V2] geo_cell set on {backfilled} posts")
+
+        synced = cls.backfill_conversations()
+        if synced:
+            print(f">> [JOBS V2] Conversation summaries built for {synced} applications")
+
     # =========================================================================
     # USER MANAGEMENT (jobs_users)
     # =========================================================================
@@ -85,7 +157,7 @@ class JobsDB:
         Initializes trust_score to 50 (neutral).
         """
         user_doc = {
-            "account_id": f"usr_{int(time.time()*1000)}",  # Public ID (usr_ prefix per governance)
+            "account_id": new_id(ids.USER),  # Public ID (usr_ prefix per governance)
             "role": role,  # 'worker' | 'employer'
             "status": "active",  # 'active' | 'suspended_temp' | 'banned'
             
@@ -128,6 +200,31 @@ class JobsDB:
     def get_user(cls, account_id):
         return cls._db().jobs_users.find_one({"account_id": account_id}, {"_id": 0, "password_hash": 0})
         
+    @classmethod
+    def get_principal(cls, account_id):
+        """get_user for auth decorators, from PRINCIPALS (a copy, safe to mutate)."""
+        user = PRINCIPALS.get(account_id)
+        return dict(user) if user else None
+
+    @classmethod
+    def _load_principals(cls, account_ids):
+        cursor = cls._db().jobs_users.find({"account_id": {"$in": list(account_ids)}}, {"_id": 0, "password_hash": 0})
+        return {doc["account_id"]: doc for doc in cursor}
+
+    @classmethod
+    def update_user(cls, account_id, updates):
+        """$set on a user; drops the cached principal so auth sees the change."""
+        cls._db().jobs_users.update_one({"account_id": account_id}, {"$set": updates})
+        PRINCIPALS.invalidate(account_id)
+
+    @classmethod
+    def get_users(cls, account_ids, fields):
+        """Batch lookup: {account_id: doc} with only `fields`, in one $in query."""
+        projection = {f: 1 for f in fields}
+        projection.update({"_id": 0, "account_id": 1})
+        cursor = cls._db().jobs_users.find({"account_id": {"$in": list(account_ids)}}, projection)
+        return {doc["account_id"]: doc for doc in cursor}
+        
     @classmethod
     def get_user_by_email(cls, email):
         return cls._db().jobs_users.find_one({"email": email}, {"_id": 0})
@@ -138,17 +235,14 @@ class JobsDB:
 
     @classmethod
     def update_user_location(cls, account_id, lat, lon, accuracy=0):
-        cls._db().jobs_users.update_one(
-            {"account_id": account_id},
-            {"$set": {
-                "precise_location": {
-                    "lat": lat,
-                    "lon": lon,
-                    "accuracy_m": accuracy,
-                    "captured_at": datetime.datetime.utcnow()
-                }
-            }}
-        )
+        cls.update_user(account_id, {
+            "precise_location": {
+                "lat": lat,
+                "lon": lon,
+                "accuracy_m": accuracy,
+                "captured_at": datetime.datetime.utcnow()
+            }
+        })
 
     # =========================================================================
     # POSTS (jobs_posts)
@@ -156,7 +250,7 @@ class JobsDB:
 
     @classmethod
     def create_post(cls, employer_id, category, pay_type, pay_range, start_time, duration, location, description):
-        job_id = f"job_{int(time.time()*1000)}"
+        job_id = new_id(ids.JOB)
         
         post_doc = {
             "job_id": job_id,
@@ -176,6 +270,7 @@ class JobsDB:
                 "type": "Point",
                 "coordinates": [location['lon'], location['lat']]  # GeoJSON: [lon, lat]
             },
+            "geo_cell": geohash(location['lat'], location['lon'], SEARCH_CELL_PRECISION),
             "display_location": {  # Coarsened for safety
                 "lat": round(location['lat'], 2),
                 "lon": round(location['lon'], 2)
@@ -188,30 +283,141 @@ class JobsDB:
         }
         
         cls._db().jobs_posts.insert_one(post_doc)
+        SEARCH_CELLS.invalidate(post_doc["geo_cell"])
         return job_id
 
     @classmethod
-    def search_posts(cls, category=None, lat=None, lon=None, radius_km=50):
+    def search_posts(cls, category=None, lat=None, lon=None, radius_km=50, pay_type=None,
+                     cursor=None, limit=POST_PAGE_SIZE):
         """
-        Geo-spatial search for active jobs.
+        Search for active jobs, one page at a time. With lat/lon: nearest first
+        within radius_km, each post carrying `distance_km`; otherwise newest
+        first. Returns (posts, next_cursor); pass next_cursor back for the
+        next page (None = last page). Raises ValueError on a malformed cursor.
         """
+        limit = max(1, min(int(limit), POST_PAGE_MAX))
         query = {"status": "active", "moderation_state": "clean"}
         if category:
             query["category"] = category
-            
-        if lat is not None and lon is not None:
-            query["location"] = {
-                "$near": {
-                    "$geometry": {
-                        "type": "Point",
-                        "coordinates": [lon, lat]
-                    },
-                    "$maxDistance": radius_km * 1000
-                }
-            }
-            
-        cursor = cls._db().jobs_posts.find(query, {"_id": 0}).limit(50)
-        return list(cursor)
+        if pay_type:
+            query["pay_type"] = pay_type
+
+        if lat is None or lon is None:
+            return cls._search_recent(query, cursor, limit)
+
+        after = None
+        if cursor:
+            after_m, after_id = cls.parse_post_cursor(cursor)
+            after = (float(after_m), after_id)
+        cells = covering_cells(lat, lon, radius_km, SEARCH_CELL_PRECISION) if SEARCH_CELLS.enabled else None
+        if cells is not None:
+            return cls._search_cells(cells, category, pay_type, lat, lon, radius_km, after, limit)
+
+        near = {
+            "near": {"type": "Point", "coordinates": [lon, lat]},
+            "key": "location",
+            "distanceField": "distance_m",
+            "maxDistance": radius_km * 1000,
+            "spherical": True,
+            "query": query,
+        }
+        pipeline = [{"$geoNear": near}]
+        if after:
+            after_m, after_id = after
+            # minDistance lets the index skip everything nearer than the last page
+            near["minDistance"] = after_m
+            pipeline.append({"$match": {"$or": [
+                {"distance_m": {"$gt": after_m}},
+                {"distance_m": after_m, "job_id": {"$gt": after_id}}
+            ]}})
+        # $geoNear already streams by distance; the sort only orders equal distances by job_id
+        pipeline += [
+            {"$sort": {"distance_m": ASCENDING, "job_id": ASCENDING}},
+            {"$limit": limit + 1},
+            {"$project": {"_id": 0}},
+        ]
+        posts = list(cls._db().jobs_posts.aggregate(pipeline))
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = cls.make_post_cursor(repr(posts[-1]["distance_m"]), posts[-1]["job_id"])
+        for post in posts:
+            post["distance_km"] = round(post.pop("distance_m") / 1000, 2)
+        return posts, next_cursor
+
+    @classmethod
+    def _search_cells(cls, cells, category, pay_type, lat, lon, radius_km, after, limit):
+        """search_posts from SEARCH_CELLS: same ranking and cursors as the $geoNear path."""
+        radius_m = radius_km * 1000
+        hits = []
+        for posts in SEARCH_CELLS.get_many(cells, category).values():
+            for post in posts:
+                if pay_type and post.get("pay_type") != pay_type:
+                    continue
+                post_lon, post_lat = post["location"]["coordinates"]
+                key = (distance_m(lat, lon, post_lat, post_lon), post["job_id"])
+                if key[0] <= radius_m and (after is None or key > after):
+                    hits.append((key, post))
+        hits = heapq.nsmallest(limit + 1, hits, key=lambda hit: hit[0])
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = cls.make_post_cursor(repr(hits[-1][0][0]), hits[-1][0][1])
+        return [dict(post, distance_km=round(key[0] / 1000, 2)) for key, post in hits], next_cursor
+
+    @classmethod
+    def _load_search_cells(cls, cells, category):
+        query = {"status": "active", "moderation_state": "clean", "geo_cell": {"$in": cells}}
+        if category:
+            query["category"] = category
+        by_cell = {}
+        for post in cls._db().jobs_posts.find(query, {"_id": 0}):
+            by_cell.setdefault(post["geo_cell"], []).append(post)
+        return by_cell
+
+    @classmethod
+    def backfill_geo_cells(cls):
+        """Sets geo_cell on posts written before it existed; returns the count."""
+        n = 0
+        col = cls._db().jobs_posts
+        for post in col.find({"geo_cell": {"$exists": False}, "location.coordinates": {"$exists": True}},
+                             {"job_id": 1, "location": 1}):
+            lon, lat = post["location"]["coordinates"]
+            col.update_one({"_id": post["_id"]}, {"$set": {"geo_cell": geohash(lat, lon, SEARCH_CELL_PRECISION)}})
+            n += 1
+        if n:
+            SEARCH_CELLS.invalidate()
+        return n
+
+    @classmethod
+    def _search_recent(cls, query, cursor, limit):
+        if cursor:
+            after_at, after_id = cls.parse_post_cursor(cursor)
+            after_at = datetime.datetime.fromisoformat(after_at)
+            query["$or"] = [
+                {"created_at": {"$lt": after_at}},
+                {"created_at": after_at, "job_id": {"$lt": after_id}}
+            ]
+        posts = list(cls._db().jobs_posts.find(query, {"_id": 0})
+                     .sort([("created_at", DESCENDING), ("job_id", DESCENDING)])
+                     .limit(limit + 1))
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = cls.make_post_cursor(posts[-1]["created_at"].isoformat(), posts[-1]["job_id"])
+        return posts, next_cursor
+
+    @staticmethod
+    def make_post_cursor(position, job_id):
+        """`<distance in m | created_at iso>|<job_id>` - opaque to clients."""
+        return f"{position}|{job_id}"
+
+    @staticmethod
+    def parse_post_cursor(cursor):
+        position, sep, job_id = cursor.partition("|")
+        if not sep or not job_id:
+            raise ValueError("Malformed cursor")
+        return position, job_id
 
     @classmethod
     def get_post(cls, job_id):
@@ -223,10 +429,18 @@ class JobsDB:
         Admin or System update of job status.
         Valid statuses: active, suspended, removed, filled, under_review
         """
-        cls._db().jobs_posts.update_one(
+        cls.update_post(job_id, {"status": status})
+
+    @classmethod
+    def update_post(cls, job_id, updates):
+        """$set on a post; drops its search cell from SEARCH_CELLS."""
+        post = cls._db().jobs_posts.find_one_and_update(
             {"job_id": job_id},
-            {"$set": {"status": status}}
+            {"$set": updates},
+            projection={"_id": 0, "geo_cell": 1}
         )
+        if post and post.get("geo_cell"):
+            SEARCH_CELLS.invalidate(post["geo_cell"])
 
     # =========================================================================
     # APPLICATIONS (jobs_applications)
@@ -234,7 +448,7 @@ class JobsDB:
 
     @classmethod
     def apply_to_job(cls, job_id, worker_id):
-        app_id = f"app_{int(time.time()*1000)}"
+        app_id = new_id(ids.APPLICATION)
         
         # Check if already applied
         if cls._db().jobs_applications.find_one({"job_id": job_id, "worker_id": worker_id}):
@@ -263,6 +477,7 @@ class JobsDB:
             {"application_id": app_id},
             {"$set": updates}
         )
+        cls.sync_conversation(app_id)
         
     @classmethod
     def get_applications_for_job(cls, job_id):
@@ -281,12 +496,13 @@ class JobsDB:
         """Send a message within an application context."""
         import hashlib
         
-        msg_id = f"msg_{int(time.time()*1000)}"
+        msg_id = new_id(ids.MESSAGE)
         
         # Generate content hash for integrity verification
         hash_input = f"{application_id}:{sender_id}:{content}:{image_url or ''}"
         content_hash = hashlib.sha256(hash_input.encode()).hexdigest()[:16]
         
+        now = datetime.datetime.utcnow()
         doc = {
             "message_id": msg_id,
             "application_id": application_id,
@@ -294,34 +510,127 @@ class JobsDB:
             "content": content,
             "image_url": image_url,  # Optional photo attachment
             "content_hash": content_hash,  # Integrity check
-            "created_at": datetime.datetime.utcnow(),
-            "read_at": None  # Null until recipient reads
+            "created_at": now,
+            "updated_at": now,  # Bumped on read / delete (sync cursor)
+            "read_at": None,  # Null until recipient reads
+            "deleted_at": None  # Soft delete keeps a tombstone for sync
         }
         cls._db().jobs_messages.insert_one(doc)
+        
+        # Conversation summary: preview + unread for everyone but the sender
+        conv = cls._db().jobs_conversations.find_one({"_id": application_id}, {"participants": 1})
+        if conv is None:
+            # First message since the backfill: building it counts this message too
+            conv = cls.sync_conversation(application_id) or {}
+            HUB.publish(conv.get("participants", []), MESSAGE, application_id, msg_id)
+            return msg_id
+        update = {"$set": {
+            "last_message": content,
+            "last_message_at": now,
+            "last_message_id": msg_id,
+            "last_sender_id": sender_id,
+            "last_at": now
+        }}
+        inc = {f"unread.{p}": 1 for p in conv.get("participants", []) if p != sender_id}
+        if inc:
+            update["$inc"] = inc
+        cls._db().jobs_conversations.update_one({"_id": application_id}, update)
+        HUB.publish(conv.get("participants", []), MESSAGE, application_id, msg_id)
         return msg_id
         
     @classmethod
-    def get_messages(cls, application_id):
-        """Get chat history for an application."""
-        cursor = cls._db().jobs_messages.find(
-            {"application_id": application_id}, 
-            {"_id": 0}
-        ).sort("created_at", ASCENDING)
-        return list(cursor)
+    def get_messages(cls, application_id, before=None, after=None, limit=MESSAGE_PAGE_SIZE):
+        """
+        One page of chat history, oldest first. Keyset cursors are message ids:
+        `before` pages back from a message, `after` forward; with neither it is
+        the latest page. Returns (messages, has_more) where has_more means
+        older messages exist (newer ones with `after`).
+        """
+        limit = max(1, min(int(limit), MESSAGE_PAGE_MAX))
+        query = {"application_id": application_id, "deleted_at": None}
+        cursor_id = before or after
+        if cursor_id:
+            anchor = cls._db().jobs_messages.find_one(
+                {"message_id": cursor_id, "application_id": application_id},
+                {"_id": 0, "created_at": 1}
+            )
+            if not anchor:
+                return [], False
+            op = "$lt" if before else "$gt"
+            query["$or"] = [
+                {"created_at": {op: anchor["created_at"]}},
+                {"created_at": anchor["created_at"], "message_id": {op: cursor_id}}
+            ]
+        
+        order = ASCENDING if after else DESCENDING
+        page = list(cls._db().jobs_messages.find(query, {"_id": 0})
+                    .sort([("created_at", order), ("message_id", order)])
+                    .limit(limit + 1))
+        has_more = len(page) > limit
+        page = page[:limit]
+        if order == DESCENDING:
+            page.reverse()
+        return page, has_more
+
+    @classmethod
+    def get_message_changes(cls, application_id, since_token, limit=MESSAGE_PAGE_MAX):
+        """
+        Incremental sync: messages created, read or deleted after `since_token`
+        (deleted ones as tombstones). Returns (messages, has_more, next_token);
+        the caller passes next_token back and merges by message_id.
+        """
+        limit = max(1, min(int(limit), MESSAGE_PAGE_MAX))
+        since_at, since_id = cls.parse_sync_token(since_token)
+        query = {"application_id": application_id, "$or": [
+            {"updated_at": {"$gt": since_at}},
+            {"updated_at": since_at, "message_id": {"$gt": since_id}}
+        ]}
+        changes = list(cls._db().jobs_messages.find(query, {"_id": 0})
+                       .sort([("updated_at", ASCENDING), ("message_id", ASCENDING)])
+                       .limit(limit + 1))
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            last = changes[-1]
+            return changes, True, cls.make_sync_token(last["updated_at"], last["message_id"])
+        return changes, False, cls.make_sync_token()
+
+    @staticmethod
+    def make_sync_token(at=None, message_id=""):
+        if at is None:
+            at = datetime.datetime.utcnow() - datetime.timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        return f"{at.isoformat()}|{message_id}"
+
+    @staticmethod
+    def parse_sync_token(token):
+        """(updated_at, message_id); raises ValueError on a malformed token."""
+        at, _, message_id = token.partition("|")
+        return datetime.datetime.fromisoformat(at), message_id
 
     @classmethod
     def mark_messages_read(cls, application_id, reader_id):
         """Mark all messages in a conversation as read by reader_id.
         Only marks messages NOT sent by reader_id (you can't read your own messages).
         """
-        cls._db().jobs_messages.update_many(
+        # Counter first: a message landing in between stays counted (over- rather than under-reports)
+        conv = cls._db().jobs_conversations.find_one_and_update(
+            {"_id": application_id},
+            {"$set": {f"unread.{reader_id}": 0}},
+            projection={"participants": 1}
+        ) or {}
+        now = datetime.datetime.utcnow()
+        result = cls._db().jobs_messages.update_many(
             {
                 "application_id": application_id,
                 "sender_id": {"$ne": reader_id},
-                "read_at": None
+                "read_at": None,
+                "deleted_at": None
             },
-            {"$set": {"read_at": datetime.datetime.utcnow()}}
+            {"$set": {"read_at": now, "updated_at": now}}
         )
+        if result.modified_count:
+            # Read receipts for the senders
+            HUB.publish(conv.get("participants", []), READ, application_id)
 
     @classmethod
     def delete_message(cls, message_id, user_id):
@@ -332,7 +641,7 @@ class JobsDB:
         3. Message hasn't been read yet
         Returns: (success, error_message)
         """
-        msg = cls._db().jobs_messages.find_one({"message_id": message_id})
+        msg = cls._db().jobs_messages.find_one({"message_id": message_id, "deleted_at": None})
         if not msg:
             return False, "Message not found"
         
@@ -348,106 +657,183 @@ class JobsDB:
             if age > 120:  # 2 minutes
                 return False, "Cannot delete - over 2 minutes old"
         
-        cls._db().jobs_messages.delete_one({"message_id": message_id})
+        # Tombstone (content dropped) so syncing clients see the delete
+        now = datetime.datetime.utcnow()
+        result = cls._db().jobs_messages.update_one(
+            {"message_id": message_id, "read_at": None, "deleted_at": None},
+            {"$set": {"deleted_at": now, "updated_at": now, "content": "", "image_url": None}}
+        )
+        if not result.modified_count:
+            return False, "Cannot delete - already read"
+        
+        # Undo the unread increment (the message was unread by definition)
+        application_id = msg["application_id"]
+        conv = cls._db().jobs_conversations.find_one(
+            {"_id": application_id}, {"participants": 1, "last_message_id": 1, "created_at": 1}
+        )
+        if conv:
+            dec = {f"unread.{p}": -1 for p in conv.get("participants", []) if p != user_id}
+            if dec:
+                cls._db().jobs_conversations.update_one({"_id": application_id}, {"$inc": dec})
+            if conv.get("last_message_id") == message_id:
+                cls._set_last_message(application_id, conv.get("created_at"), only_if_last=message_id)
+            HUB.publish(conv.get("participants", []), DELETE, application_id, message_id)
         return True, None
 
+    # =========================================================================
+    # CONVERSATIONS (jobs_conversations)
+    # =========================================================================
+    # One summary doc per application (_id = application_id), kept current by
+    # update_application_status / send_message / mark_messages_read /
+    # delete_message so the inbox is a single indexed read:
+    #   participants, names {id: display name}, job_title, status,
+    #   allow_messaging, last_message(_at/_id), last_sender_id,
+    #   last_at (sort key), unread {account_id: count}
+
     @classmethod
-    def get_inbox_conversations(cls, user_id):
+    def sync_conversation(cls, application_id, recount=False):
         """
-        Get all applications where user is worker OR employer, 
-        AND allow_messaging is True.
-        Enriched with last message.
+        Upserts the static part of a conversation (participants, names, status)
+        from its application. A new doc (or `recount`) also recomputes the last
+        message and unread counters from jobs_messages.
         """
         db = cls._db()
+        existed = db.jobs_conversations.count_documents({"_id": application_id}, limit=1)
+        app = cls.get_application(application_id)
+        job = cls.get_post(app["job_id"]) if app else None
+        if not job:
+            db.jobs_conversations.delete_one({"_id": application_id})
+            return None
+        employer_id = job.get("employer_id")
+        participants = [p for p in dict.fromkeys([app["worker_id"], employer_id]) if p]
         
-        # 1. Find relevant applications
-        # Fetching all where worker_id is user OR job's employer_id is user
-        # This requires a join which is hard in Mongo without lookup.
-        # Faster approach: Query applications where worker_id = user
-        # AND Query jobs where employer_id = user -> then applications for those jobs.
-        
-        # A. Worker Applications
-        worker_apps = list(db.jobs_applications.find({
-            "worker_id": user_id,
-            "allow_messaging": True
-        }, {"_id": 0}))
-        
-        # B. Employer Applications
-        # Find jobs by this employer
-        my_jobs = list(db.jobs_posts.find({"employer_id": user_id}, {"job_id": 1}))
-        my_job_ids = [j["job_id"] for j in my_jobs]
+        names = {}
+        for account_id, user in cls.get_users(
+            participants, ["organization.name", "real_name_first", "real_name_last"]
+        ).items():
+            full_name = f"{user.get('real_name_first')} {user.get('real_name_last')}"
+            if account_id == employer_id:
+                names[account_id] = user.get("organization", {}).get("name") or full_name
+            else:
+                names[account_id] = full_name
         
-        employer_apps = []
-        if my_job_ids:
-            employer_apps = list(db.jobs_applications.find({
-                "job_id": {"$in": my_job_ids},
-                "allow_messaging": True
-            }, {"_id": 0}))
-            
-        all_apps = worker_apps + employer_apps
+        created_at = app.get("created_at")
+        conv = db.jobs_conversations.find_one_and_update(
+            {"_id": application_id},
+            {
+                "$set": {
+                    "application_id": application_id,
+                    "job_id": app["job_id"],
+                    "job_title": job.get("category", "Job"),
+                    "worker_id": app["worker_id"],
+                    "employer_id": employer_id,
+                    "participants": participants,
+                    "names": names,
+                    "status": app["status"],
+                    "allow_messaging": app.get("allow_messaging", False)
+                },
+                "$setOnInsert": {
+                    "created_at": created_at,
+                    "last_at": created_at,
+                    "last_message": None,
+                    "last_message_at": None,
+                    "last_message_id": None,
+                    "last_sender_id": None,
+                    "unread": {p: 0 for p in participants}
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if recount or not existed:
+            unread = {
+                p: db.jobs_messages.count_documents({
+                    "application_id": application_id,
+                    "sender_id": {"$ne": p},
+                    "read_at": None,
+                    "deleted_at": None
+                })
+                for p in participants
+            }
+            db.jobs_conversations.update_one({"_id": application_id}, {"$set": {"unread": unread}})
+            cls._set_last_message(application_id, created_at)
+        return conv
+
+    @classmethod
+    def _set_last_message(cls, application_id, created_at, only_if_last=None):
+        latest = list(cls._db().jobs_messages.find(
+            {"application_id": application_id, "deleted_at": None},
+            {"_id": 0, "message_id": 1, "content": 1, "created_at": 1, "sender_id": 1}
+        ).sort([("created_at", DESCENDING), ("message_id", DESCENDING)]).limit(1))
+        last = latest[0] if latest else {}
+        query = {"_id": application_id}
+        if only_if_last:
+            query["last_message_id"] = only_if_last  # Don't clobber a newer message
+        cls._db().jobs_conversations.update_one(query, {"$set": {
+            "last_message": last.get("content"),
+            "last_message_at": last.get("created_at"),
+            "last_message_id": last.get("message_id"),
+            "last_sender_id": last.get("sender_id"),
+            "last_at": last.get("created_at") or created_at
+        }})
+
+    @classmethod
+    def rebuild_conversations(cls, only_messaging=True):
+        """Backfills jobs_conversations for existing applications; returns the count."""
+        query = {"allow_messaging": True} if only_messaging else {}
+        n = 0
+        for app in cls._db().jobs_applications.find(query, {"_id": 0, "application_id": 1}):
+            if cls.sync_conversation(app["application_id"], recount=True):
+                n += 1
+        return n
+
+    @classmethod
+    def backfill_conversations(cls):
+        """Builds summaries for messaging applications that have none yet; returns the count."""
+        db = cls._db()
+        have = set(db.jobs_conversations.distinct("_id"))
+        n = 0
+        for app in db.jobs_applications.find({"allow_messaging": True}, {"_id": 0, "application_id": 1}):
+            if app["application_id"] not in have and cls.sync_conversation(app["application_id"], recount=True):
+                n += 1
+        return n
+
+    @classmethod
+    def get_inbox_conversations(cls, user_id):
+        """
+        Get all applications where user is worker OR employer, 
+        AND allow_messaging is True.
+        One indexed read of jobs_conversations, newest activity first.
+        """
+        cursor = cls._db().jobs_conversations.find(
+            {"participants": user_id, "allow_messaging": True},
+            {"_id": 0}
+        ).sort("last_at", DESCENDING)
         
-        # Dedupe and Enrich
         inbox = []
-        seen_ids = set()
-        
-        for app in all_apps:
-            if app["application_id"] in seen_ids:
-                continue
-            seen_ids.add(app["application_id"])
-            
-            # Enrich with Job Title and Counterparty Name
-            job = cls.get_post(app["job_id"])
-            if not job: continue
-            
+        for conv in cursor:
             item = {
-                "application_id": app["application_id"],
-                "job_id": app["job_id"],
-                "job_title": job.get("category", "Job"),
-                "status": app["status"],
-                "updated_at": app.get("created_at") # Default
+                "application_id": conv["application_id"],
+                "job_id": conv["job_id"],
+                "job_title": conv.get("job_title", "Job"),
+                "status": conv["status"],
+                "updated_at": conv.get("last_at")
             }
             
             # Identify counterparty
-            if app["worker_id"] == user_id:
-                # User is worker, counterparty is Employer
-                emp = cls.get_user(job["employer_id"])
-                if emp:
-                    name = emp.get("organization", {}).get("name") or \
-                           f"{emp.get('real_name_first')} {emp.get('real_name_last')}"
-                    item["peer_name"] = name
-                    item["peer_id"] = job["employer_id"]
-            else:
-                # User is employer, counterparty is Worker
-                worker = cls.get_user(app["worker_id"])
-                if worker:
-                    item["peer_name"] = f"{worker.get('real_name_first')} {worker.get('real_name_last')}"
-                    item["peer_id"] = app["worker_id"]
-            
-            # Get Last Message (for preview)
-            last_msg = list(db.jobs_messages.find(
-                {"application_id": app["application_id"]},
-                {"_id": 0, "content": 1, "created_at": 1}
-            ).sort("created_at", DESCENDING).limit(1))
+            peer_id = conv.get("employer_id") if conv["worker_id"] == user_id else conv["worker_id"]
+            if peer_id in conv.get("names", {}):
+                item["peer_name"] = conv["names"][peer_id]
+                item["peer_id"] = peer_id
             
-            if last_msg:
-                item["last_message"] = last_msg[0]["content"]
-                item["last_message_at"] = last_msg[0]["created_at"]
-                item["updated_at"] = last_msg[0]["created_at"]
+            if conv.get("last_message_at"):
+                item["last_message"] = conv.get("last_message")
+                item["last_message_at"] = conv["last_message_at"]
             else:
                 item["last_message"] = "Channel Open"
+            item["unread_count"] = max(conv.get("unread", {}).get(user_id, 0), 0)
             
-            # Count unread messages (not from user, read_at is null)
-            unread_count = db.jobs_messages.count_documents({
-                "application_id": app["application_id"],
-                "sender_id": {"$ne": user_id},
-                "read_at": None
-            })
-            item["unread_count"] = unread_count
-                
             inbox.append(item)
-            
-        # Sort by updated_at desc
-        inbox.sort(key=lambda x: x.get("updated_at") or datetime.datetime.min, reverse=True)
         return inbox
 
     # =========================================================================
@@ -479,7 +865,7 @@ class JobsDB:
         weight = trust_score / 100.0  # 0.5 default
         
         # 2. Create Report Doc
-        report_id = f"rpt_{int(time.time()*1000)}"
+        report_id = new_id(ids.REPORT)
         report_doc = {
             "report_id": report_id,
             "reporter_id": reporter_id,
@@ -510,7 +896,7 @@ class JobsDB:
         """
         Append-only audit log for all safety actions.
         """
-        action_id = f"mod_{int(time.time()*1000)}"  # mod_ prefix per governance
+        action_id = new_id(ids.MODERATION)  # mod_ prefix per governance
         doc = {
             "action_id": action_id,
             "actor_id": actor_id,
@@ -550,12 +936,20 @@ class JobsDB:
     @classmethod
     def verify_employer(cls, account_id, approved):
         if approved:
-            cls._db().jobs_users.update_one(
-                {"account_id": account_id},
-                {"$set": {"trust_score": 100}} # Boost trust score
-            )
+            cls.update_user(account_id, {"trust_score": 100})  # Boost trust score
         else:
-            cls._db().jobs_users.update_one(
-                {"account_id": account_id},
-                {"$set": {"status": "banned", "ban_reason": "Verification Failed"}}
-            )
+            cls.update_user(account_id, {"status": "banned", "ban_reason": "Verification Failed"})
+
+
+# Users as seen by the auth decorators. Short TTL: writes through update_user
+# invalidate this process at once, other workers within the TTL.
+PRINCIPALS = CardCache(
+    lambda account_ids: JobsDB._load_principals(account_ids),
+    ttl_seconds=settings.JOBS_PRINCIPAL_TTL_SECONDS,
+)
+
+# Search results per (geo_cell, category), see core/geo_cells.py
+SEARCH_CELLS = CellCache(
+    lambda cells, category: JobsDB._load_search_cells(cells, category),
+    ttl_seconds=settings.JOBS_SEARCH_CELL_TTL_SECONDS,
+)
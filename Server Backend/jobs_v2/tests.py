@@ -0,0 +1,117 @@
+import datetime
+import os
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from . import ids
+from .events import HUB
+from .models import JobsDB
+
+try:
+    import mongomock
+except ImportError:  # Optional: pip install mongomock (same as benchmarks --mongomock)
+    mongomock = None
+
+
+class IdTests(SimpleTestCase):
+
+    def test_format(self):
+        value = ids.new_id(ids.MESSAGE)
+        prefix, _, body = value.partition("_")
+        self.assertEqual(prefix, "msg")
+        self.assertEqual(len(body), ids.ID_LENGTH)
+        self.assertTrue(set(body) <= set(ids.ALPHABET))
+
+    def test_strictly_increasing_in_process(self):
+        generated = [ids.new_id(ids.MESSAGE) for _ in range(20000)]
+        self.assertEqual(generated, sorted(generated))
+        self.assertEqual(len(set(generated)), len(generated))
+
+    def test_counter_exhaustion_borrows_next_ms(self):
+        gen = ids.IdGenerator()
+        with mock.patch("jobs_v2.ids.time.time", return_value=1000.0):
+            first = gen.next_value()
+            gen._sequence = ids.SEQUENCE_MAX
+            borrowed = gen.next_value()
+        self.assertGreater(borrowed, first)
+        self.assertEqual(borrowed >> (ids.WORKER_BITS + ids.SEQUENCE_BITS), 1000001)
+
+    def test_clock_step_back_stays_ordered(self):
+        gen = ids.IdGenerator()
+        with mock.patch("jobs_v2.ids.time.time", return_value=2000.0):
+            first = gen.next_value()
+        with mock.patch("jobs_v2.ids.time.time", return_value=1999.0):
+            second = gen.next_value()
+        self.assertGreater(second, first)
+
+    def test_sorts_by_time_across_workers(self):
+        with mock.patch.dict(os.environ, {"JOBS_WORKER_ID": "65535"}):
+            early = ids.IdGenerator()
+        with mock.patch.dict(os.environ, {"JOBS_WORKER_ID": "0"}):
+            late = ids.IdGenerator()
+        self.assertEqual((early.worker, late.worker), (65535, 0))
+        with mock.patch("jobs_v2.ids.time.time", return_value=3000.0):
+            a = ids._encode(early.next_value())
+        with mock.patch("jobs_v2.ids.time.time", return_value=3000.001):
+            b = ids._encode(late.next_value())
+        self.assertLess(a, b)
+
+
+@unittest.skipUnless(mongomock, "mongomock not installed")
+class UnreadCounterTests(SimpleTestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(JobsDB, "_db_instance", mongomock.MongoClient().db),
+            mock.patch.object(HUB, "_bridged", False),  # In-process events only
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.employer = JobsDB.create_user("employer", "e@test.com", "+1555001", "Emp", "Loyer", "x")
+        self.worker = JobsDB.create_user("worker", "w@test.com", "+1555002", "Wor", "Ker", "x")
+        job_id = JobsDB.create_post(self.employer, "Security", "hourly", [10, 20], datetime.datetime.utcnow(),
+                                    "1d", {"lon": 100.5, "lat": 13.7}, "Night shift")
+        self.app_id = JobsDB.apply_to_job(job_id, self.worker)
+        JobsDB.update_application_status(self.app_id, "accepted")
+
+    def _unread(self, account_id):
+        inbox = JobsDB.get_inbox_conversations(account_id)
+        return {c["application_id"]: c["unread_count"] for c in inbox}[self.app_id]
+
+    def test_send_counts_for_the_recipient_only(self):
+        JobsDB.send_message(self.app_id, self.employer, "one")
+        JobsDB.send_message(self.app_id, self.employer, "two")
+        self.assertEqual(self._unread(self.worker), 2)
+        self.assertEqual(self._unread(self.employer), 0)
+
+    def test_read_resets(self):
+        JobsDB.send_message(self.app_id, self.employer, "one")
+        JobsDB.mark_messages_read(self.app_id, self.worker)
+        self.assertEqual(self._unread(self.worker), 0)
+
+    def test_delete_undoes_the_increment(self):
+        JobsDB.send_message(self.app_id, self.employer, "one")
+        msg_id = JobsDB.send_message(self.app_id, self.employer, "two")
+        ok, _ = JobsDB.delete_message(msg_id, self.employer)
+        self.assertTrue(ok)
+        self.assertEqual(self._unread(self.worker), 1)
+        inbox = JobsDB.get_inbox_conversations(self.worker)
+        self.assertEqual(inbox[0]["last_message"], "one")
+
+    def test_recount_matches_incremental(self):
+        JobsDB.send_message(self.app_id, self.employer, "one")
+        JobsDB.send_message(self.app_id, self.worker, "reply")
+        JobsDB.send_message(self.app_id, self.employer, "two")
+        JobsDB.sync_conversation(self.app_id, recount=True)
+        self.assertEqual(self._unread(self.worker), 2)
+        self.assertEqual(self._unread(self.employer), 1)
+
+    def test_backfill_builds_missing_conversations(self):
+        JobsDB.send_message(self.app_id, self.employer, "one")
+        JobsDB._db().jobs_conversations.delete_many({})
+        self.assertEqual(JobsDB.backfill_conversations(), 1)
+        self.assertEqual(self._unread(self.worker), 1)
@@ -45,6 +45,7 @@ urlpatterns = [
     
     # Inbox
     path('inbox', applications.get_inbox, name='jobs_v2_inbox'),
+    path('events', applications.stream_events, name='jobs_v2_events'),
     
     # Message Actions
     path('messages/<str:message_id>/delete', applications.delete_message, name='jobs_v2_delete_message'),
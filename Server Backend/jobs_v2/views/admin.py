@@ -168,7 +168,6 @@ def account_action(request):
         if not account_id or not action:
             return JsonResponse({"error": "account_id and action required"}, status=400)
             
-        db = JobsDB._db()
         updates = {}
         
         if action == "SUSPEND":
@@ -180,7 +179,7 @@ def account_action(request):
         else:
              return JsonResponse({"error": "Invalid action"}, status=400)
              
-        db.jobs_users.update_one({"account_id": account_id}, {"$set": updates})
+        JobsDB.update_user(account_id, updates)
         JobsDB.log("admin", f"account_{action.lower()}", "account", account_id)
         
         return JsonResponse({"status": "success", "action": action})
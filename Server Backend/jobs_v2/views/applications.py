@@ -2,10 +2,14 @@
 # Handles Application Lifecycle and Chat
 
 import json
-from django.http import JsonResponse
+import threading
+import time
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from ..models import JobsDB
+from ..events import HUB
+from ..models import JobsDB, MESSAGE_PAGE_SIZE
 from .auth import auth_required, employer_required
 
 
@@ -67,7 +71,13 @@ def get_application_details(request, application_id):
 @csrf_exempt
 @auth_required
 def get_messages(request, application_id):
-    """GET /api/jobs_v2/applications/<app_id>/messages"""
+    """
+    GET /api/jobs_v2/applications/<app_id>/messages
+    ?before=<message_id> | ?after=<message_id> : keyset pages (latest page by default)
+    ?since=<sync_token> : only messages created/read/deleted since the token
+    ?limit= : page size (default 50, max 200)
+    Every response carries `sync_token` for the next ?since= poll.
+    """
     if request.method != "GET":
         return JsonResponse({"error": "GET required"}, status=405)
         
@@ -90,24 +100,50 @@ def get_messages(request, application_id):
         
         if not (is_applicant or is_employer):
             return JsonResponse({"error": "Unauthorized"}, status=403)
-            
-        messages = JobsDB.get_messages(application_id)
         
-        # Cache user lookups
-        user_cache = {}
+        try:
+            limit = int(request.GET.get("limit", MESSAGE_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"error": "Invalid limit"}, status=400)
+        
+        since = request.GET.get("since")
+        if since:
+            try:
+                messages, has_more, sync_token = JobsDB.get_message_changes(application_id, since, limit)
+            except ValueError:
+                return JsonResponse({"error": "Invalid since token"}, status=400)
+        else:
+            # Token taken before the read, so nothing written meanwhile is skipped
+            sync_token = JobsDB.make_sync_token()
+            messages, has_more = JobsDB.get_messages(
+                application_id,
+                before=request.GET.get("before"),
+                after=request.GET.get("after"),
+                limit=limit
+            )
+        
+        # Sender lookups: one batched query for the page
         employer_id = job.get("employer_id") if job else None
+        senders = JobsDB.get_users(
+            {m.get('sender_id') for m in messages if m.get('sender_id')},
+            ["real_name_first", "real_name_last", "photo_url"]
+        )
         
         # Enrich and serialize
+        out = []
         for m in messages:
-            if m.get('created_at'): m['created_at'] = m['created_at'].isoformat()
-            if m.get('read_at'): m['read_at'] = m['read_at'].isoformat()
+            if m.get('deleted_at'):
+                # Tombstone: lets syncing clients drop the message
+                out.append({"message_id": m["message_id"], "deleted": True,
+                            "updated_at": m['updated_at'].isoformat()})
+                continue
+            m.pop('deleted_at', None)
+            for field in ('created_at', 'updated_at', 'read_at'):
+                if m.get(field): m[field] = m[field].isoformat()
             
             # Add sender info
             sender_id = m.get('sender_id')
-            if sender_id and sender_id not in user_cache:
-                user_cache[sender_id] = JobsDB.get_user(sender_id)
-            
-            sender = user_cache.get(sender_id)
+            sender = senders.get(sender_id)
             if sender:
                 m['sender_name'] = f"{sender.get('real_name_first', '')} {sender.get('real_name_last', '')}".strip() or 'Unknown'
                 m['sender_photo_url'] = sender.get('photo_url')
@@ -116,8 +152,14 @@ def get_messages(request, application_id):
                 m['sender_photo_url'] = None
             
             m['is_employer'] = sender_id == employer_id
+            out.append(m)
             
-        return JsonResponse({"status": "success", "messages": messages})
+        return JsonResponse({
+            "status": "success",
+            "messages": out,
+            "has_more": has_more,
+            "sync_token": sync_token
+        })
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -252,3 +294,86 @@ def get_inbox(request):
         return JsonResponse({"status": "success", "conversations": conversations})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+# Each open stream holds a server thread; beyond this many the client polls instead
+_STREAM_SLOTS = threading.BoundedSemaphore(settings.JOBS_EVENT_MAX_STREAMS)
+
+
+class _SlotStream:
+    """Iterates an SSE generator and frees its stream slot when the response is closed."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._stream)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._stream.close()
+            _STREAM_SLOTS.release()
+
+
+def _sse(event_type, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@csrf_exempt
+@auth_required
+def stream_events(request):
+    """
+    GET /api/jobs_v2/events  (text/event-stream)
+    Pushes `message` / `read` / `delete` events for the user's conversations
+    ({application_id, message_id}); clients re-sync that conversation with
+    ?since=. The stream closes after JOBS_EVENT_STREAM_SECONDS and the client
+    reconnects with Last-Event-ID; `resync` means events were lost.
+    Past JOBS_EVENT_MAX_STREAMS open streams in this process it answers 503
+    and the client keeps polling.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "GET required"}, status=405)
+    
+    user_id = request.jobs_user_id
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    
+    def stream():
+        sub = HUB.subscribe(user_id)
+        try:
+            yield "retry: 3000\n\n"
+            if last_event_id:
+                missed = HUB.replay(user_id, last_event_id)
+                if missed is None:
+                    yield _sse("resync", {})
+                else:
+                    for event in missed:
+                        yield _sse(event["type"], event, event["id"])
+            
+            deadline = time.monotonic() + settings.JOBS_EVENT_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                event = sub.get(timeout=settings.JOBS_EVENT_HEARTBEAT_SECONDS)
+                if sub.overflowed:
+                    sub.overflowed = False
+                    yield _sse("resync", {})
+                if event is None:
+                    yield ": ping\n\n"  # Keeps proxies from timing out idle streams
+                else:
+                    yield _sse(event["type"], event, event["id"])
+        finally:
+            HUB.unsubscribe(sub)
+    
+    if not _STREAM_SLOTS.acquire(blocking=False):
+        response = JsonResponse({"error": "Too many open event streams"}, status=503)
+        response["Retry-After"] = "30"
+        return response
+    
+    response = StreamingHttpResponse(_SlotStream(stream()), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
@@ -3,12 +3,12 @@
 
 import json
 import jwt
-import hashlib
 import datetime
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from functools import wraps
 
+from core.passwords import PasswordServiceBusy, busy_response, check_password, hash_password
 from ..models import JobsDB
 
 # --- CONFIG ---
@@ -20,10 +20,6 @@ JWT_EXPIRY_DAYS = 7
 # HELPERS
 # =============================================================================
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
 def generate_token(account_id: str) -> str:
     payload = {
         "sub": account_id,
@@ -55,8 +51,8 @@ def auth_required(fn):
         if not account_id:
             return JsonResponse({"error": "Invalid token"}, status=401)
         
-        # Attach user to request
-        user = JobsDB.get_user(account_id)
+        # Attach user to request (cached principal, see models.PRINCIPALS)
+        user = JobsDB.get_principal(account_id)
         if not user:
             return JsonResponse({"error": "Account not found"}, status=404)
         
@@ -169,6 +165,8 @@ def register(request):
             "account_id": account_id
         })
         
+    except PasswordServiceBusy:
+        return busy_response()
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -188,7 +186,9 @@ def login(request):
         if not user:
             return JsonResponse({"error": "Invalid credentials"}, status=401)
         
-        if user.get("password_hash") != hash_password(password):
+        # Legacy SHA-256 (and under-cost) hashes are upgraded on a successful login
+        rehash = lambda encoded: JobsDB.update_user(user["account_id"], {"password_hash": encoded})
+        if not check_password(password, user.get("password_hash"), setter=rehash):
             return JsonResponse({"error": "Invalid credentials"}, status=401)
         
         if user.get("status") == "banned":
@@ -220,6 +220,8 @@ def login(request):
             "verified": user.get("trust_score", 0) >= 80 # Derived verification status
         })
         
+    except PasswordServiceBusy:
+        return busy_response()
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -267,10 +269,7 @@ def update_profile(request):
             updates["messaging_settings"] = data["messaging_settings"]
             
         if updates:
-            JobsDB._db().jobs_users.update_one(
-                {"account_id": request.jobs_user_id},
-                {"$set": updates}
-            )
+            JobsDB.update_user(request.jobs_user_id, updates)
             JobsDB.log(request.jobs_user_id, "update_profile", "user", request.jobs_user_id)
         
         return JsonResponse({"status": "updated"})
@@ -324,10 +323,7 @@ def upgrade_to_employer(request):
             "trust_score": 50  # Reset to pending for employer verification
         }
         
-        JobsDB._db().jobs_users.update_one(
-            {"account_id": request.jobs_user_id},
-            {"$set": updates}
-        )
+        JobsDB.update_user(request.jobs_user_id, updates)
         
         JobsDB.log(request.jobs_user_id, "upgrade_to_employer", "user", request.jobs_user_id)
         
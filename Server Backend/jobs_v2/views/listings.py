@@ -2,13 +2,40 @@
 # Server-Authoritative Logic
 
 import json
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from ..models import JobsDB
+from core.card_cache import CardCache
+from ..models import JobsDB, POST_PAGE_SIZE
 from .auth import auth_required, employer_required, worker_required
 
 
+def _employer_name(employer):
+    # Privacy: Only show Organization Name or First Name + L.
+    if employer.get("organization", {}).get("name"):
+        return employer["organization"]["name"]
+    return f"{employer.get('real_name_first', '')} {employer.get('real_name_last', '')[:1]}."
+
+
+def _load_employer_cards(account_ids):
+    users = JobsDB.get_users(
+        account_ids, ["organization.name", "real_name_first", "real_name_last", "rating_score", "review_count"]
+    )
+    return {
+        account_id: {
+            "employer_name": _employer_name(employer),
+            "employer_rating": employer.get("rating_score", 0),
+            "employer_reviews": employer.get("review_count", 0),
+        }
+        for account_id, employer in users.items()
+    }
+
+
+# Minimal employer info on search results, one batched lookup per page
+EMPLOYER_CARDS = CardCache(_load_employer_cards, ttl_seconds=settings.EMPLOYER_CARD_TTL_SECONDS)
+
+
 # =============================================================================
 # LISTING ENDPOINTS
 # =============================================================================
@@ -71,44 +98,45 @@ def create_listing(request):
 @csrf_exempt
 @auth_required
 def search_listings(request):
-    """GET /api/jobs_v2/listings/search"""
+    """GET /api/jobs_v2/listings/search?lat=&lon=&radius_km=&category=&pay_type=&cursor=&limit="""
     # Lazy Load Entrypoint
     if request.method != "GET":
         return JsonResponse({"error": "GET required"}, status=405)
     
     try:
         category = request.GET.get("category")
+        pay_type = request.GET.get("pay_type")
         lat = float(request.GET.get("lat")) if request.GET.get("lat") else None
         lon = float(request.GET.get("lon")) if request.GET.get("lon") else None
         radius_km = int(request.GET.get("radius_km", 50))
-        
-        listings = JobsDB.search_posts(
+        limit = int(request.GET.get("limit", POST_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "Invalid search parameters"}, status=400)
+
+    try:
+        listings, next_cursor = JobsDB.search_posts(
             category=category,
             lat=lat,
             lon=lon,
-            radius_km=radius_km
+            radius_km=radius_km,
+            pay_type=pay_type,
+            cursor=request.GET.get("cursor"),
+            limit=limit
         )
-        
         # Enrich with minimal employer info (Trust/Rating)
+        cards = EMPLOYER_CARDS.get_many(listing.get("employer_id") for listing in listings)
         for listing in listings:
-            employer = JobsDB.get_user(listing.get("employer_id"))
-            if employer:
-                # Privacy: Only show Organization Name or First Name + L.
-                if employer.get("organization", {}).get("name"):
-                    name = employer["organization"]["name"]
-                else:
-                    name = f"{employer.get('real_name_first', '')} {employer.get('real_name_last', '')[:1]}."
-                    
-                listing["employer_name"] = name
-                listing["employer_rating"] = employer.get("rating_score", 0)
-                listing["employer_reviews"] = employer.get("review_count", 0)
+            listing.update(cards.get(listing.get("employer_id"), {}))
         
         return JsonResponse({
             "status": "success",
             "count": len(listings),
-            "listings": listings
+            "listings": listings,
+            "next_cursor": next_cursor
         })
         
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -126,12 +154,7 @@ def get_listing(request, job_id):
     
     employer = JobsDB.get_user(listing.get("employer_id"))
     if employer:
-        if employer.get("organization", {}).get("name"):
-            name = employer["organization"]["name"]
-        else:
-            name = f"{employer.get('real_name_first', '')} {employer.get('real_name_last', '')[:1]}."
-        
-        listing["employer_name"] = name
+        listing["employer_name"] = _employer_name(employer)
         listing["employer_rating"] = employer.get("rating_score", 0)
         listing["employer_reviews"] = employer.get("review_count", 0)
         listing["employer_trust"] = employer.get("trust_score", 50)
@@ -358,12 +381,7 @@ def update_listing(request, job_id):
         if not updates:
             return JsonResponse({"error": "No valid fields to update"}, status=400)
         
-        # Update via direct DB access (add method to JobsDB if needed)
-        db = JobsDB._db()
-        db.jobs_posts.update_one(
-            {"job_id": job_id},
-            {"$set": updates}
-        )
+        JobsDB.update_post(job_id, updates)
         
         JobsDB.log(request.jobs_user_id, "update", "job", job_id, updates)
         
@@ -56,10 +56,7 @@ def upload_profile_photo(request):
         photo_url = f"/mediafiles/jobs/photos/{filename}"
         
         # Update user document
-        JobsDB._db().jobs_users.update_one(
-            {"account_id": request.jobs_user_id},
-            {"$set": {"photo_url": photo_url}}
-        )
+        JobsDB.update_user(request.jobs_user_id, {"photo_url": photo_url})
         
         JobsDB.log(request.jobs_user_id, "upload_photo", "user", request.jobs_user_id)
         
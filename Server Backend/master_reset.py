@@ -10,6 +10,7 @@ import subprocess
 import time
 import signal
 from core.db_utils import get_db_handle
+from core.intel_summary import drop_read_models
 import pymongo
 
 def run_command(cmd, shell=False):
@@ -47,6 +48,7 @@ def wipe_and_rebuild_mongo():
         # Connect to DB (Expect it to work before restart)
         db = get_db_handle()
         db.intel_history.drop()
+        drop_read_models(db)  # Portal overlays, alerts and review queue derive from it
         print("[✔] Old intelligence data deleted.")
     except:
         print("[!] DB connection failed (might be off). Proceeding to restart...")
@@ -16,6 +16,10 @@ import qrcode
 import io
 import base64
 from core.db_utils import get_db_handle
+from core import approvals
+from core.intel_summary import find_summaries, refresh_read_models
+from core.threat_overlays import find_overlays
+from core.zip_grid import CLUSTER_MAX_ZOOM, MAX_TILE_ZOOM, ZipDefconGrid
 
 # --- CONFIGURATIONPaths ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -289,12 +293,36 @@ def api_save_config(request):
 
 # --- API: ALERTS & APPROVALS ---
 
+def _wants_details(request):
+    return request.GET.get('details') in ('1', 'true')
+
+
 @login_required
 def api_get_approvals(request):
+    """Pending DEFCON 1 reviews from the approval queue (`?details=1` for full intel_history docs)."""
     db = get_db_handle()
-    query = {"languages.en.summary": {"$regex": "PENDING HUMAN VERIFICATION"}}
-    docs = list(db.intel_history.find(query, {"_id": 0})) 
-    return JsonResponse({'pending': docs})
+    if _wants_details(request):
+        docs = list(db.intel_history.find({"review_state": approvals.PENDING}, {"_id": 0}))
+        return JsonResponse({'pending': docs})
+    return JsonResponse({'pending': approvals.list_queue(db), 'reviewer': request.user.get_username()})
+
+@csrf_exempt
+@login_required
+def api_claim_approval(request):
+    """Lease a pending review (`zip_code`, or the oldest free one) to the current reviewer; `release` gives it back."""
+    if request.method == 'POST':
+        payload = json.loads(request.body or '{}')
+        db = get_db_handle()
+        reviewer = request.user.get_username()
+        if payload.get('release'):
+            released = approvals.release(db, reviewer, payload.get('zip_code'))
+            return JsonResponse({'status': 'released' if released else 'not_claimed'})
+        entry = approvals.claim(db, reviewer, payload.get('zip_code'))
+        if not entry:
+            return JsonResponse({'status': 'unavailable'}, status=409)
+        return JsonResponse({'status': 'claimed', 'entry': entry,
+                             'lease_seconds': approvals.APPROVAL_LEASE_SECONDS})
+    return JsonResponse({'error': 'POST'})
 
 @csrf_exempt
 @login_required
@@ -303,22 +331,16 @@ def api_decide_approval(request):
         payload = json.loads(request.body)
         zip_code = payload.get('zip_code')
         action = payload.get('action')
+        if action not in approvals.DECISIONS:
+            return JsonResponse({'error': 'action must be APPROVE or REJECT'}, status=400)
         db = get_db_handle()
-        doc = db.intel_history.find_one({'zip_code': zip_code})
-        
-        if doc and action == 'APPROVE':
-            doc['languages']['en']['defcon_status'] = 1
-            doc['languages']['en']['summary'] = [s for s in doc['languages']['en']['summary'] if "PENDING" not in s]
-            doc['languages']['en']['summary'].insert(0, "** COMMAND VERIFIED: WAR IMMINENT **")
-            db.intel_history.replace_one({'zip_code': zip_code}, doc)
-            
-        elif doc and action == 'REJECT':
-            doc['languages']['en']['defcon_status'] = 3
-            doc['languages']['en']['summary'] = [s for s in doc['languages']['en']['summary'] if "PENDING" not in s]
-            doc['languages']['en']['summary'].insert(0, "** ALERT DISMISSED BY COMMAND **")
-            db.intel_history.replace_one({'zip_code': zip_code}, doc)
-            
-        return JsonResponse({'status': 'done'})
+        try:
+            decided = approvals.decide(db, request.user.get_username(), zip_code, action)
+        except approvals.ClaimConflict:
+            return JsonResponse({'status': 'claimed_by_other'}, status=409)
+        if decided:
+            refresh_read_models(db, zip_code)  # Also invalidates ZIP_GRID
+        return JsonResponse({'status': 'done' if decided else 'not_pending'})
     return JsonResponse({'error': 'POST'})
 
 @login_required
@@ -327,8 +349,10 @@ def api_get_active_alerts(request):
     db = get_db_handle()
     # Find active docs (defcon <= 4) or recent modifications
     # For "Mapping point alerts", we usually mean overlays.
-    docs = list(db.intel_history.find({"languages.en.defcon_status": {"$lte": 4}}, {"_id": 0}).limit(50))
-    return JsonResponse({'alerts': docs})
+    if _wants_details(request):
+        docs = list(db.intel_history.find({"languages.en.defcon_status": {"$lte": 4}}, {"_id": 0}).limit(50))
+        return JsonResponse({'alerts': docs})
+    return JsonResponse({'alerts': find_summaries(db, {"defcon": {"$lte": 4}}, limit=50)})
 
 @csrf_exempt
 @login_required
@@ -342,6 +366,7 @@ def api_save_alert_map(request):
         # This is a basic update. In full system we might need upsert.
         # Minimal impl:
         db.intel_history.update_one({'zip_code': zip_code}, {'$set': updates})
+        refresh_read_models(db, zip_code)
         return JsonResponse({'status': 'updated'})
     return JsonResponse({'error': 'POST'})
 
@@ -349,55 +374,24 @@ def api_save_alert_map(request):
 
 @login_required
 def api_get_threats(request):
-    """Return processed hotzones matching App logic (DB + Static files)."""
-    processed = []
-    seen_names = set()
-    
-    # helper for radius logic
-    def get_radius(name, type_str):
-        text = (name + " " + type_str).lower()
-        if "artillery" in text or "mortar" in text: return 20000
-        if "infantry" in text or "troop" in text: return 5000
-        if "armor" in text or "tank" in text: return 10000
-        if "rocket" in text or "missile" in text: return 40000
-        if "air" in text or "strike" in text: return 50000
-        return 5000
-
-    # 1. Fetch from DB (Live Intel)
+    """
+    Return deduplicated threat overlays (materialised in threat_overlays).
+    Optional `bbox=min_lon,min_lat,max_lon,max_lat` limits them to the viewport.
+    """
+    bbox = None
+    if request.GET.get('bbox'):
+        try:
+            bbox = [float(v) for v in request.GET['bbox'].split(',')]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4:
+            return JsonResponse({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat'}, status=400)
+
     try:
-        db = get_db_handle()
-        # Get all tactical overlays from English docs
-        cursor = db.intel_history.find({}, {"languages.en.tactical_overlays": 1, "languages.en.defcon_status": 1, "_id": 0})
-        
-        for doc in cursor:
-            overlays = doc.get('languages', {}).get('en', {}).get('tactical_overlays', [])
-            for ov in overlays:
-                # Normalize name for deduplication
-                name = ov.get('name', 'Unknown')
-                
-                # Logic: Removed static filter per user request (Show all DB threats)
-                
-                if name in seen_names: continue
-                
-                seen_names.add(name)
-                
-                # Apply Story Radius Logic (DB might have different radius)
-                radius = get_radius(name, ov.get('type', ''))
-                
-                processed.append({
-                    "name": name,
-                    "lat": ov.get('lat'),
-                    "lon": ov.get('lon'),
-                    "radius": radius,
-                    "type": ov.get('type', 'Conflict Zone'),
-                    "defcon": doc.get('languages', {}).get('en', {}).get('defcon_status', 'N/A'),
-                    "last_kinetic": ov.get('date', 'Unknown') # DB uses 'date' often
-                })
+        processed = find_overlays(get_db_handle(), bbox)
     except Exception as e:
         print(f"Error fetching DB threats: {e}")
-
-    # REMOVED: Static Backfill of HOTZONES_DATA per User Request (Purge Mock Data)
-
+        processed = []
     return JsonResponse({'threats': processed})
 
 
@@ -411,7 +405,7 @@ def api_get_sitrep(request):
     db = get_db_handle()
     doc = db.intel_history.find_one(
         {"zip_code": zip_code},
-        {"_id": 0}
+        {"_id": 0, "languages.en": 1}
     )
     
     if not doc:
@@ -438,67 +432,45 @@ def api_get_sitrep(request):
     return JsonResponse({'status': 'success', 'sitrep': sitrep})
 
 
+ZIP_GRID_REFRESH_SECONDS = 30
+ZIP_GRID = ZipDefconGrid(get_zips_path(), refresh_seconds=ZIP_GRID_REFRESH_SECONDS)
+
+
+def _cache_tile(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = f'private, max-age={ZIP_GRID_REFRESH_SECONDS}'
+    return response
+
+
 @login_required
 def api_get_zip_defcon(request):
-    """Return DEFCON status only for zip codes with actual intel data in DB."""
+    """
+    Return DEFCON status only for zip codes with actual intel data in DB.
+    With `bbox=min_lon,min_lat,max_lon,max_lat&zoom=N` only the viewport is
+    returned (clustered below zoom 10).
+    """
     db = get_db_handle()
-    
-    # Get all zip codes with intel from DB
-    cursor = db.intel_history.find(
-        {"zip_code": {"$exists": True}},
-        {"zip_code": 1, "languages.en.defcon_status": 1, "_id": 0}
-    )
-    
-    # Build map of zip codes that have intel data
-    zip_defcons = {}
-    for doc in cursor:
-        zc = str(doc.get('zip_code', ''))
-        if not zc:
-            continue
-        defcon = doc.get('languages', {}).get('en', {}).get('defcon_status', 5)
-        zip_defcons[zc] = defcon
-    
-    # If no intel data exists, return empty (no simulated markers)
-    if not zip_defcons:
-        return JsonResponse({'zip_defcons': []})
-    
-    # Load postal codes CSV for coordinates - ONLY for zip codes that have intel data
-    results = []
-    seen_zips = set()
-    csv_path = get_zips_path()
-    
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', encoding='utf-8', errors='ignore') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                zip_code = row.get('POSTAL_CODE', '')
-                
-                # FILTER: Only include zip codes that have actual intel data
-                if zip_code not in zip_defcons:
-                    continue
-                    
-                if zip_code in seen_zips:
-                    continue  # One marker per zip
-                seen_zips.add(zip_code)
-                
-                lat = row.get('LATITUDE')
-                lon = row.get('LONGITUDE')
-                if not lat or not lon:
-                    continue
-                
-                try:
-                    lat = float(lat)
-                    lon = float(lon)
-                except:
-                    continue
-                
-                results.append({
-                    'zip_code': zip_code,
-                    'lat': lat,
-                    'lon': lon,
-                    'defcon': zip_defcons[zip_code],
-                    'district': row.get('DISTRICT_ENGLISH', '')
-                })
-    
-    return JsonResponse({'zip_defcons': results})
+    if not request.GET.get('bbox'):
+        return JsonResponse({'zip_defcons': ZIP_GRID.all_markers(db)})
+
+    try:
+        bbox = [float(v) for v in request.GET['bbox'].split(',')]
+        zoom = int(request.GET.get('zoom', CLUSTER_MAX_ZOOM))
+    except ValueError:
+        bbox = []
+    if len(bbox) != 4:
+        return JsonResponse({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat'}, status=400)
+    payload, _ = ZIP_GRID.query(db, bbox, zoom)
+    return JsonResponse({'zip_defcons': payload['markers'], 'clusters': payload['clusters']})
+
+
+@login_required
+def api_get_zip_defcon_tile(request, z, x, y):
+    """Slippy-map tile of zip DEFCON markers / clusters, cacheable per tile."""
+    if z > MAX_TILE_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return JsonResponse({'error': 'Tile out of range'}, status=400)
+    payload, etag = ZIP_GRID.tile(get_db_handle(), z, x, y)
+    if request.headers.get('If-None-Match') == etag:
+        return _cache_tile(HttpResponse(status=304), etag)
+    return _cache_tile(JsonResponse(payload), etag)
 
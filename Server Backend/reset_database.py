@@ -4,6 +4,7 @@
 # ==============================================================================
 
 from core.db_utils import get_db_handle
+from core.intel_summary import drop_read_models
 import pymongo
 import sys
 
@@ -25,6 +26,11 @@ def reset_system():
         db.intel_history.drop()
         print("[✔] Collection wiped.")
         
+        # 3b. Read models derived from it (portal map, alerts, review queue)
+        print("[*] Dropping intel read models...")
+        drop_read_models(db)
+        print("[✔] Read models wiped.")
+        
         # 4. Re-create the Geospatial Index (Required for 50km logic)
         print("[*] Re-creating 2dsphere Index on 'location_geo'...")
         db.intel_history.create_index([("location_geo", pymongo.GEOSPHERE)])
@@ -1,4 +1,5 @@
 from core.db_utils import get_db_handle
+from core.intel_summary import drop_read_models
 import pymongo
 
 def wipe():
@@ -11,6 +12,9 @@ def wipe():
         print(f"Dropping {col}...")
         db[col].drop()
         
+    print("Dropping intel read models (summary, overlays, approval queue)...")
+    drop_read_models(db)
+        
     print("Re-creating indexes...")
     # Geospatial index for distance calcs
     db.intel_history.create_index([("location_geo", pymongo.GEOSPHERE)])